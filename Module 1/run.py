@@ -2,6 +2,7 @@
 
 from flask import Flask
 from pages import pages
+import static_assets
 
 # instantiate app
 app = Flask(__name__)
@@ -9,6 +10,9 @@ app = Flask(__name__)
 # call blueprint from pages module
 app.register_blueprint(pages)
 
+# serve content-hashed static files with long-lived caching, once built
+static_assets.init_app(app)
+
 # run web application
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=8080, debug=True)
@@ -0,0 +1,208 @@
+"""
+This module fingerprints the files in static/ so that browsers can cache them
+for good instead of revalidating them on every page load.
+
+The build step copies each static file into static/build/, naming the copy
+after a digest of its content (style.css becomes e.g. style.3b1f0c2e9a.css),
+and records the names in static/build/manifest.json. Stylesheets (and scripts
+and SVGs) are also written gzip- and brotli-compressed beside the copy, so they
+are never compressed per request. Images are scaled down to at most
+STATIC_IMAGE_MAX_PX pixels on their longer side and re-encoded, with their
+metadata stripped. This needs Pillow: the build refuses to run without it
+when there are images, rather than ship them at full size.
+
+init_app(app) loads the manifest and makes url_for("static", filename=...)
+return the fingerprinted copy. Copies are served with
+"Cache-Control: public, max-age=31536000, immutable": a changed file gets a new
+name, so a cached copy never goes stale, and a repeat page load makes no static
+requests at all. Without a manifest (the build has not been run) static URLs
+and caching are left as Flask's defaults.
+
+This file is the reference copy. The Flask sites in Module 1 and Modules 3 to 5
+each carry an identical copy, which Module_6/tests/test_static_assets.py checks.
+
+Usage:
+    python static_assets.py     (build; run it again whenever static/ changes)
+
+Environment Variables:
+    STATIC_IMAGE_MAX_PX (optional): Longest side, in pixels, of built images. Defaults to 600.
+
+Functions:
+    build(static_dir=STATIC_DIR, max_px=IMAGE_MAX_PX) -> dict
+        Write the fingerprinted and compressed copies and the manifest; returns the manifest.
+    init_app(app) -> None
+        Rewrite static URLs to the built copies and serve them with long-lived caching.
+    build_id(app) -> str
+        A digest of the loaded manifest, or "" if there is none.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import mimetypes
+import os
+import shutil
+from flask import request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; without it assets are only gzip-compressed.
+    brotli = None
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Serving works without Pillow; building images needs it (see build).
+    Image = ImageOps = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+BUILD_DIR = "build"
+MANIFEST = "manifest.json"
+IMAGE_MAX_PX = int(os.environ.get("STATIC_IMAGE_MAX_PX", 600))
+
+# One year, the longest lifetime caches are expected to honour.
+MAX_AGE = 31536000
+
+# Hex digits of the content digest kept in each built file name.
+HASH_LENGTH = 10
+
+JPEG_QUALITY = 82
+COMPRESSIBLE = (".css", ".js", ".svg")
+IMAGES = {".jpg": "JPEG", ".jpeg": "JPEG", ".png": "PNG"}
+
+# Precompressed variants, in order of preference.
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _optimise_image(data, extension, max_px):
+    """Scale an image down to `max_px` and re-encode it; keeps the original if that is smaller."""
+    with Image.open(io.BytesIO(data)) as original:
+        # Apply the camera's rotation before the EXIF data that records it is dropped.
+        image = ImageOps.exif_transpose(original)
+        image.thumbnail((max_px, max_px), Image.Resampling.LANCZOS)
+        out = io.BytesIO()
+        if IMAGES[extension] == "JPEG":
+            image.convert("RGB").save(out, "JPEG", quality=JPEG_QUALITY, optimize=True,
+                                      progressive=True)
+        else:
+            image.save(out, "PNG", optimize=True)
+    optimised = out.getvalue()
+    return optimised if len(optimised) < len(data) else data
+
+
+def _precompress(path, data):
+    """Write gzip (and brotli) copies of `data` beside `path`; returns the encodings kept."""
+    variants = {"gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(data, quality=11)
+    kept = []
+    for encoding, suffix in ENCODINGS:
+        body = variants.get(encoding)
+        if body is not None and len(body) < len(data):
+            with open(path + suffix, "wb") as f:
+                f.write(body)
+            kept.append(encoding)
+    return kept
+
+
+def build(static_dir=STATIC_DIR, max_px=IMAGE_MAX_PX):
+    """
+    Replace `static_dir`/build with fingerprinted copies of every static file,
+    optimised images and precompressed stylesheets, plus the manifest. Returns
+    the manifest: {"files": {source: built name}, "encodings": {built name: [...]}}.
+    Raises RuntimeError if there are images and Pillow is not installed.
+    """
+    build_dir = os.path.join(static_dir, BUILD_DIR)
+    shutil.rmtree(build_dir, ignore_errors=True)
+    manifest = {"files": {}, "encodings": {}}
+
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = sorted(d for d in dirs if os.path.join(root, d) != build_dir)
+        for name in sorted(files):
+            source = os.path.relpath(os.path.join(root, name), static_dir).replace(os.sep, "/")
+            with open(os.path.join(root, name), "rb") as f:
+                data = f.read()
+            stem, extension = os.path.splitext(source)
+            extension = extension.lower()
+            if extension in IMAGES:
+                if Image is None:
+                    raise RuntimeError(f"Pillow is needed to optimise {source}; "
+                                       "install it with 'pip install pillow'")
+                data = _optimise_image(data, extension, max_px)
+
+            built = f"{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}{extension}"
+            path = os.path.join(build_dir, *built.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(data)
+            manifest["files"][source] = built
+            if extension in COMPRESSIBLE:
+                encodings = _precompress(path, data)
+                if encodings:
+                    manifest["encodings"][built] = encodings
+
+    os.makedirs(build_dir, exist_ok=True)
+    with open(os.path.join(build_dir, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def init_app(app):
+    """
+    Serve the built copies from app's static/build/ and point url_for at them.
+    Does nothing if the build has not been run.
+    """
+    build_dir = os.path.join(app.static_folder, BUILD_DIR)
+    try:
+        with open(os.path.join(build_dir, MANIFEST), "rb") as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return
+    manifest = json.loads(raw)
+    files, encodings = manifest["files"], manifest["encodings"]
+    app.extensions["static_assets"] = {
+        "manifest": manifest, "build_id": hashlib.sha256(raw).hexdigest()[:HASH_LENGTH]}
+
+    @app.url_defaults
+    def fingerprint(endpoint, values):
+        # Covers the app's static route and any blueprint's ("pages.static").
+        if endpoint == "static" or endpoint.endswith(".static"):
+            built = files.get(values.get("filename"))
+            if built is not None:
+                values["filename"] = f"{BUILD_DIR}/{built}"
+
+    def serve_asset(filename):
+        response = None
+        for encoding, suffix in ENCODINGS:
+            if encoding in encodings.get(filename, ()) and \
+                    request.accept_encodings.quality(encoding) > 0:
+                response = send_from_directory(build_dir, filename + suffix, max_age=MAX_AGE,
+                                               mimetype=mimetypes.guess_type(filename)[0])
+                response.headers["Content-Encoding"] = encoding
+                break
+        if response is None:
+            response = send_from_directory(build_dir, filename, max_age=MAX_AGE)
+        if filename in encodings:
+            response.vary.add("Accept-Encoding")
+        response.cache_control.immutable = True
+        return response
+
+    # More specific than Flask's /static/<path:filename>, so it takes the built copies.
+    app.add_url_rule(f"{app.static_url_path}/{BUILD_DIR}/<path:filename>", "static_assets",
+                     serve_asset)
+
+
+def build_id(app):
+    """
+    Identify the static build `app` serves, so pages that link to it can be
+    cached per build: a page rendered by an older build links to files this one
+    no longer has.
+    """
+    return app.extensions.get("static_assets", {}).get("build_id", "")
+
+
+if __name__ == "__main__":
+    built_manifest = build()
+    for source_name, built_name in built_manifest["files"].items():
+        print(f"{source_name} -> {BUILD_DIR}/{built_name}",
+              *built_manifest["encodings"].get(built_name, ()))
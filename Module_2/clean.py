@@ -1,82 +1,88 @@
 """Clean data scraped from GradCafe and return a formatted json object"""
 
-import json
 import re
+from typing import NamedTuple, Optional
+from snapshot import load_records, save_records
 
 def load_data(input_json:str):
-    """Loads data from a json file, returns Python list"""
-
-    with open(input_json, "r") as reader:
-        json_data = json.load(reader)
-        return json_data
+    """Loads data from a snapshot (.jsonl.gz) or json file, returns Python list"""
+    return load_records(input_json)
+
+
+# Regex patterns, compiled once and applied in a single pass per field
+RE_NUM_PAT = re.compile(r"\d")
+RE_TAG_PAT = re.compile(r"<[^>]+>")
+RE_TERM_PAT = re.compile(r"^([A-Za-z])(\d{2})$")
+SHORT_SEASONS = {"F": "Fall", "S": "Spring"}
+
+# Keys of the cleaned entries, in the order of the Applicant fields
+CLEAN_KEYS = ("program", "comments", "date_added", "url", "status", "term",
+              "US/International", "Degree", "GRE", "GRE_V", "GPA", "GRE_AW")
+
+
+class Applicant(NamedTuple):
+    """One cleaned applicant's data, stored as a compact tuple"""
+    program: Optional[str]
+    comments: Optional[str]
+    date_added: Optional[str]
+    url: Optional[str]
+    status: Optional[str]
+    term: Optional[str]
+    us_or_international: Optional[str]
+    degree: Optional[str]
+    gre: Optional[str]
+    gre_v: Optional[str]
+    gpa: Optional[str]
+    gre_aw: Optional[str]
+
+    def as_dict(self):
+        """Return the applicant formatted as in the assignment brief"""
+        return dict(zip(CLEAN_KEYS, self))
+
+
+def clean_entry(entry: dict):
+    """Clean one applicant's scraped data into an Applicant, without changing the input"""
+    get = entry.get
+
+    # Clean numbers out of school name and format program as "program, school"
+    if "program" in entry and "school" in entry:
+        school = entry["school"]
+        program = f"{entry['program']}, {RE_NUM_PAT.sub('', school) if school else school}"
+    else:
+        program = None
+
+    # Clean HTML tags out of comments
+    comments = get("comments")
+    if comments:
+        comments = RE_TAG_PAT.sub("", comments)
+
+    # Old entries use a differemt "term" format
+    # (e.g. old:F18, new:Fall 2018), standardize it
+    term = get("semester_year")
+    match = RE_TERM_PAT.match(term) if term else None
+    if match is not None and match.group(1) in SHORT_SEASONS:
+        term = f"{SHORT_SEASONS[match.group(1)]} 20{match.group(2)}"
+
+    return Applicant(program, comments, get("date_added"), get("link"), get("status"), term,
+                     get("citizenship"), get("degree"), get("GRE"), get("GRE_V"), get("GPA"),
+                     get("GRE_AW"))
+
+
+def clean_records(raw_data: list):
+    """Clean scraped data into a list of Applicant records"""
+    return [clean_entry(entry) for entry in raw_data]
 
 
 def clean_data(raw_data: list):
     """ Convert data to desired format and remove bad data"""
-
-    clean_data = []
-
-    for entry in raw_data: # each entry one applicant's data
-        clean_entry = {} # holds entry after cleaning
-
-        # Clean numbers out of school name using Regex
-        RE_NUM_PAT = r"\d"
-        if "school" not in entry or re.search(RE_NUM_PAT, entry["school"]) is None:
-            pass
-        else:
-            entry["school"] = re.sub(RE_NUM_PAT, "", entry["school"])
-
-        # Clean HTML tags with Regex
-        RE_TAG_PAT = r"<[^>]+>"
-        if entry["comments"] is None:
-            pass
-        else:
-            entry["comments"] = re.sub(RE_TAG_PAT, "", entry["comments"])
-
-        # Old entries use a differemt "term" format
-        # (e.g. old:F18, new:Fall 2018), use Regex to standardize
-        RE_TERM_PAT = r"^[A-Za-z]\d{2}$"
-        if "semester_year" not in entry or re.search(RE_TERM_PAT, entry["semester_year"]) is None:
-            pass
-        else:
-            if entry["semester_year"][0] == "F":
-                entry["semester_year"] = f"Fall 20{entry["semester_year"][1:]}"
-            elif entry["semester_year"][0] == "S":
-                entry["semester_year"] = f"Spring 20{entry["semester_year"][1:]}"
-
-
-        # Format everything as in assignment brief
-        if "program" in entry and "school" in entry:
-            program = entry["program"]
-            school = entry["school"]
-            clean_entry["program"] = f"{program}, {school}"
-        else:
-            clean_entry["program"] = None
-
-        clean_entry["comments"] = entry["comments"] if "comments" in entry else None
-        clean_entry["date_added"] = entry["date_added"] if "date_added" in entry else None
-        clean_entry["url"] = entry["link"] if "link" in entry else None
-        clean_entry["status"] = entry["status"] if "status" in entry else None
-        clean_entry["term"] = entry["semester_year"] if "semester_year" in entry else None
-        clean_entry["US/International"] = entry["citizenship"] if "citizenship" in entry else None
-        clean_entry["Degree"] = entry["degree"] if "degree" in entry else None
-        clean_entry["GRE"] = entry["GRE"] if "GRE" in entry else None
-        clean_entry["GRE_V"] = entry["GRE_V"] if "GRE_V" in entry else None
-        clean_entry["GPA"] = entry["GPA"] if "GPA" in entry else None
-        clean_entry["GRE_AW"] = entry["GRE_AW"] if "GRE_AW" in entry else None
-
-        clean_data.append(clean_entry)
-
-    return clean_data
+    return [applicant.as_dict() for applicant in clean_records(raw_data)]
 
 def save_clean_data(input_data: list, output_file: str):
-    """ Save cleaned data as json file"""
-    data_json = json.dumps(input_data, indent=4) # convert list data to json
-    with open(output_file, "w") as writer:
-        writer.write(data_json)
+    """ Save cleaned data as a compressed snapshot (.jsonl.gz) or a json file"""
+    save_records(output_file, input_data, CLEAN_KEYS)
 
 if __name__ == "__main__":
-    test_data = load_data("applicant_data_messy.json") # obtain scraped data
+    test_data = load_data("applicant_data_messy.jsonl.gz") # obtain scraped data
     cleaned_data = clean_data(test_data) # clean scraped data
     CLEAN_FILE_NAME = "applicant_data.json"
     save_clean_data(cleaned_data, CLEAN_FILE_NAME) # save cleaned data
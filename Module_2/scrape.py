@@ -2,9 +2,14 @@
 Scrape data from TheGradCafe using Beautiful Soup.
 Returns a list of grad school applicant entry data.
 """
-import json
 from bs4 import BeautifulSoup
 import urllib3
+from snapshot import save_records
+
+# Fields an entry can have (only some applicants post GPA, GRE or comments)
+SCRAPE_FIELDS = ["school", "program", "degree", "date_added", "status", "link",
+                 "semester_year", "citizenship", "GPA", "GRE", "GRE_V", "GRE_Q",
+                 "GRE_AW", "comments"]
 
 def scrape_data(num_data_points: int):
     """ Scrape a user-selected number of datapoints from TheGradCafe"""
@@ -92,12 +97,10 @@ def scrape_data(num_data_points: int):
     return entries
 
 def save_data(input_data: list, output_file: str):
-    """ Save scraped data into json file"""
-    data_json = json.dumps(input_data, indent=4) # convert list data to json
-    with open(output_file, "w") as writer:
-        writer.write(data_json)
+    """ Save scraped data as a compressed snapshot (.jsonl.gz) or a json file"""
+    save_records(output_file, input_data, SCRAPE_FIELDS)
 
 if __name__ == "__main__":
     grad_data = scrape_data(30000) # enter desired number of datapoints
-    FILE_NAME = "applicant_data_messy.json"
+    FILE_NAME = "applicant_data_messy.jsonl.gz"
     save_data(grad_data, FILE_NAME)
@@ -0,0 +1,105 @@
+"""
+This module reads and writes applicant snapshots, the files handed between the
+scrape, clean, standardize and load stages.
+
+A snapshot is gzip-compressed JSON Lines. The first line is a schema header
+naming the format, its version and the record fields; every following line is
+one record as a JSON array of values in field order, so keys are not repeated on
+every row. Records are written and read one at a time, so neither side holds
+the whole dataset as text. Files that do not end in SNAPSHOT_SUFFIX are treated
+as the plain JSON lists used before, so existing dumps still load.
+
+Functions:
+    write_snapshot(path, records, fields=None) -> int
+        Stream dict records into a snapshot; returns the number written.
+    read_snapshot(path) -> iterator
+        Yield the records of a snapshot as dicts.
+    save_records(path, records, fields=None) -> int
+        Write a snapshot, or a JSON list when `path` is not a snapshot path.
+    load_records(path) -> list
+        Read a snapshot or a JSON list into a list of dicts.
+
+Usage:
+    >>> save_records("applicant_data.jsonl.gz", rows)
+    >>> rows = load_records("applicant_data.jsonl.gz")
+"""
+
+import gzip
+import itertools
+import json
+
+SNAPSHOT_FORMAT = "gradcafe-snapshot"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SUFFIX = ".jsonl.gz"
+
+# Fast enough to keep up with the writers while still shrinking files ~10x.
+COMPRESS_LEVEL = 6
+
+
+def is_snapshot(path):
+    """Whether `path` names a snapshot (rather than a plain JSON list)."""
+    return str(path).endswith(SNAPSHOT_SUFFIX)
+
+
+def write_snapshot(path, records, fields=None):
+    """
+    Stream `records` (dicts) into a snapshot at `path`.
+
+    `fields` fixes the column order; by default it is the keys of the first
+    record. Keys missing from a record are stored as null, and a record with a
+    key outside `fields` raises ValueError. Returns the number of records written.
+    """
+    records = iter(records)
+    if fields is None:
+        first = next(records, None)
+        fields = list(first) if first is not None else []
+        if first is not None:
+            records = itertools.chain([first], records)
+    fields = list(fields)
+    known = set(fields)
+
+    written = 0
+    with gzip.open(path, "wt", encoding="utf-8", compresslevel=COMPRESS_LEVEL) as sink:
+        header = {"format": SNAPSHOT_FORMAT, "version": SNAPSHOT_VERSION, "fields": fields}
+        sink.write(json.dumps(header) + "\n")
+        for record in records:
+            if not known.issuperset(record):
+                raise ValueError(f"record has fields outside the snapshot schema: "
+                                 f"{sorted(set(record) - known)}")
+            sink.write(json.dumps([record.get(field) for field in fields],
+                                  ensure_ascii=False, separators=(",", ":")))
+            sink.write("\n")
+            written += 1
+    return written
+
+
+def read_snapshot(path):
+    """Yield the records of the snapshot at `path` as dicts."""
+    with gzip.open(path, "rt", encoding="utf-8") as source:
+        header = json.loads(source.readline() or "{}")
+        if header.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"{path} is not a {SNAPSHOT_FORMAT} file")
+        if header.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"{path} has unsupported snapshot version {header.get('version')}")
+        fields = header["fields"]
+        for line in source:
+            if line.strip():
+                yield dict(zip(fields, json.loads(line)))
+
+
+def save_records(path, records, fields=None):
+    """Write `records` as a snapshot, or as a JSON list when `path` is not a snapshot path."""
+    if is_snapshot(path):
+        return write_snapshot(path, records, fields)
+    records = list(records)
+    with open(path, "w", encoding="utf-8") as fhand:
+        json.dump(records, fhand, indent=4, ensure_ascii=False)
+    return len(records)
+
+
+def load_records(path):
+    """Read the snapshot or JSON list at `path` into a list of dicts."""
+    if is_snapshot(path):
+        return list(read_snapshot(path))
+    with open(path, "r", encoding="utf-8") as fhand:
+        return json.load(fhand)
@@ -16,6 +16,7 @@ Notes:
 import os
 from flask import Flask
 from pages_bp import pages
+import static_assets
 
 # Instantiate app, create key to let us use Flash statements.
 app = Flask(__name__)
@@ -24,6 +25,9 @@ app.secret_key = 'your-secret-key-change-in-production'
 # Call blueprint from pages module.
 app.register_blueprint(pages)
 
+# Serve content-hashed static files with long-lived caching, once built.
+static_assets.init_app(app)
+
 # Run web application.
 if __name__ == "__main__":
     # Get port from environment or default to 5000.
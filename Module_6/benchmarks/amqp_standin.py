@@ -0,0 +1,235 @@
+"""
+An in-memory AMQP 0-9-1 stand-in for RabbitMQ, for benchmarks and tests of the publisher.
+
+It listens on a local TCP port and speaks just enough of the protocol for pika's
+BlockingConnection: the connection handshake, channels, exchange and queue
+declarations, bindings, publisher confirms, transactions and basic.publish.
+Frames are encoded and decoded with pika's own codec, so the client runs its
+real network code. Published messages are kept in memory; nothing is delivered.
+
+Each reply can be held back by `delay_ms` to model the round trip to a broker
+on another host. Like RabbitMQ, confirms for messages that arrive together are
+sent as one `multiple` ack once the client has nothing more in flight.
+Connections, published messages and ack frames are counted, and open
+connections can be dropped, either at once or after a given number of stored
+messages with their confirms unsent, to test reconnecting.
+
+Usage:
+    with AmqpStandIn() as broker:
+        os.environ["RABBITMQ_URL"] = broker.url
+        ...
+        broker.messages  # [(routing_key, properties, body), ...]
+"""
+
+import socket
+import socketserver
+import threading
+import time
+from pika import frame, spec
+
+SERVER_PROPERTIES = {"product": "amqp-standin",
+                     "capabilities": {"publisher_confirms": True, "basic.nack": True}}
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    """Serves one client connection."""
+
+    def setup(self):
+        # RabbitMQ disables Nagle's algorithm too; otherwise small acks can stall.
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.broker = self.server.broker
+        self.buffer = b""
+        self.confirming = set()
+        self.delivery_tags = {}
+        self.unacked = {}  # Highest stored but unconfirmed delivery tag, by channel.
+        self.pending = {}  # Messages published in an open transaction, by channel.
+        self.publishing = {}  # The message being assembled from its frames, by channel.
+        self.broker.opened(self.request)
+
+    def finish(self):
+        self.broker.closed(self.request)
+
+    def send(self, channel, method):
+        """Send one method frame, after the configured delay."""
+        if self.broker.delay_ms:
+            time.sleep(self.broker.delay_ms / 1000)
+        self.request.sendall(frame.Method(channel, method).marshal())
+
+    def frames(self):
+        """Yield frames as they arrive, until the client disconnects."""
+        while True:
+            consumed, decoded = frame.decode_frame(self.buffer)
+            if decoded is None:
+                self.flush_acks()
+                try:
+                    data = self.request.recv(65536)
+                except OSError:
+                    return
+                if not data:
+                    return
+                self.buffer += data
+                continue
+            self.buffer = self.buffer[consumed:]
+            yield decoded
+
+    def handle(self):
+        for received in self.frames():
+            if isinstance(received, frame.ProtocolHeader):
+                self.send(0, spec.Connection.Start(server_properties=SERVER_PROPERTIES,
+                                                   mechanisms="PLAIN", locales="en_US"))
+            elif isinstance(received, frame.Method):
+                if not self.on_method(received.channel_number, received.method):
+                    return
+            elif isinstance(received, frame.Header):
+                message = self.publishing[received.channel_number]
+                message.update(size=received.body_size, properties=received.properties)
+                if not received.body_size and not self.published(received.channel_number):
+                    return
+            elif isinstance(received, frame.Body):
+                message = self.publishing[received.channel_number]
+                message["body"] += received.fragment
+                if (len(message["body"]) >= message["size"]
+                        and not self.published(received.channel_number)):
+                    return
+
+    def flush_acks(self):
+        """Confirm every message stored since the last flush, one ack per channel."""
+        for channel, tag in self.unacked.items():
+            self.broker.count("acks")
+            self.send(channel, spec.Basic.Ack(delivery_tag=tag, multiple=True))
+        self.unacked.clear()
+
+    def on_method(self, channel, method):  # pylint: disable=R0911,R0912
+        """Answer one method; returns False once the connection is closed."""
+        if isinstance(method, spec.Connection.StartOk):
+            self.send(0, spec.Connection.Tune(channel_max=2047, frame_max=131072, heartbeat=60))
+        elif isinstance(method, spec.Connection.Open):
+            self.send(0, spec.Connection.OpenOk())
+        elif isinstance(method, spec.Connection.Close):
+            self.send(0, spec.Connection.CloseOk())
+            return False
+        elif isinstance(method, spec.Channel.Open):
+            self.send(channel, spec.Channel.OpenOk())
+        elif isinstance(method, spec.Channel.Close):
+            self.send(channel, spec.Channel.CloseOk())
+        elif isinstance(method, spec.Exchange.Declare):
+            self.broker.count("declares")
+            self.send(channel, spec.Exchange.DeclareOk())
+        elif isinstance(method, spec.Queue.Declare):
+            self.broker.count("declares")
+            self.send(channel, spec.Queue.DeclareOk(queue=method.queue, message_count=0,
+                                                       consumer_count=0))
+        elif isinstance(method, spec.Queue.Bind):
+            self.broker.count("declares")
+            self.send(channel, spec.Queue.BindOk())
+        elif isinstance(method, spec.Confirm.Select):
+            self.confirming.add(channel)
+            self.send(channel, spec.Confirm.SelectOk())
+        elif isinstance(method, spec.Tx.Select):
+            self.pending[channel] = []
+            self.send(channel, spec.Tx.SelectOk())
+        elif isinstance(method, spec.Tx.Commit):
+            self.broker.store(self.pending[channel])
+            self.pending[channel] = []
+            self.broker.count("commits")
+            self.send(channel, spec.Tx.CommitOk())
+        elif isinstance(method, spec.Basic.Publish):
+            self.publishing[channel] = {"routing_key": method.routing_key, "body": b""}
+        return True
+
+    def published(self, channel):
+        """
+        Store (or stage, in a transaction) a fully received message and queue its
+        confirm; returns False once the connection is cut (see AmqpStandIn.drop_after).
+        """
+        message = self.publishing.pop(channel)
+        entry = (message["routing_key"], message["properties"], message["body"])
+        if channel in self.pending:
+            self.pending[channel].append(entry)
+        else:
+            self.broker.store([entry])
+        if self.broker.cut_now():
+            # The message is kept but no confirm leaves, nor is anything after it read.
+            self.unacked.clear()
+            self.request.shutdown(socket.SHUT_RDWR)
+            return False
+        if channel in self.confirming:
+            tag = self.delivery_tags.get(channel, 0) + 1
+            self.delivery_tags[channel] = tag
+            self.unacked[channel] = tag
+        return True
+
+
+class AmqpStandIn:
+    """A local AMQP stand-in running on a background thread; use as a context manager."""
+
+    def __init__(self, delay_ms=0.0):
+        self.delay_ms = delay_ms
+        self.messages = []
+        self.stats = {"connections": 0, "declares": 0, "commits": 0, "acks": 0}
+        self._cut_after = None
+        self._lock = threading.Lock()
+        self._sockets = set()
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.broker = self
+
+    @property
+    def url(self):
+        """The amqp:// URL to connect to."""
+        host, port = self._server.server_address
+        return f"amqp://guest:guest@{host}:{port}/%2F"
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self.drop_connections()
+        self._server.server_close()
+        return False
+
+    def opened(self, sock):
+        """Record a new client connection."""
+        with self._lock:
+            self._sockets.add(sock)
+            self.stats["connections"] += 1
+
+    def closed(self, sock):
+        """Forget a client connection."""
+        with self._lock:
+            self._sockets.discard(sock)
+
+    def count(self, name):
+        """Increment counter `name`."""
+        with self._lock:
+            self.stats[name] += 1
+
+    def store(self, entries):
+        """Keep published messages."""
+        with self._lock:
+            self.messages.extend(entries)
+
+    def drop_after(self, messages):
+        """Cut the connection storing the `messages`-th message from now, before confirming it."""
+        with self._lock:
+            self._cut_after = len(self.messages) + messages
+
+    def cut_now(self):
+        """Whether the connection storing messages should be cut now (see drop_after)."""
+        with self._lock:
+            if self._cut_after is None or len(self.messages) < self._cut_after:
+                return False
+            self._cut_after = None
+            return True
+
+    def drop_connections(self):
+        """Cut every open client connection, as a broker restart would."""
+        with self._lock:
+            sockets = list(self._sockets)
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
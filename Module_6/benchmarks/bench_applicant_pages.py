@@ -0,0 +1,121 @@
+"""
+Benchmark paging through applicants with OFFSET against the keyset pagination
+of /api/applicants, and the memory used by a full export.
+
+Creates a scratch schema from db/init.sql in the database named by DATABASE_URL
+and loads synthetic applicants (1M by default). It times one page at increasing
+depths both ways, unfiltered and filtered by university. It then streams every
+row as CSV through applicant_api.export_rows, reporting the rows per second and
+the peak Python memory. The scratch schema is dropped at the end.
+
+Usage (from the Module_6 folder):
+    $ python -m benchmarks.bench_applicant_pages --rows 1000000 --limit 50
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import nullcontext
+import psycopg
+from benchmarks.synthetic import scratch_schema, fill_applicants
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "web"))
+from applicant_api import (COLUMNS, applicant_page, encode_cursor,  # pylint: disable=C0413,E0401
+                           export_rows)
+
+OFFSET_PAGE = """
+    SELECT {columns} FROM applicants WHERE {filters}
+    ORDER BY date_added DESC NULLS LAST, id DESC
+    LIMIT %(limit)s OFFSET %(offset)s
+"""
+
+
+def offset_page(conn, filters, offset, limit):
+    """One page read with OFFSET; returns its rows."""
+    where = " AND ".join(["TRUE"] + [f"{column} = %({column})s" for column in filters])
+    statement = OFFSET_PAGE.format(columns=", ".join(COLUMNS), filters=where)
+    with conn.cursor() as cur:
+        cur.execute(statement, dict(filters, limit=limit, offset=offset))
+        return cur.fetchall()
+
+
+def keyset_cursor(conn, filters, offset):
+    """The keyset cursor of the row just before `offset` (as a client paging there would hold)."""
+    where = " AND ".join(["TRUE"] + [f"{column} = %({column})s" for column in filters])
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            SELECT date_added, id FROM applicants WHERE {where}
+            ORDER BY date_added DESC NULLS LAST, id DESC LIMIT 1 OFFSET %(offset)s
+        """, dict(filters, offset=offset - 1))
+        row = cur.fetchone()
+    return encode_cursor({"date_added": row[0].isoformat() if row[0] else None, "id": row[1]})
+
+
+def best_ms(run, repeat):
+    """Best-of-`repeat` wall time of run() in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    conn = psycopg.connect(os.environ["DATABASE_URL"], autocommit=True)
+    try:
+        with scratch_schema(conn, "bench_applicant_pages"):
+            fill_applicants(conn, args.rows)
+            university = conn.execute("""
+                SELECT llm_generated_university FROM applicants
+                GROUP BY 1 ORDER BY count(*) DESC LIMIT 1
+            """).fetchone()[0]
+            cases = [("all rows", {}, {}),
+                     (university, {"llm_generated_university": university},
+                      {"university": university})]
+
+            print(f"{'filter':<28} {'depth':>9} {'offset ms':>10} {'keyset ms':>10}")
+            for label, columns, filters in cases:
+                matching = conn.execute(
+                    "SELECT count(*) FROM applicants WHERE " + " AND ".join(
+                        ["TRUE"] + [f"{column} = %({column})s" for column in columns]),
+                    columns).fetchone()[0]
+                for fraction in (0, 0.01, 0.1, 0.5, 0.9):
+                    depth = int(matching * fraction)
+                    cursor = keyset_cursor(conn, columns, depth) if depth else None
+                    offset_ms = best_ms(
+                        lambda d=depth, f=columns: offset_page(conn, f, d, args.limit),
+                        args.repeat)
+                    keyset_ms = best_ms(
+                        lambda c=cursor, f=filters: applicant_page(conn, f, c, args.limit),
+                        args.repeat)
+                    print(f"{label[:28]:<28} {depth:>9} {offset_ms:>10.2f} {keyset_ms:>10.2f}")
+
+            started = time.perf_counter()
+            exported = sum(chunk.count("\n") for chunk in
+                           export_rows(lambda: nullcontext(conn), {}, "csv")) - 1
+            elapsed = time.perf_counter() - started
+            # Traced separately: tracing every allocation slows the export several times over.
+            tracemalloc.start()
+            for _ in export_rows(lambda: nullcontext(conn), {}, "csv"):
+                pass
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"Exported about {exported} CSV lines in {elapsed:.1f}s "
+                  f"({exported / elapsed:,.0f} rows/s), peak Python memory {peak / 2**20:.1f} MiB")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark answering run_queries concurrently with asyncio against running the statements in sequence.
+
+Creates a scratch schema from db/init.sql in the database named by DATABASE_URL,
+loads synthetic applicants (500k by default) and rebuilds the rollup. For each
+source it times the sequential run_queries path on one connection and
+run_queries_async over a pool of AsyncConnections, and checks that the answers
+agree. Concurrent statements can only overlap as far as the server has CPUs to
+run them, so the speedup is bounded by the server's core count. The scratch
+schema is dropped at the end.
+
+Usage (from the Module_6 folder):
+    $ python -m benchmarks.bench_async_queries --rows 500000 --repeat 5
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import psycopg
+from benchmarks.synthetic import scratch_schema, fill_applicants
+
+MODULE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(MODULE_DIR, "web"))
+sys.path.insert(0, os.path.join(MODULE_DIR, "worker"))
+from query_data import run_queries  # pylint: disable=C0413,E0401
+from async_queries import open_async_pool, run_queries_async  # pylint: disable=C0413,E0401
+from etl.aggregates import rebuild  # pylint: disable=C0413,E0401
+
+SCHEMA = "bench_async"
+
+
+def time_sync(conn, source, repeat):
+    """Best-of-`repeat` milliseconds for the sequential run_queries; returns (ms, results)."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = run_queries(source=source, conn=conn)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, results
+
+
+async def time_async(source, repeat):
+    """Best-of-`repeat` milliseconds for run_queries_async; returns (ms, results)."""
+    pool = await open_async_pool(os.environ["DATABASE_URL"],
+                                 kwargs={"options": f"-c search_path={SCHEMA}"})
+    try:
+        # Open every connection up front so the timings exclude connecting.
+        await run_queries_async(pool, source)
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            results = await run_queries_async(pool, source)
+            best = min(best, time.perf_counter() - started)
+    finally:
+        await pool.close()
+    return best * 1000, results
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    conn = psycopg.connect(os.environ["DATABASE_URL"], autocommit=True)
+    try:
+        with scratch_schema(conn, SCHEMA):
+            started = time.perf_counter()
+            fill_applicants(conn, args.rows)
+            with conn.cursor() as cur:
+                rebuild(cur)
+            print(f"Loaded {args.rows} rows in {time.perf_counter() - started:.1f}s "
+                  f"(server CPUs visible here: {os.cpu_count()})")
+
+            print(f"{'source':<12}{'sequential (ms)':>17}{'concurrent (ms)':>17}{'speedup':>10}")
+            for source in ("rollup", "applicants"):
+                sync_ms, sync_results = time_sync(conn, source, args.repeat)
+                async_ms, async_results = asyncio.run(time_async(source, args.repeat))
+                # Question 9 can differ on ties between equally popular universities.
+                assert {k: v for k, v in sync_results.items() if k != "9"} == \
+                    {k: v for k, v in async_results.items() if k != "9"}
+                print(f"{source:<12}{sync_ms:>17.2f}{async_ms:>17.2f}"
+                      f"{sync_ms / async_ms:>9.1f}x")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
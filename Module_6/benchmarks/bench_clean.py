@@ -0,0 +1,129 @@
+"""
+Benchmark clean_data on synthetic scraped entries.
+
+Compares the per-row loop clean_data used before (patterns rebuilt per row, a
+search before every substitution, the input mutated, a fresh dict built per row
+and the term/status parsers called without memoisation) with the compiled cleaner, both as ApplicantRecord tuples (clean_records)
+and as the dicts clean_data returns, and with the columnar cleaner in
+worker/etl/columnar.py when pyarrow is installed. Reports rows per second, and
+bytes per record (tracemalloc for Python objects, Table.nbytes for Arrow batches).
+
+Usage (from the Module_6 folder):
+    $ python -m benchmarks.bench_clean --rows 100000
+"""
+
+import argparse
+import copy
+import os
+import re
+import sys
+import time
+import tracemalloc
+from benchmarks.synthetic import scraped_entries
+
+MODULE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(MODULE_DIR, "worker"))
+from etl.update_database import (  # pylint: disable=C0413,E0401
+    clean_records, clean_data, parse_date_added, parse_term, parse_decision)
+try:
+    from etl.columnar import clean_columns, to_dicts  # pylint: disable=C0413,E0401
+except ImportError:
+    clean_columns = None
+
+
+def legacy_clean_data(raw_data):  # pylint: disable=C0103
+    """The cleaning loop as it was written before the compiled cleaner."""
+    date_parser, term_parser = parse_date_added.__wrapped__, parse_term.__wrapped__
+    decision_parser = parse_decision.__wrapped__
+    clean_data_list = []
+    for entry in raw_data:
+        clean_entry = {}
+        RE_NUM_PAT = r"\d"
+        if "school" in entry and re.search(RE_NUM_PAT, entry["school"]) is not None:
+            entry["school"] = re.sub(RE_NUM_PAT, "", entry["school"])
+        RE_TAG_PAT = r"<[^>]+>"
+        if entry["comments"] is not None:
+            entry["comments"] = re.sub(RE_TAG_PAT, "", entry["comments"])
+        RE_TERM_PAT = r"^[A-Za-z]\d{2}$"
+        if "semester_year" in entry and re.search(RE_TERM_PAT, entry["semester_year"]):
+            if entry["semester_year"][0] == "F":
+                entry["semester_year"] = f"Fall 20{entry['semester_year'][1:]}"
+            elif entry["semester_year"][0] == "S":
+                entry["semester_year"] = f"Spring 20{entry['semester_year'][1:]}"
+        if "program" in entry and "school" in entry:
+            clean_entry["program"] = f"{entry['program']}, {entry['school']}"
+        else:
+            clean_entry["program"] = None
+        clean_entry["comments"] = entry["comments"] if "comments" in entry else None
+        clean_entry["date_added"] = date_parser(
+            entry["date_added"]) if "date_added" in entry else None
+        clean_entry["url"] = entry["link"] if "link" in entry else None
+        clean_entry["status"] = entry["status"] if "status" in entry else None
+        clean_entry["term"] = entry["semester_year"] if "semester_year" in entry else None
+        clean_entry["US/International"] = entry[
+            "citizenship"] if "citizenship" in entry else None
+        clean_entry["Degree"] = entry["degree"] if "degree" in entry else None
+        clean_entry["GRE"] = entry["GRE"] if "GRE" in entry else None
+        clean_entry["GRE_V"] = entry["GRE_V"] if "GRE_V" in entry else None
+        clean_entry["GPA"] = entry["GPA"] if "GPA" in entry else None
+        clean_entry["GRE_AW"] = entry["GRE_AW"] if "GRE_AW" in entry else None
+        clean_entry["term_season"], clean_entry["term_year"] = term_parser(clean_entry["term"])
+        clean_entry["decision"], clean_entry["decision_date"] = decision_parser(
+            clean_entry["status"], clean_entry["date_added"])
+        clean_data_list.append(clean_entry)
+    return clean_data_list
+
+
+def measure(clean, entries, repeat):
+    """Best-of-`repeat` rows/sec of `clean`, and bytes allocated per output record."""
+    best = float("inf")
+    for _ in range(repeat):
+        for parser in (parse_date_added, parse_term, parse_decision):
+            parser.cache_clear()
+        # The legacy cleaner mutates its input, so every run gets a fresh copy.
+        batch = copy.deepcopy(entries)
+        started = time.perf_counter()
+        clean(batch)
+        best = min(best, time.perf_counter() - started)
+
+    batch = copy.deepcopy(entries)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = clean(batch)
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    # Arrow buffers live outside the Python allocator, so tracemalloc misses them.
+    retained = getattr(result, "nbytes", retained)
+    del result
+    return len(entries) / best, retained / len(entries)
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    entries = scraped_entries(args.rows)
+    assert legacy_clean_data(copy.deepcopy(entries[:1000])) == clean_data(entries[:1000])
+
+    results = {
+        "legacy loop (dicts)": measure(legacy_clean_data, entries, args.repeat),
+        "compiled (records)": measure(clean_records, entries, args.repeat),
+        "compiled (dicts)": measure(clean_data, entries, args.repeat),
+    }
+    if clean_columns is not None:
+        results["columnar (table)"] = measure(clean_columns, entries, args.repeat)
+        results["columnar (dicts)"] = measure(lambda batch: to_dicts(clean_columns(batch)),
+                                              entries, args.repeat)
+
+    baseline = results["legacy loop (dicts)"][0]
+    print(f"{args.rows} scraped entries")
+    print(f"{'cleaner':<22}{'rows/s':>12}{'speedup':>10}{'bytes/record':>15}")
+    for name, (rate, per_record) in results.items():
+        print(f"{name:<22}{rate:>12,.0f}{rate / baseline:>9.1f}x{per_record:>15,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark clean_data's process pool against serial cleaning.
+
+Cleans the same synthetic scraped entries with workers=1 and with every worker
+count up to the number of CPUs, checks each result matches the serial one, and
+reports rows per second, speedup over serial and parallel efficiency
+(speedup / workers).
+
+Usage (from the Module_6 folder):
+    $ python -m benchmarks.bench_clean_parallel --rows 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+from benchmarks.synthetic import scraped_entries
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "worker"))
+from etl.update_database import clean_records  # pylint: disable=C0413,E0401
+
+
+def timed(raw_data, workers):
+    """Clean `raw_data` with `workers` processes; returns (records, seconds)."""
+    started = time.perf_counter()
+    records = clean_records(raw_data, workers)
+    return records, time.perf_counter() - started
+
+
+def main():
+    """Run the benchmark and print a scaling table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    raw_data = scraped_entries(args.rows)
+    expected, serial = timed(raw_data, 1)
+
+    print(f"{args.rows} rows, {os.cpu_count()} CPUs")
+    print(f"{'workers':<10}{'rows/s':>14}{'speedup':>10}{'efficiency':>12}")
+    print(f"{1:<10}{args.rows / serial:>14,.0f}{1:>9.1f}x{1:>11.0%}")
+    for workers in range(2, args.max_workers + 1):
+        records, seconds = timed(raw_data, workers)
+        assert records == expected, f"workers={workers} changed the output"
+        speedup = serial / seconds
+        print(f"{workers:<10}{args.rows / seconds:>14,.0f}{speedup:>9.1f}x"
+              f"{speedup / workers:>11.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark full-text comment search against an ILIKE '%...%' scan.
+
+Creates a scratch schema from db/init.sql in the database named by DATABASE_URL,
+loads synthetic applicants (1M by default) and gives each one a comment from a
+skewed vocabulary (benchmarks.synthetic.fill_comments), so some words are common
+and others rare. For each search it times comment_search.search_comments (GIN
+index, ranked, with snippets) and the query the site would otherwise run: the
+newest 20 comments matching ILIKE '%word%' for each word. The scratch schema is
+dropped at the end.
+
+Usage (from the Module_6 folder):
+    $ python -m benchmarks.bench_comment_search --rows 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+import psycopg
+from benchmarks.synthetic import COMMENT_WORDS, fill_comments, scratch_schema, fill_applicants
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "web"))
+from comment_search import search_comments  # pylint: disable=C0413,E0401
+
+# (label, full-text search, words each matched with ILIKE)
+SEARCHES = [
+    ("common word", "applied", ["applied"]),
+    ("medium word", "fellowship", ["fellowship"]),
+    ("rare word", "ombudsman", ["ombudsman"]),
+    ("two words", "funding professor", ["funding", "professor"]),
+    ("phrase", '"machine learning"', ["machine learning"]),
+    ("no match", "astrophysics", ["astrophysics"]),
+]
+
+ILIKE_SEARCH = """
+    SELECT id, comments FROM applicants WHERE {matches}
+    ORDER BY date_added DESC NULLS LAST, id DESC LIMIT %(limit)s
+"""
+
+
+def ilike_search(conn, words, limit):
+    """The newest `limit` comments containing every one of `words`; returns the rows."""
+    matches = " AND ".join(f"comments ILIKE %(w{i})s" for i in range(len(words)))
+    params = {f"w{i}": f"%{word}%" for i, word in enumerate(words)}
+    with conn.cursor() as cur:
+        cur.execute(ILIKE_SEARCH.format(matches=matches), dict(params, limit=limit))
+        return cur.fetchall()
+
+
+def best_ms(run, repeat):
+    """Best-of-`repeat` wall time of run() in milliseconds, and its last result."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, result
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    conn = psycopg.connect(os.environ["DATABASE_URL"], autocommit=True)
+    try:
+        with scratch_schema(conn, "bench_comment_search"):
+            fill_applicants(conn, args.rows)
+            # Rewriting every comment is much faster without the GIN index to update.
+            conn.execute("DROP INDEX applicants_comments_tsv_idx")
+            started = time.perf_counter()
+            fill_comments(conn)
+            print(f"Wrote {args.rows} comments ({len(COMMENT_WORDS)} word vocabulary) "
+                  f"in {time.perf_counter() - started:.1f}s")
+            started = time.perf_counter()
+            conn.execute("CREATE INDEX applicants_comments_tsv_idx ON applicants "
+                         "USING gin (comments_tsv)")
+            conn.execute("ANALYZE applicants")
+            size = conn.execute("""
+                SELECT sum(pg_relation_size(indexrelid)) FROM pg_index
+                WHERE indexrelid::regclass::text LIKE 'applicants%comments_tsv_idx'
+            """).fetchone()[0]
+            print(f"Built the GIN index in {time.perf_counter() - started:.1f}s "
+                  f"({size / 2**20:.0f} MiB)\n")
+
+            print(f"{'search':<12} {'matches':>9} {'fts ms':>9} {'ilike ms':>9}")
+            for label, text, words in SEARCHES:
+                matching = conn.execute(
+                    "SELECT count(*) FROM applicants "
+                    "WHERE comments_tsv @@ websearch_to_tsquery('english', %s)",
+                    (text, )).fetchone()[0]
+                fts_ms, _ = best_ms(lambda t=text: search_comments(conn, t, limit=args.limit),
+                                    args.repeat)
+                ilike_ms, _ = best_ms(lambda w=words: ilike_search(conn, w, args.limit),
+                                      args.repeat)
+                print(f"{label:<12} {matching:>9} {fts_ms:>9.2f} {ilike_ms:>9.2f}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark the analysis statements in run_queries with and without the index set.
+
+Creates a scratch schema from db/init.sql in the database named by DATABASE_URL,
+loads synthetic applicants (1M by default), times every full-scan statement with
+only the primary key, then builds the secondary indexes from init.sql and times
+them again. The scratch schema is dropped at the end.
+
+Usage (from the Module_6 folder):
+    $ python -m benchmarks.bench_indexes --rows 1000000 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import time
+import psycopg
+from benchmarks.synthetic import INIT_SQL, scratch_schema, fill_applicants
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "web"))
+from query_data import applicant_statements  # pylint: disable=C0413,E0401
+
+
+def secondary_indexes(conn):
+    """Names of the applicants indexes other than the unique keys."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT indexname FROM pg_indexes
+            JOIN pg_index ON indexrelid = to_regclass(indexname)
+            WHERE schemaname = current_schema() AND tablename = 'applicants'
+              AND NOT indisunique
+        """)
+        return [row[0] for row in cur.fetchall()]
+
+
+def time_statements(conn, statements, repeat):
+    """Best-of-`repeat` wall time in milliseconds for each statement."""
+    timings = {}
+    with conn.cursor() as cur:
+        for name, statement in statements.items():
+            best = float("inf")
+            for _ in range(repeat):
+                started = time.perf_counter()
+                cur.execute(statement)
+                cur.fetchall()
+                best = min(best, time.perf_counter() - started)
+            timings[name] = best * 1000
+    return timings
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    conn = psycopg.connect(os.environ["DATABASE_URL"], autocommit=True)
+    try:
+        with scratch_schema(conn, "bench_indexes"):
+            # Load into a bare table: drop the secondary indexes init.sql created.
+            with conn.cursor() as cur:
+                for index in secondary_indexes(conn):
+                    cur.execute(psycopg.sql.SQL("DROP INDEX {}").format(
+                        psycopg.sql.Identifier(index)))
+
+            started = time.perf_counter()
+            fill_applicants(conn, args.rows)
+            print(f"Loaded {args.rows} rows in {time.perf_counter() - started:.1f}s")
+
+            statements = applicant_statements()
+            without = time_statements(conn, statements, args.repeat)
+
+            # init.sql is idempotent, so re-running it only adds the missing indexes.
+            started = time.perf_counter()
+            with open(INIT_SQL, "r", encoding="utf-8") as fhand:
+                with conn.cursor() as cur:
+                    cur.execute(fhand.read())
+                    cur.execute("VACUUM ANALYZE applicants")
+            print(f"Built {len(secondary_indexes(conn))} indexes in "
+                  f"{time.perf_counter() - started:.1f}s")
+
+            with_idx = time_statements(conn, statements, args.repeat)
+
+            print(f"{'statement':<28}{'no index (ms)':>15}{'indexed (ms)':>15}{'speedup':>10}")
+            for name in statements:
+                speedup = without[name] / with_idx[name] if with_idx[name] else float("inf")
+                print(f"{name:<28}{without[name]:>15.2f}{with_idx[name]:>15.2f}"
+                      f"{speedup:>9.1f}x")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
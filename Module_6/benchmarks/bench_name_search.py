@@ -0,0 +1,129 @@
+"""
+Benchmark the university/program name autocomplete at several dictionary sizes.
+
+Creates a scratch schema from db/init.sql in the database named by DATABASE_URL
+(whose server must ship pg_trgm) and fills `applicant_names` with synthetic
+names. It replays what the autocomplete sees: every prefix of a few names as
+they are typed, plus abbreviations and typos. It runs each lookup through
+name_search.search_names `--repeat` times and reports the median, 99th
+percentile and worst latency. Each lookup is also run with index scans disabled,
+the cost of matching against every name. `--index gist` swaps the GIN trigram
+index for a GiST one to compare the two. The scratch schema is dropped at the end.
+
+The autocomplete targets a p99 under `--target-ms` (10 ms by default). Each size
+is marked "ok" or "MISSED" against it, and the run exits with status 1 if any
+size misses. The target has not been verified yet: the development server this
+was written against has no pg_trgm, and the benchmark refuses to run without it.
+
+Usage (from the Module_6 folder):
+    $ python -m benchmarks.bench_name_search --sizes 1000 5000 10000
+    $ python -m benchmarks.bench_name_search --index gist
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import psycopg
+from benchmarks.synthetic import scratch_schema, fill_names
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "web"))
+from name_search import search_names  # pylint: disable=C0413,E0401
+
+# Names typed one keystroke at a time, from the second character on.
+TYPED = [
+    ("university", "Johns Hopkins"),
+    ("university", "Georgetown University"),
+    ("university", "Carnegie Mellon"),
+    ("university", "University of Virginia"),
+    ("program", "Computer Science"),
+    ("program", "Electrical Engineering"),
+]
+
+# Whole searches: abbreviations, single words and typos.
+SEARCHES = [
+    ("university", "JHU"), ("university", "UCLA"), ("university", "MIT"),
+    ("university", "hopkins"), ("university", "Hopkns"), ("university", "Geogretown"),
+    ("university", "univ of virginia"), ("university", "texas state"),
+    ("program", "ECE"), ("program", "comp sci"), ("program", "biostatstics"),
+]
+
+
+def lookups():
+    """Every (kind, text) the benchmark searches for."""
+    typed = [(kind, name[:end]) for kind, name in TYPED for end in range(2, len(name) + 1)]
+    return [(kind, text) for kind, text in typed if text.strip() == text] + SEARCHES
+
+
+def latencies(conn, repeat):
+    """Wall time of every lookup, `repeat` times over, in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        for kind, text in lookups():
+            started = time.perf_counter()
+            search_names(conn, text, kind)
+            times.append((time.perf_counter() - started) * 1000)
+    return times
+
+
+def summary(times):
+    """Median, 99th percentile and worst of `times`."""
+    times = sorted(times)
+    return statistics.median(times), times[int(len(times) * 0.99) - 1], times[-1]
+
+
+def main():
+    """Run the benchmark and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 10000],
+                        help="universities in the dictionary (half as many programs, "
+                             "at most 2750)")
+    parser.add_argument("--index", choices=["gin", "gist"], default="gin")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--target-ms", type=float, default=10.0,
+                        help="p99 latency the autocomplete must stay under")
+    args = parser.parse_args()
+
+    conn = psycopg.connect(os.environ["DATABASE_URL"], autocommit=True)
+    try:
+        with scratch_schema(conn, "bench_name_search"):
+            if not conn.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'").fetchone():
+                sys.exit("The PostgreSQL server does not ship pg_trgm.")
+            if args.index == "gist":
+                conn.execute("DROP INDEX applicant_names_name_trgm_idx")
+                conn.execute("CREATE INDEX applicant_names_name_trgm_idx ON applicant_names "
+                             "USING gist (name gist_trgm_ops)")
+            print(f"{len(lookups())} lookups x {args.repeat}, {args.index} trigram index")
+            print(f"{'names':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} "
+                  f"{'no index p50':>13} {'p99':>8} {'target':>7}")
+            missed = []
+
+            for size in args.sizes:
+                conn.execute("TRUNCATE applicant_names")
+                fill_names(conn, size, min(size // 2, 2750))
+                names = conn.execute("SELECT count(*) FROM applicant_names").fetchone()[0]
+                latencies(conn, 1)  # Warm the cache.
+                p50, p99, worst = summary(latencies(conn, args.repeat))
+
+                conn.execute("SET enable_bitmapscan = off")
+                conn.execute("SET enable_indexscan = off")
+                try:
+                    scan_p50, scan_p99, _ = summary(latencies(conn, max(1, args.repeat // 4)))
+                finally:
+                    conn.execute("RESET enable_bitmapscan")
+                    conn.execute("RESET enable_indexscan")
+                if p99 >= args.target_ms:
+                    missed.append(names)
+                print(f"{names:>7} {p50:>8.2f} {p99:>8.2f} {worst:>8.2f} "
+                      f"{scan_p50:>13.2f} {scan_p99:>8.2f} "
+                      f"{'MISSED' if p99 >= args.target_ms else 'ok':>7}")
+    finally:
+        conn.close()
+    if missed:
+        sys.exit(f"p99 at or above {args.target_ms:g} ms for {len(missed)} dictionary sizes")
+
+
+if __name__ == "__main__":
+    main()
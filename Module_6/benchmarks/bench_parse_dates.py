@@ -0,0 +1,84 @@
+"""
+Benchmark the date_added parser used by clean_data.
+
+Builds scraped-style "Added on March 31, 2024" strings spread over a number of
+posting days, then measures rows per second for strptime (the parser clean_data
+used before), the regex parser without its cache, and the memoised parser.
+
+Usage (from the Module_6 folder):
+    $ python -m benchmarks.bench_parse_dates --rows 100000 --days 730
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "worker"))
+from etl.records import _added_on, parse_date_added  # pylint: disable=C0413,E0401
+
+
+def scraped_dates(rows, days):
+    """`rows` date_added strings cycling through `days` consecutive posting days."""
+    days_posted = [date(2023, 1, 1) + timedelta(days=d) for d in range(days)]
+    labels = [f"Added on {day:%B} {day.day}, {day.year}" for day in days_posted]
+    return [labels[(i * 7919) % days] for i in range(rows)]
+
+
+def strptime_parse(date_added):
+    """Parse with datetime.strptime on every call."""
+    try:
+        text = date_added.replace("Added on", "").strip()
+        return datetime.strptime(text, "%B %d, %Y").date().isoformat()
+    except ValueError:
+        return None
+
+
+def uncached_parse(date_added):
+    """The regex parser with its memoisation bypassed."""
+    added = _added_on.__wrapped__(date_added)
+    return added.isoformat() if added is not None else None
+
+
+def rows_per_second(parse, values, repeat):
+    """Best-of-`repeat` throughput of `parse` over `values`."""
+    best = float("inf")
+    for _ in range(repeat):
+        _added_on.cache_clear()
+        parse_date_added.cache_clear()
+        started = time.perf_counter()
+        for value in values:
+            parse(value)
+        best = min(best, time.perf_counter() - started)
+    return len(values) / best
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    values = scraped_dates(args.rows, args.days)
+    assert [strptime_parse(v) for v in values[:1000]] == \
+        [parse_date_added(v) for v in values[:1000]]
+
+    results = {
+        "strptime": rows_per_second(strptime_parse, values, args.repeat),
+        "regex (uncached)": rows_per_second(uncached_parse, values, args.repeat),
+        "regex (memoised)": rows_per_second(parse_date_added, values, args.repeat),
+    }
+
+    baseline = results["strptime"]
+    print(f"{args.rows} rows over {args.days} distinct dates")
+    print(f"{'parser':<20}{'rows/s':>14}{'speedup':>10}")
+    for name, rate in results.items():
+        print(f"{name:<20}{rate:>14,.0f}{rate / baseline:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark snapshot files against the indent=4 JSON files the pipeline wrote before.
+
+Builds LLM-extended applicant records (clean_data output plus the two
+llm-generated fields) from synthetic scraped entries, writes them once as an
+indent=4 JSON list and once as a snapshot, and reports file size, write time,
+load time and peak memory while loading (tracemalloc).
+
+Usage (from the Module_6 folder):
+    $ python -m benchmarks.bench_snapshot --rows 30000
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from benchmarks.synthetic import scraped_entries
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "worker"))
+from etl.update_database import RECORD_KEYS, clean_data  # pylint: disable=C0413,E0401
+from etl.snapshot import load_records, write_snapshot  # pylint: disable=C0413,E0401
+
+LLM_FIELDS = ("llm-generated-program", "llm-generated-university")
+
+
+def llm_records(rows):
+    """`rows` records shaped like process_data_with_llm's output."""
+    records = clean_data(scraped_entries(rows))
+    for record in records:
+        program, _, university = record["program"].partition(", ")
+        record["llm-generated-program"] = program
+        record["llm-generated-university"] = university.strip()
+    return records
+
+
+def write_json(path, records):
+    """Write records the way the pipeline did before snapshots."""
+    with open(path, "w", encoding="utf-8") as fhand:
+        json.dump(records, fhand, indent=4, ensure_ascii=False)
+
+
+def measure(write, path, records):
+    """Write then load `path`; returns (bytes, write s, load s, load peak bytes, loaded)."""
+    started = time.perf_counter()
+    write(path, records)
+    written = time.perf_counter() - started
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    loaded = load_records(path)
+    loading = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return os.path.getsize(path), written, loading, peak, loaded
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=30_000)
+    args = parser.parse_args()
+
+    records = llm_records(args.rows)
+    fields = list(RECORD_KEYS) + list(LLM_FIELDS)
+
+    with tempfile.TemporaryDirectory() as folder:
+        results = {
+            "json indent=4": measure(write_json, os.path.join(folder, "data.json"), records),
+            "snapshot": measure(lambda path, rows: write_snapshot(path, rows, fields),
+                                os.path.join(folder, "data.jsonl.gz"), records),
+        }
+
+    for name, (_, _, _, _, loaded) in results.items():
+        assert loaded == records, f"{name} did not round-trip"
+
+    print(f"{args.rows} records")
+    print(f"{'format':<16}{'size MB':>10}{'write s':>10}{'load s':>10}{'load peak MB':>14}")
+    for name, (size, written, loading, peak, _) in results.items():
+        print(f"{name:<16}{size / 1e6:>10.2f}{written:>10.2f}{loading:>10.2f}{peak / 1e6:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
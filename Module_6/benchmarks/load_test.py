@@ -0,0 +1,96 @@
+"""
+Load-test a running web app: requests per second and latency under concurrency.
+
+For each path, `--concurrency` client threads each hold one keep-alive
+connection and send GET requests back to back for `--duration` seconds. The
+report gives requests/sec, median and 95th-percentile latency and the status
+codes seen. Responses are requested with gzip, as browsers do, and 304s count
+as successes. Run it against the development server and against gunicorn
+(see web/gunicorn.conf.py) to compare them.
+
+Usage (from the Module_6 folder, with the app running):
+    $ python -m benchmarks.load_test --url http://localhost:8080 --concurrency 16
+    $ python -m benchmarks.load_test --paths / /api/analytics --duration 20
+"""
+
+import argparse
+import http.client
+import statistics
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+DEFAULT_PATHS = ["/", "/api/analytics", "/api/queries/term_count"]
+
+
+def _client(host, port, path, deadline, latencies, statuses, lock):
+    """Send GET `path` over one connection until `deadline`, recording each request."""
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    mine, codes = [], Counter()
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                conn.request("GET", path, headers={"Accept-Encoding": "gzip"})
+                response = conn.getresponse()
+                response.read()
+                codes[response.status] += 1
+            except (OSError, http.client.HTTPException) as exc:
+                codes[type(exc).__name__] += 1
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=30)
+                continue
+            mine.append(time.perf_counter() - started)
+    finally:
+        conn.close()
+    with lock:
+        latencies.extend(mine)
+        statuses.update(codes)
+
+
+def run(url, path, concurrency, duration):
+    """Load `url` + `path` with `concurrency` clients for `duration` seconds; returns a report."""
+    parts = urlsplit(url)
+    latencies, statuses, lock = [], Counter(), threading.Lock()
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=_client, args=(parts.hostname, parts.port or 80, path,
+                                                      deadline, latencies, statuses, lock))
+               for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "path": path,
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0.0,
+        "statuses": dict(statuses),
+    }
+
+
+def main():
+    """Load each path in turn and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:8080")
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(f"{args.url} with {args.concurrency} concurrent clients for {args.duration:g}s per path")
+    print(f"{'path':<28}{'requests':>10}{'req/s':>10}{'p50 (ms)':>10}{'p95 (ms)':>10}  statuses")
+    for path in args.paths:
+        report = run(args.url, path, args.concurrency, args.duration)
+        print(f"{path:<28}{report['requests']:>10}{report['rps']:>10.1f}"
+              f"{report['p50_ms']:>10.2f}{report['p95_ms']:>10.2f}  {report['statuses']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+This module builds throwaway PostgreSQL schemas filled with synthetic applicant
+rows, and synthetic scraped entries, for the query-plan tests and the benchmarks.
+
+Rows are generated inside the database with generate_series, so loading a million
+of them takes seconds. The value distributions roughly follow the real data: about
+18 terms (so one term is ~5% of rows), a quarter of statuses accepted, a few hundred
+universities including the ones named in run_queries, and three citizenship groups.
+date_added rises with the row number over eight years, as rows arrive in posting order.
+
+Functions:
+    scratch_schema(conn, name) -> context manager
+        Create schema `name` from db/init.sql, point search_path at it, drop it on exit.
+    fill_applicants(conn, rows) -> None
+        Insert `rows` synthetic applicants and refresh planner statistics.
+    fill_comments(conn) -> None
+        Give every applicant a free-text comment drawn from COMMENT_WORDS.
+    dictionary_names(kind, count) -> list
+        `count` distinct synthetic university or program names, known names first.
+    fill_names(conn, universities, programs) -> None
+        Fill the `applicant_names` dictionary with synthetic names.
+    scraped_entries(rows) -> list
+        Build `rows` dicts shaped like the output of updated_scrape, for clean_data.
+"""
+
+import os
+from contextlib import contextmanager
+import psycopg
+
+INIT_SQL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        "db", "init.sql")
+
+SYNTHETIC_INSERT = """
+    INSERT INTO applicants (
+        program, comments, date_added, url, status, term, us_or_international,
+        gpa, gre, gre_v, gre_aw, degree, llm_generated_program, llm_generated_university,
+        term_season, term_year, decision, decision_date
+    )
+    SELECT
+        prog || ', ' || univ,
+        CASE WHEN i %% 4 = 0 THEN 'Applied with ' || (i %% 9) || ' publications' END,
+        DATE '2018-01-01' + (i::bigint * 2900 / %(rows)s)::int,
+        'https://www.thegradcafe.com/result/' || i,
+        decision || ' on ' || (1 + i %% 4) || ' Mar',
+        season || ' ' || year,
+        (ARRAY['American', 'International', 'Other'])[1 + (i / 5) %% 3],
+        CASE WHEN i %% 6 <> 0 THEN 2.5 + (i %% 150) / 100.0 END,
+        CASE WHEN i %% 3 = 0 THEN 300 + (i %% 40) END,
+        CASE WHEN i %% 3 = 0 THEN 140 + (i %% 30) END,
+        CASE WHEN i %% 3 = 0 THEN 3 + (i %% 6) / 2.0 END,
+        (ARRAY['Masters', 'PhD', 'Other'])[1 + (i / 11) %% 3],
+        prog,
+        univ,
+        season::term_season,
+        year,
+        decision::decision_kind,
+        make_date(year - 1, 3, 1 + i %% 4)
+    FROM (
+        SELECT
+            i,
+            (ARRAY['Accepted', 'Rejected', 'Wait listed', 'Interview'])[1 + i %% 4] AS decision,
+            (ARRAY['Fall', 'Spring'])[1 + (i / 7) %% 2] AS season,
+            2018 + (i / 3) %% 9 AS year,
+            CASE i %% 300
+                WHEN 0 THEN 'Johns Hopkins University'
+                WHEN 1 THEN 'Georgetown University'
+                WHEN 2 THEN 'University of Virginia'
+                WHEN 3 THEN 'Virginia Tech'
+                ELSE 'University ' || (i %% 300)
+            END AS univ,
+            CASE WHEN i %% 13 = 0 THEN 'Computer Science'
+                 ELSE 'Program ' || (i %% 60) END AS prog
+        FROM generate_series(1, %(rows)s) AS i
+    ) AS synthetic
+"""
+
+
+@contextmanager
+def scratch_schema(conn, name):
+    """
+    Create schema `name` from db/init.sql and make it the connection's search_path.
+    `conn` must be in autocommit mode. The schema is dropped on exit.
+    """
+    with open(INIT_SQL, "r", encoding="utf-8") as fhand:
+        init_sql = fhand.read()
+
+    schema = psycopg.sql.Identifier(name)
+    with conn.cursor() as cur:
+        cur.execute(psycopg.sql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(schema))
+        cur.execute(psycopg.sql.SQL("CREATE SCHEMA {}").format(schema))
+        cur.execute(psycopg.sql.SQL("SET search_path TO {}").format(schema))
+        cur.execute(init_sql)
+    try:
+        yield conn
+    finally:
+        with conn.cursor() as cur:
+            cur.execute(psycopg.sql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(schema))
+            cur.execute("SET search_path TO DEFAULT")
+
+
+def fill_applicants(conn, rows):
+    """Insert `rows` synthetic applicants, then VACUUM ANALYZE (needs autocommit)."""
+    with conn.cursor() as cur:
+        cur.execute(SYNTHETIC_INSERT, {"rows": rows})
+        cur.execute("VACUUM ANALYZE applicants")
+
+
+# Words for synthetic comments, most frequent first: each word is drawn from an
+# exponential distribution over the list, so the first words appear in most
+# comments, those around 40th in about one in ten, and the last ones in a few
+# hundred per million.
+COMMENT_WORDS = [
+    "applied", "program", "funding", "professor", "interview", "email", "research",
+    "offer", "stipend", "decision", "portal", "lab", "visit", "waitlist", "advisor",
+    "rejected", "accepted", "admitted", "full", "assistantship", "teaching", "cohort",
+    "gre", "gpa", "letters", "recommendation", "statement", "purpose", "deadline",
+    "rotation", "faculty", "department", "campus", "housing", "visa", "international",
+    "tuition", "waiver", "fellowship", "scholarship", "publications", "conference",
+    "paper", "thesis", "undergrad", "masters", "phd", "industry", "internship",
+    "startup", "machine", "learning", "biology", "chemistry", "physics", "economics",
+    "statistics", "neuroscience", "linguistics", "history", "philosophy", "sociology",
+    "unofficial", "official", "notification", "informal", "phone", "zoom", "skype",
+    "weekend", "recruitment", "dinner", "flight", "hotel", "reimbursed", "travel",
+    "excited", "nervous", "relieved", "disappointed", "surprised", "grateful", "finally",
+    "congrats", "luck", "everyone", "reddit", "forum", "spreadsheet", "refreshing",
+    "anxious", "waiting", "months", "weeks", "silence", "ghosted", "declined",
+    "withdrew", "deferred", "reconsidered", "appealed", "negotiated", "matched",
+    "competing", "counteroffer", "relocation", "childcare", "partner", "spouse",
+    "bursary", "endowment", "provost", "dean", "ombudsman", "sabbatical", "emeritus",
+]
+
+SYNTHETIC_COMMENTS = """
+    UPDATE applicants SET comments = (
+        SELECT string_agg(
+            words[least(1 + floor(-ln(1 - random()) * 15)::int, array_length(words, 1))], ' ')
+        -- Referencing the row makes the subquery run once per row.
+        FROM generate_series(1, 6 + applicants.id %% 30),
+             (SELECT %(words)s::text[] AS words) AS vocabulary
+    )
+"""
+
+
+def fill_comments(conn):
+    """
+    Replace every applicant's comment with 6 to 35 words from COMMENT_WORDS, then
+    VACUUM ANALYZE (needs autocommit). The draw is seeded, so it is repeatable.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT setseed(0.42)")
+        cur.execute(SYNTHETIC_COMMENTS, {"words": COMMENT_WORDS})
+        cur.execute("VACUUM ANALYZE applicants")
+
+
+# Parts of synthetic dictionary names. Universities combine places with the usual
+# naming patterns ("University of Ohio", "Texas State University", "University of
+# Utah, Denver"); programs combine fields ("Applied Physics", "Law and Economics").
+PLACES = [
+    "Alabama", "Arizona", "Arkansas", "Boston", "California", "Carolina", "Chicago",
+    "Cincinnati", "Colorado", "Columbia", "Connecticut", "Dallas", "Delaware", "Denver",
+    "Florida", "Georgia", "Hawaii", "Houston", "Idaho", "Illinois", "Indiana", "Iowa",
+    "Kansas", "Kentucky", "Louisiana", "Maine", "Maryland", "Massachusetts", "Memphis",
+    "Miami", "Michigan", "Minnesota", "Mississippi", "Missouri", "Montana", "Nebraska",
+    "Nevada", "New Hampshire", "New Jersey", "New Mexico", "New York", "Ohio", "Oklahoma",
+    "Oregon", "Pennsylvania", "Pittsburgh", "Rhode Island", "Rochester", "San Diego",
+    "Seattle", "Tennessee", "Texas", "Toronto", "Utah", "Vermont", "Washington",
+    "Wisconsin", "Wyoming", "Oxford", "Cambridge", "Edinburgh", "Manchester", "Melbourne",
+    "Sydney", "Tokyo", "Zurich", "Delhi", "Seoul", "Montreal", "Vancouver",
+]
+UNIVERSITY_PATTERNS = [
+    "University of {}", "{} State University", "{} Institute of Technology", "{} College",
+    "{} University", "{} Polytechnic Institute", "Northern {} University",
+    "{} School of Medicine", "University of {}, {}", "{} University at {}",
+]
+FIELDS = [
+    "Computer Science", "Physics", "Chemistry", "Biology", "Mathematics", "Statistics",
+    "Economics", "History", "Philosophy", "Psychology", "Sociology", "Linguistics",
+    "Political Science", "Anthropology", "Neuroscience", "Public Health", "Epidemiology",
+    "Biostatistics", "Mechanical Engineering", "Civil Engineering", "Chemical Engineering",
+    "Electrical Engineering", "Materials Science", "Aerospace Engineering", "Architecture",
+    "Urban Planning", "Education", "Law", "Business Administration", "Finance",
+    "Accounting", "Marketing", "Nursing", "Pharmacology", "Genetics", "Ecology",
+    "Geology", "Oceanography", "Astronomy", "Data Science", "Information Science",
+    "Library Science", "Social Work", "Music", "Art History", "Film Studies",
+    "Comparative Literature", "English", "Classics", "Religious Studies",
+]
+PROGRAM_PATTERNS = [
+    "{}", "Applied {}", "Computational {}", "{} Education", "{} Policy", "Clinical {}",
+    "{} and {}",
+]
+KNOWN_NAMES = {
+    "university": ["Johns Hopkins University", "Georgetown University",
+                   "University of Virginia", "Virginia Tech",
+                   "Massachusetts Institute of Technology",
+                   "University of California, Los Angeles", "Carnegie Mellon University"],
+    "program": ["Computer Science", "Electrical and Computer Engineering"],
+}
+
+
+def dictionary_names(kind, count):
+    """
+    `count` distinct synthetic names of `kind` ("university" or "program"): the
+    KNOWN_NAMES first, then names built from the patterns, one-word patterns first.
+    """
+    words = PLACES if kind == "university" else FIELDS
+    patterns = UNIVERSITY_PATTERNS if kind == "university" else PROGRAM_PATTERNS
+    names = dict.fromkeys(KNOWN_NAMES[kind])
+    for pattern in sorted(patterns, key=lambda pattern: pattern.count("{}")):
+        if pattern.count("{}") == 1:
+            names.update(dict.fromkeys(pattern.format(word) for word in words))
+        else:
+            names.update(dict.fromkeys(pattern.format(first, second)
+                                       for first in words for second in words
+                                       if first != second))
+        if len(names) >= count:
+            break
+    if len(names) < count:
+        raise ValueError(f"at most {len(names)} synthetic {kind} names")
+    return list(names)[:count]
+
+
+def fill_names(conn, universities, programs):
+    """
+    Fill `applicant_names` with synthetic names, most applicants on the first
+    names (a Zipf-like 1 + 5000 / rank), then VACUUM ANALYZE (needs autocommit).
+    """
+    with conn.cursor() as cur:
+        with cur.copy("COPY applicant_names (kind, name, n) FROM STDIN") as copy:
+            for kind, count in (("university", universities), ("program", programs)):
+                for rank, name in enumerate(dictionary_names(kind, count), 1):
+                    copy.write_row((kind, name, 1 + 5000 // rank))
+        cur.execute("VACUUM ANALYZE applicant_names")
+
+
+def scraped_entries(rows):
+    """
+    Build `rows` raw entries shaped like updated_scrape's output: school names with
+    stray digits, HTML in some comments, old-style ("F18") and current terms, and
+    GPA/GRE badges on a share of the rows.
+    """
+    entries = []
+    for i in range(rows):
+        entry = {
+            "school": f"University {i % 300}" if i % 5 else f"Tech {i % 7} Institute",
+            "program": "Computer Science" if i % 13 == 0 else f"Program {i % 60}",
+            "degree": ("Masters", "PhD", "Other")[(i // 11) % 3],
+            "date_added": f"Added on March {1 + i % 28}, {2018 + (i // 3) % 8}",
+            "status": ("Accepted on 1 Mar", "Rejected on 2 Mar", "Wait listed on 3 Mar",
+                       "Interview on 4 Mar")[i % 4],
+            "link": f"https://www.thegradcafe.com/result/{i}",
+            "semester_year": (f"F{18 + (i // 3) % 8}" if i % 10 == 0 else
+                              f"{('Fall', 'Spring')[(i // 7) % 2]} {2018 + (i // 3) % 9}"),
+            "citizenship": ("American", "International", "Other")[(i // 5) % 3],
+            "comments": (f"<p>Applied with <b>{i % 9}</b> publications</p>"
+                         if i % 4 == 0 else None),
+        }
+        if i % 6:
+            entry["GPA"] = f"{2.5 + (i % 150) / 100:.2f}"
+        if i % 3 == 0:
+            entry["GRE"] = str(300 + i % 40)
+            entry["GRE_V"] = str(140 + i % 30)
+            entry["GRE_AW"] = f"{3 + (i % 6) / 2:.1f}"
+        entries.append(entry)
+    return entries
@@ -1,9 +1,32 @@
 
+-- Parsed forms of term ("Fall 2025") and status ("Accepted on 1 Mar"), filled by
+-- the cleaning stage so filters compare enums and integers instead of strings.
+DO $$ BEGIN
+    CREATE TYPE term_season AS ENUM ('Winter', 'Spring', 'Summer', 'Fall');
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
+DO $$ BEGIN
+    CREATE TYPE decision_kind AS ENUM ('Accepted', 'Rejected', 'Wait listed', 'Interview', 'Other');
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
+
+-- Applicants are range-partitioned by parsed term year, one partition per year,
+-- so term-filtered queries only read the matching year. Rows whose term could
+-- not be parsed (or whose year has no partition yet) land in applicants_default;
+-- etl.partitions.ensure_partitions carves new years out of it. A primary key
+-- would have to include term_year, which may be NULL, so (id, term_year) is a
+-- unique key instead (NULLs equal): no id repeats within a year, and the id
+-- sequence keeps ids apart across years.
+-- A scraped result is identified by its url (which ends in the GradCafe result
+-- ID) and term_year; the worker upserts on that key and only rewrites a row when
+-- row_hash, a digest of its scraped content, changes (see worker/etl/ingest.py).
+-- Results scraped without a link have a NULL url and are keyed by row_hash and
+-- term_year instead (see etl.partitions.create_result_keys).
 CREATE TABLE IF NOT EXISTS applicants (
-    id SERIAL PRIMARY KEY,                     -- Unique identifier for each applicant
+    id SERIAL,                                 -- Unique identifier for each applicant
     program VARCHAR(255) NOT NULL,            -- Program name
     comments TEXT,                             -- Additional comments
-    date_added TIMESTAMP DEFAULT NOW(),       -- Timestamp of addition
+    date_added DATE DEFAULT CURRENT_DATE,     -- Date the entry was posted
     url VARCHAR(255),                          -- URL related to the applicant
     status VARCHAR(255),                       -- Current application status
     term VARCHAR(255),                         -- Term of application (e.g., Fall 2025)
@@ -14,6 +37,158 @@ CREATE TABLE IF NOT EXISTS applicants (
     gre_aw FLOAT CHECK (gre_aw >= 0),          -- GRE analytical writing score
     degree VARCHAR(100),                       -- Degree type (e.g., Masters, PhD)
     llm_generated_program VARCHAR(255),        -- LLM generated program name
-    llm_generated_university VARCHAR(255)     -- LLM generated university name
+    llm_generated_university VARCHAR(255),    -- LLM generated university name
+    term_season term_season,                   -- Season parsed from term
+    term_year SMALLINT,                        -- Year parsed from term
+    decision decision_kind,                    -- Decision parsed from status
+    decision_date DATE,                        -- Decision date parsed from status
+    row_hash BYTEA,                            -- Digest of the scraped content
+    comments_tsv TSVECTOR GENERATED ALWAYS AS
+        (to_tsvector('english', coalesce(comments, ''))) STORED,  -- Searchable comments
+    UNIQUE NULLS NOT DISTINCT (id, term_year)
+) PARTITION BY RANGE (term_year);
+
+CREATE UNIQUE INDEX IF NOT EXISTS applicants_url_term_year_key
+    ON applicants (url, term_year) NULLS NOT DISTINCT
+    WHERE url IS NOT NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS applicants_unlinked_key
+    ON applicants (row_hash, term_year) NULLS NOT DISTINCT
+    WHERE url IS NULL AND row_hash IS NOT NULL;
+
+CREATE TABLE IF NOT EXISTS applicants_default PARTITION OF applicants DEFAULT;
+DO $$ BEGIN
+    FOR y IN 2018..2027 LOOP
+        EXECUTE format('CREATE TABLE IF NOT EXISTS %I PARTITION OF applicants '
+                       'FOR VALUES FROM (%s) TO (%s)', 'applicants_y' || y, y, y + 1);
+    END LOOP;
+END $$;
+
+
+-- Index set for the analysis predicates in run_queries (see also create_indexes
+-- in db/load_data.py). Term and decision filters use the parsed typed columns.
+CREATE INDEX IF NOT EXISTS applicants_term_decision_idx
+    ON applicants (term_year, term_season, decision);
+CREATE INDEX IF NOT EXISTS applicants_university_program_degree_idx
+    ON applicants (llm_generated_university, llm_generated_program, degree)
+    INCLUDE (decision);
+CREATE INDEX IF NOT EXISTS applicants_citizenship_idx
+    ON applicants (us_or_international) INCLUDE (gpa);
+
+-- Keyset pagination of /api/applicants on (date_added, id), newest first and
+-- undated rows last, with and without the university filter, and its exports
+-- (see web/applicant_api.py). Built in that order: a backward scan of an
+-- ascending index would put the NULL dates first and need a sort. The first
+-- also serves date_added range queries, replacing the BRIN index
+-- applicants_date_added_brin, which the planner no longer chose.
+CREATE INDEX IF NOT EXISTS applicants_date_added_id_idx
+    ON applicants (date_added DESC NULLS LAST, id DESC);
+CREATE INDEX IF NOT EXISTS applicants_university_date_added_idx
+    ON applicants (llm_generated_university, date_added DESC NULLS LAST, id DESC);
+
+-- Full-text search over comments (see web/comment_search.py). comments_tsv is
+-- generated from comments, so every insert and update keeps it current.
+CREATE INDEX IF NOT EXISTS applicants_comments_tsv_idx
+    ON applicants USING gin (comments_tsv);
+
+-- Partial indexes for the hot subsets: accepted applicants (GPA averages by
+-- term and school) and the current admissions cycle.
+CREATE INDEX IF NOT EXISTS applicants_accepted_idx
+    ON applicants (term_year, term_season, llm_generated_university) INCLUDE (gpa)
+    WHERE decision = 'Accepted';
+CREATE INDEX IF NOT EXISTS applicants_fall_2025_idx
+    ON applicants (llm_generated_university) INCLUDE (decision, gpa)
+    WHERE term_season = 'Fall' AND term_year = 2025;
+
+-- Running aggregates of applicants, maintained incrementally by the worker
+-- (see worker/etl/aggregates.py). One row per combination of the
+-- low-cardinality dimensions the analysis queries filter on; the university
+-- and program questions use the indexes above instead. Sums/counts only
+-- include metric values under the validity thresholds used by run_queries
+-- (gpa_all_* has none).
+CREATE TABLE IF NOT EXISTS applicant_rollup (
+    term_season term_season,
+    term_year SMALLINT,
+    us_or_international TEXT,
+    is_accepted BOOLEAN NOT NULL,
+    degree TEXT,
+    n BIGINT NOT NULL DEFAULT 0,
+    gpa_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    gpa_n BIGINT NOT NULL DEFAULT 0,
+    gpa_all_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    gpa_all_n BIGINT NOT NULL DEFAULT 0,
+    gre_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    gre_n BIGINT NOT NULL DEFAULT 0,
+    gre_v_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    gre_v_n BIGINT NOT NULL DEFAULT 0,
+    gre_aw_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    gre_aw_n BIGINT NOT NULL DEFAULT 0,
+    UNIQUE NULLS NOT DISTINCT (term_season, term_year, us_or_international, is_accepted,
+                               degree)
+);
+
+-- Distinct standardized university and program names with their applicant
+-- counts, kept exact by the worker on every ingest (worker/etl/names.py) and
+-- searched by the autocomplete at /api/names. acronym holds the initials of the
+-- significant words ("Johns Hopkins University" -> "JHU"), which trigrams cannot
+-- match; the trigram index needs pg_trgm, created below when the server ships it.
+CREATE TABLE IF NOT EXISTS applicant_names (
+    kind TEXT NOT NULL CHECK (kind IN ('university', 'program')),
+    name TEXT NOT NULL,
+    n BIGINT NOT NULL DEFAULT 0,
+    acronym TEXT GENERATED ALWAYS AS (upper(regexp_replace(regexp_replace(
+        regexp_replace(name, '\m(of|the|and|at|in|for|de)\M', '', 'gi'),
+        '(\w)\w*', '\1', 'g'), '\W', '', 'g'))) STORED,
+    PRIMARY KEY (kind, name)
+);
+CREATE INDEX IF NOT EXISTS applicant_names_acronym_idx
+    ON applicant_names (kind, acronym text_pattern_ops);
+DO $$ BEGIN
+    IF EXISTS (SELECT FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        CREATE INDEX IF NOT EXISTS applicant_names_name_trgm_idx
+            ON applicant_names USING gin (name gin_trgm_ops);
+    ELSE
+        RAISE NOTICE 'pg_trgm is not available: /api/names will answer 503';
+    END IF;
+END $$;
+
+-- Version of the data in applicants: a single-row counter the worker bumps in
+-- the same transaction as every ingest that writes rows (worker/etl/data_version.py).
+-- The web app's page cache compares against it to tell when a page is stale.
+CREATE TABLE IF NOT EXISTS data_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+INSERT INTO data_version DEFAULT VALUES ON CONFLICT DO NOTHING;
+
+-- Shared tier of the web page cache (web/page_cache.py, PAGE_CACHE_SHARED=postgres):
+-- rendered pages by key, tagged with the data version they were rendered from.
+-- Unlogged, since every entry can be rendered again.
+CREATE UNLOGGED TABLE IF NOT EXISTS page_cache (
+    key TEXT PRIMARY KEY,
+    version BIGINT NOT NULL,
+    etag TEXT NOT NULL,
+    last_modified TIMESTAMPTZ NOT NULL,
+    body BYTEA NOT NULL
 );
 
+-- Queued tasks and their progress (web/task_registry.py registers them, and
+-- worker/etl/task_registry.py records status and progress counts as they run).
+-- At most one task of each kind is queued or running: a duplicate request joins
+-- the active task, and a duplicate message is marked coalesced into it.
+CREATE TABLE IF NOT EXISTS tasks (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued'
+        CHECK (status IN ('queued', 'running', 'succeeded', 'failed', 'coalesced')),
+    progress JSONB NOT NULL DEFAULT '{}',
+    error TEXT,
+    coalesced_into UUID,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    started_at TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE UNIQUE INDEX IF NOT EXISTS tasks_single_flight ON tasks (kind)
+    WHERE status IN ('queued', 'running');
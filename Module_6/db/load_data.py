@@ -11,20 +11,35 @@ Usage:
     python src/load_data.py
 
 Input:
-    JSON file (e.g., 'llm_extend_applicant_data.json') with a list of applicant entries.
+    JSON file (e.g., 'llm_extend_applicant_data.json') with a list of applicant entries,
+    or a snapshot of them (e.g. 'applicant_data.jsonl.gz', see worker/etl/snapshot.py).
 
 Each entry should include:
     - program, comments, date_added, url, status, term, US/International,
       GPA, GRE, GRE_V, GRE_AW, Degree, llm-generated-program, llm-generated-university
+    - optionally term_season, term_year, decision, decision_date (parsed from term and
+      status here when absent)
 """
 
 import os
-import json
 import sys
 import psycopg
 from pathlib import Path
 from dotenv import load_dotenv
 
+# The term/status parsers, row_hash, the snapshot reader and the DDL of the
+# partitions, result keys, rollup, name dictionary and data version are the
+# worker's own (worker/etl), so seeded rows and tables match what the worker
+# writes and maintains afterwards.
+# The loader's image copies the etl package next to this file (see db/Dockerfile).
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "worker"))
+from etl.records import (  # pylint: disable=C0413,E0401
+    UPSERT_COLUMNS, parse_date_added, parse_decision, parse_term, row_hash)
+from etl.snapshot import load_records  # pylint: disable=C0413,E0401
+from etl.partitions import (  # pylint: disable=C0413,E0401
+    DEFAULT_PARTITION, create_result_keys, ensure_partitions)
+from etl import aggregates, names, data_version  # pylint: disable=C0413,E0401
+
 # Load environment variables from .env file (for local development)
 # Look for .env in the project root directory
 env_path = Path(__file__).parent.parent / '.env'
@@ -44,48 +59,20 @@ def find_recent():
         # Create a cursor object.
         with conn.cursor() as cur:  # pylint: disable=E1101
 
-            # Determine total number of rows in db for limit setting
-            count_query = psycopg.sql.SQL(
-                "SELECT COUNT(*) FROM {table}").format(
-                    table=psycopg.sql.Identifier("applicants"))
-            cur.execute(count_query)
-            row = cur.fetchone()
-            total_rows = row[0] if row else 0
-            row_limit = total_rows + 100
-
-            # Query to get all URLs from the database.
-            url_query = psycopg.sql.SQL("""
-                SELECT {url_col}
+            # Largest result ID (the number ending each URL), computed in one pass on
+            # the server rather than by fetching every URL; None when there are none.
+            recent_query = psycopg.sql.SQL("""
+                SELECT COALESCE(MAX(substring({url_col} FROM {id_pattern})::bigint), 0)
                 FROM {table}
                 WHERE {url_col} IS NOT NULL
-                LIMIT {limit}
+                HAVING COUNT(*) > 0
             """).format(url_col=psycopg.sql.Identifier("url"),
-                        table=psycopg.sql.Identifier("applicants"),
-                        limit=psycopg.sql.Literal(row_limit))
-
-            cur.execute(url_query)
-            urls = cur.fetchall()
-
-            if not urls:
-                return None
-
-            max_number = 0
-            recent_url = None  # pylint: disable=W0612
-
-            # Extract number from each URL and find the maximum.
-            for (url, ) in urls:
-                try:
-                    url_parts = url.split('/')
-                    if url_parts:
-                        number = int(url_parts[-1])
-                        if number > max_number:
-                            max_number = number
-                            recent_url = url
-                except (ValueError, IndexError):
-                    # Skip URLs that don't have a valid number at the end.
-                    continue
-
-            return int(max_number)
+                        id_pattern=psycopg.sql.Literal("/([0-9]+)$"),
+                        table=psycopg.sql.Identifier("applicants"))
+
+            cur.execute(recent_query)
+            row = cur.fetchone()
+            return int(row[0]) if row else None
     finally:
         conn.close() 
 
@@ -121,6 +108,75 @@ def update_watermark(source, last_seen):
 
 
 
+# Terms that get their own partial index (the current admissions cycle).
+HOT_TERMS = [("Fall", 2025)]
+
+
+def create_typed_columns(cur):
+    """Create the enum types behind the parsed term and decision columns (mirrors db/init.sql)."""
+    cur.execute("""
+        DO $$ BEGIN
+            CREATE TYPE term_season AS ENUM ('Winter', 'Spring', 'Summer', 'Fall');
+        EXCEPTION WHEN duplicate_object THEN NULL;
+        END $$
+    """)
+    cur.execute("""
+        DO $$ BEGIN
+            CREATE TYPE decision_kind AS ENUM (
+                'Accepted', 'Rejected', 'Wait listed', 'Interview', 'Other');
+        EXCEPTION WHEN duplicate_object THEN NULL;
+        END $$
+    """)
+
+
+def create_indexes(cur):
+    """
+    Create the index set for the analysis predicates (mirrors db/init.sql).
+    Called after the bulk insert, since building indexes once is cheaper than
+    maintaining them row by row during the load.
+    """
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS applicants_term_decision_idx
+            ON applicants (term_year, term_season, decision)
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS applicants_university_program_degree_idx
+            ON applicants (llm_generated_university, llm_generated_program, degree)
+            INCLUDE (decision)
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS applicants_citizenship_idx
+            ON applicants (us_or_international) INCLUDE (gpa)
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS applicants_date_added_id_idx
+            ON applicants (date_added DESC NULLS LAST, id DESC)
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS applicants_university_date_added_idx
+            ON applicants (llm_generated_university, date_added DESC NULLS LAST, id DESC)
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS applicants_comments_tsv_idx
+            ON applicants USING gin (comments_tsv)
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS applicants_accepted_idx
+            ON applicants (term_year, term_season, llm_generated_university) INCLUDE (gpa)
+            WHERE decision = 'Accepted'
+    """)
+    for season, year in HOT_TERMS:
+        index_name = f"applicants_{season.lower()}_{year}_idx"
+        cur.execute(psycopg.sql.SQL("""
+            CREATE INDEX IF NOT EXISTS {index}
+                ON applicants (llm_generated_university) INCLUDE (decision, gpa)
+                WHERE term_season = {season} AND term_year = {year}
+        """).format(index=psycopg.sql.Identifier(index_name),
+                    season=psycopg.sql.Literal(season),
+                    year=psycopg.sql.Literal(year)))
+    cur.execute("ANALYZE applicants")
+
+
 def data_to_base(file_name: str):  # pylint: disable=R0914
     """
     Function to add applicant data from json file to database
@@ -135,15 +191,16 @@ def data_to_base(file_name: str):  # pylint: disable=R0914
                 table=psycopg.sql.Identifier("applicants")
             )
             cur.execute(drop_table_query)
+            create_typed_columns(cur)
 
             # Create table if needed, statement and execution separated.
             create_table_query = psycopg.sql.SQL("""
                 CREATE TABLE IF NOT EXISTS {table} (
-                    id int GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+                    id SERIAL,
                     program TEXT,
                     comments TEXT,
                     date_added date,
-                    url TEXT UNIQUE,
+                    url TEXT,
                     status TEXT,
                     term TEXT,
                     us_or_international TEXT,
@@ -153,41 +210,61 @@ def data_to_base(file_name: str):  # pylint: disable=R0914
                     gre_aw real,
                     degree TEXT,
                     llm_generated_program TEXT,
-                    llm_generated_university TEXT
-                )
+                    llm_generated_university TEXT,
+                    term_season term_season,
+                    term_year smallint,
+                    decision decision_kind,
+                    decision_date date,
+                    row_hash bytea,
+                    comments_tsv tsvector GENERATED ALWAYS AS
+                        (to_tsvector('english', coalesce(comments, ''))) STORED,
+                    UNIQUE NULLS NOT DISTINCT (id, term_year)
+                ) PARTITION BY RANGE (term_year)
             """).format(
                 table=psycopg.sql.Identifier("applicants")
             )
             cur.execute(create_table_query)
+            # Before the load, so a result repeated in the seed file is stored once.
+            create_result_keys(cur)
+
+            # Load the seed data (a JSON list or a .jsonl.gz snapshot).
+            data = load_records(file_name)
 
-            # Load json data.
-            with open(file_name, 'r', encoding="utf-8") as fhand:
-                data = json.load(fhand)
+            # Insert in posting order so the table's physical order follows
+            # date_added, which keeps date-ordered index scans sequential.
+            data.sort(key=lambda e: parse_date_added(e.get("date_added")) or "")
 
             # Prepare data for insertion.
-            columns = [
-                "program", "comments", "date_added", "url", "status", "term", 
-                "us_or_international", "gpa", "gre", "gre_v", "gre_aw", "degree",
-                "llm_generated_program", "llm_generated_university"
-            ]
+            columns = UPSERT_COLUMNS + ["row_hash"]
 
             # Build the SQL insert query using sql.Identifier and sql.Placeholder.
             insert_query = psycopg.sql.SQL("""
                 INSERT INTO {table} ({fields})
                 VALUES ({placeholders})
-                ON CONFLICT (url) DO NOTHING
+                ON CONFLICT DO NOTHING
             """).format(
                 table=psycopg.sql.Identifier("applicants"),
                 fields=psycopg.sql.SQL(", ").join(psycopg.sql.Identifier(col) for col in columns),
                 placeholders=psycopg.sql.SQL(", ").join(psycopg.sql.Placeholder() for _ in columns)
             )
 
-            # Insert each entry.
+            # Older seed files predate the typed fields; parse them here.
+            rows = []
             for entry in data:
+                if "term_year" in entry:
+                    season, year = entry.get("term_season"), entry.get("term_year")
+                else:
+                    season, year = parse_term(entry.get("term"))
+                if "decision" in entry:
+                    decision, decided = entry.get("decision"), entry.get("decision_date")
+                else:
+                    decision, decided = parse_decision(entry.get("status"),
+                                                       entry.get("date_added"))
+
                 values = (
                     entry.get("program") or None,
                     entry.get("comments") or None,
-                    entry.get("date_added") or None,
+                    parse_date_added(entry.get("date_added")),
                     entry.get("url") or None,
                     entry.get("status") or None,
                     entry.get("term") or None,
@@ -198,11 +275,32 @@ def data_to_base(file_name: str):  # pylint: disable=R0914
                     float(entry["GRE_AW"]) if entry.get("GRE_AW") else None,
                     entry.get("Degree") or None,
                     entry.get("llm-generated-program") or None,
-                    entry.get("llm-generated-university") or None
+                    entry.get("llm-generated-university") or None,
+                    season,
+                    year,
+                    decision,
+                    decided
                 )
+                rows.append(values + (row_hash(values), ))
+
+            # One partition per term year found in the data, so inserts route to it.
+            cur.execute(psycopg.sql.SQL("CREATE TABLE {} PARTITION OF applicants DEFAULT")
+                        .format(psycopg.sql.Identifier(DEFAULT_PARTITION)))
+            ensure_partitions(cur, {row[columns.index("term_year")] for row in rows})
 
+            # Insert each entry.
+            for values in rows:
                 cur.execute(insert_query, values)
 
+            # Index the loaded rows, then bring the aggregates in line with them.
+            create_indexes(cur)
+            aggregates.create_rollup_table(cur)
+            aggregates.rebuild(cur)
+            names.create_name_table(cur)
+            names.rebuild(cur)
+            data_version.create_data_version(cur)
+            data_version.bump_data_version(cur)
+
             # Commit the changes to the database.
             conn.commit()  # pylint: disable=E1101
     finally:
@@ -0,0 +1,23 @@
+"""Shared pytest configuration: make the web and worker services importable."""
+
+import importlib
+import os
+import sys
+
+import pytest
+
+MODULE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The services import their modules flat (e.g. `from query_data import ...`),
+# as they do inside their own containers.
+sys.path.insert(0, os.path.join(MODULE_DIR, "web"))
+sys.path.insert(0, os.path.join(MODULE_DIR, "worker"))
+
+# Synthetic data helpers shared with the benchmarks.
+sys.path.insert(0, MODULE_DIR)
+
+
+@pytest.fixture(params=["query_data", "etl.query_data"])
+def query_module(request):
+    """Each copy of query_data: the web's and the one the worker ships."""
+    return importlib.import_module(request.param)
@@ -0,0 +1,129 @@
+"""Tests for the running aggregates kept in applicant_rollup."""
+
+import pytest
+
+
+class MockCursor:
+    """Cursor that records statements and replays canned rows."""
+
+    def __init__(self, rows=None):
+        self.rows = list(rows or [])
+        self.executed = []
+
+    def execute(self, query, params=None):
+        self.executed.append((query, params))
+
+    def fetchone(self):
+        return self.rows.pop(0) if self.rows else None
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+class MockConnection:
+    """Pooled connection handing out a single MockCursor."""
+
+    def __init__(self, cursor):
+        self.cursor_obj = cursor
+        self.returned = False
+
+    def cursor(self):
+        return self.cursor_obj
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.returned = True
+
+
+@pytest.mark.db
+def test_apply_delta_upserts_new_ids():
+    """New rows are folded in with a single grouped upsert keyed on the dimensions."""
+    from etl import aggregates
+
+    cur = MockCursor()
+    aggregates.apply_delta(cur, [7, 8, 9])
+
+    assert len(cur.executed) == 1
+    query, params = cur.executed[0]
+    assert params == ([7, 8, 9], )
+    assert "ON CONFLICT" in repr(query)
+    assert "ANY(%s)" in repr(query)
+
+
+@pytest.mark.db
+def test_apply_delta_skips_empty_batch():
+    """An empty batch does not touch the database."""
+    from etl import aggregates
+
+    cur = MockCursor()
+    aggregates.apply_delta(cur, [])
+    assert not cur.executed
+
+
+@pytest.mark.db
+def test_check_consistency_reports_drift():
+    """Groups that differ from the full recompute are reported with their side."""
+    from etl import aggregates
+
+    cur = MockCursor(rows=[("rollup", "Fall", 2025, "American", True, "PhD", 3)])
+    drift = aggregates.check_consistency(MockConnection(cur))
+    assert drift == [("rollup", ("Fall", 2025, "American", True, "PhD", 3))]
+
+
+@pytest.mark.analysis
+def test_run_queries_reads_rollup(query_module, monkeypatch):
+    """run_queries formats answers computed from the rollup by default."""
+    query_data = query_module
+
+    cur = MockCursor(rows=[(12, 40.0, 3.5, 320.0, 160.0, 4.0, 3.6, 25.0, 3.7),
+                           (2, ), (1, ), ("MIT", 5), (3.8, 3.6)])
+    conn = MockConnection(cur)
+    monkeypatch.setattr(query_data, "get_db_connection", lambda: conn)
+
+    results = query_data.run_queries()
+
+    assert results["1"][1] == 12
+    assert results["2"][1] == 40.0
+    assert results["9"][1] == "MIT"
+    assert results["10"][1].startswith("The University of Virginia")
+    assert results["7"][1] == 2
+    assert "applicant_rollup" in repr(cur.executed[0][0])
+    assert all("applicant_rollup" not in repr(q) for q, _ in cur.executed[1:])
+    assert conn.returned
+
+
+@pytest.mark.analysis
+def test_run_queries_rejects_unknown_source(query_module, monkeypatch):
+    """An unknown source is an error rather than a silent fallback."""
+    query_data = query_module
+
+    conn = MockConnection(MockCursor())
+    monkeypatch.setattr(query_data, "get_db_connection", lambda: conn)
+
+    with pytest.raises(ValueError):
+        query_data.run_queries(source="nowhere")
+    assert conn.returned
+
+
+@pytest.mark.db
+def test_retract_subtracts_and_drops_empty_groups():
+    """Rows about to change are subtracted from their groups; emptied groups go."""
+    from etl import aggregates
+
+    cur = MockCursor()
+    aggregates.retract(cur, [4])
+
+    assert len(cur.executed) == 2
+    query, params = cur.executed[0]
+    assert params == ([4], )
+    assert "-1" in repr(query)
+    assert "DELETE" in repr(cur.executed[1][0])
@@ -0,0 +1,105 @@
+"""
+Tests for answering the analysis questions from a memory-mapped Arrow snapshot.
+The parity test runs against a real PostgreSQL server in a scratch schema and is
+skipped when DATABASE_URL is not set.
+"""
+
+import os
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+psycopg = pytest.importorskip("psycopg")
+
+pytestmark = pytest.mark.analysis
+
+ROWS = {
+    "term_season": ["Fall", "Fall", "Fall", "Spring", None],
+    "term_year": [2025, 2025, 2025, 2025, None],
+    "decision": ["Accepted", "Accepted", "Rejected", "Accepted", None],
+    "us_or_international": ["International", "American", "American", "Other", None],
+    "degree": ["PhD", "Masters", "Masters", "PhD", None],
+    "llm_generated_university": ["Georgetown University", "Johns Hopkins University",
+                                 "Johns Hopkins University", "Virginia Tech", None],
+    "llm_generated_program": ["Computer Science"] * 4 + [None],
+    "gpa": [3.9, 3.5, 7.0, 3.0, None],
+    "gre": [None, 320.0, 165.0, None, None],
+    "gre_v": [None, 160.0, None, None, None],
+    "gre_aw": [None, 4.5, None, None, None],
+}
+
+
+@pytest.fixture()
+def snapshot_path(tmp_path):
+    """A small snapshot written the way export_arrow writes one."""
+    from arrow_snapshot import ARROW_SCHEMA
+
+    path = tmp_path / "applicants.arrow"
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, ARROW_SCHEMA) as writer:
+        writer.write_table(pa.table(ROWS, schema=ARROW_SCHEMA))
+    return path
+
+
+def test_arrow_stats_match_the_sql_semantics(snapshot_path):
+    from arrow_snapshot import arrow_stats, open_arrow
+
+    stats = arrow_stats(open_arrow(snapshot_path))
+
+    assert stats["count_f_2025"] == 3
+    assert stats["percentage_international"] == pytest.approx(20.0)
+    assert stats["average_gpa"] == pytest.approx((3.9 + 3.5 + 3.0) / 3)
+    assert stats["average_gre"] == pytest.approx(165.0)
+    assert stats["average_gpa_american"] == pytest.approx((3.5 + 7.0) / 2)
+    assert stats["percentage_accepted_f25"] == pytest.approx(200 / 3)
+    assert stats["average_gpa_accepted_f25"] == pytest.approx((3.9 + 3.5) / 2)
+    assert stats["count_jhu_cs_masters"] == 2
+    assert stats["count_hoya_cs_phd_2025"] == 1
+    assert stats["popular_u_f25"] == "Johns Hopkins University"
+    assert stats["uva_gpa"] is None and stats["vt_gpa"] is None
+
+
+def test_run_queries_reads_the_snapshot_without_a_database(snapshot_path, query_module,
+                                                           monkeypatch):
+    query_data = query_module
+
+    monkeypatch.setattr(query_data, "get_db_connection", pytest.fail)
+
+    results = query_data.run_queries(source="arrow", path=str(snapshot_path))
+
+    assert results["1"][1] == 3
+    assert results["9"][1] == "Johns Hopkins University"
+
+
+@pytest.mark.db
+@pytest.mark.skipif(not os.environ.get("DATABASE_URL"),
+                    reason="needs a PostgreSQL server in DATABASE_URL")
+def test_snapshot_answers_match_sql(tmp_path):
+    from benchmarks.synthetic import scratch_schema, fill_applicants
+    from arrow_snapshot import arrow_stats, export_arrow, open_arrow
+    from query_data import _applicant_stats
+
+    conn = psycopg.connect(os.environ["DATABASE_URL"], autocommit=True)
+    try:
+        with scratch_schema(conn, "arrow_tests"):
+            fill_applicants(conn, 20000)
+            with conn.cursor() as cur:
+                # Give question 9 a clear winner; the synthetic universities tie.
+                cur.execute("""
+                    INSERT INTO applicants (program, url, term_season, term_year,
+                                            llm_generated_university)
+                    SELECT 'Physics, MIT', 'https://example.org/' || i, 'Fall', 2025, 'MIT'
+                    FROM generate_series(1, 50) AS i
+                """)
+                expected = _applicant_stats(cur)
+
+            path = tmp_path / "applicants.arrow"
+            assert export_arrow(conn, path, batch_size=3000) == 20050
+            stats = arrow_stats(open_arrow(path))
+    finally:
+        conn.close()
+
+    assert stats.keys() == expected.keys()
+    for name, value in expected.items():
+        if isinstance(value, str) or value is None:
+            assert stats[name] == value, name
+        else:
+            assert stats[name] == pytest.approx(float(value)), name
@@ -0,0 +1,89 @@
+"""
+Tests for answering the analysis questions concurrently. They run against a real
+PostgreSQL server in a scratch schema and are skipped when DATABASE_URL is not set.
+"""
+
+import asyncio
+import os
+import pytest
+
+psycopg = pytest.importorskip("psycopg")
+
+pytestmark = [
+    pytest.mark.db,
+    pytest.mark.skipif(not os.environ.get("DATABASE_URL"),
+                       reason="needs a PostgreSQL server in DATABASE_URL"),
+]
+
+SCHEMA = "async_tests"
+
+
+@pytest.fixture(scope="module")
+def async_db():
+    """A scratch schema with synthetic applicants and their rollup."""
+    from benchmarks.synthetic import scratch_schema, fill_applicants
+    from etl.aggregates import rebuild
+
+    conn = psycopg.connect(os.environ["DATABASE_URL"], autocommit=True)
+    try:
+        with scratch_schema(conn, SCHEMA):
+            fill_applicants(conn, 20000)
+            with conn.cursor() as cur:
+                # Give question 9 a clear winner; the synthetic universities tie.
+                cur.execute("""
+                    INSERT INTO applicants (program, url, term_season, term_year,
+                                            llm_generated_university)
+                    SELECT 'Physics, MIT', 'https://example.org/' || i, 'Fall', 2025, 'MIT'
+                    FROM generate_series(1, 50) AS i
+                """)
+                rebuild(cur)
+            yield conn
+    finally:
+        conn.close()
+
+
+async def answer(source):
+    """run_queries_async over a pool whose connections see the scratch schema."""
+    from async_queries import open_async_pool, run_queries_async
+
+    pool = await open_async_pool(os.environ["DATABASE_URL"],
+                                 kwargs={"options": f"-c search_path={SCHEMA}"})
+    try:
+        return await run_queries_async(pool, source)
+    finally:
+        await pool.close()
+
+
+@pytest.mark.parametrize("source", ["rollup", "applicants"])
+def test_concurrent_answers_match_run_queries(async_db, source):
+    from query_data import run_queries
+
+    assert asyncio.run(answer(source)) == run_queries(source=source, conn=async_db)
+
+
+def test_rollup_answers_match_a_full_scan_from_a_small_table(async_db):
+    from query_data import run_queries
+
+    with async_db.cursor() as cur:
+        groups = cur.execute("SELECT COUNT(*) FROM applicant_rollup").fetchone()[0]
+        applicants = cur.execute("SELECT COUNT(*) FROM applicants").fetchone()[0]
+
+    # Grouped by term, citizenship, decision and degree only, not per university.
+    assert groups < applicants // 20
+    assert run_queries(conn=async_db) == run_queries(source="applicants", conn=async_db)
+
+
+def test_blocking_wrapper_uses_the_shared_loop(async_db, monkeypatch):
+    import async_queries
+    from query_data import run_queries
+
+    opener = async_queries.open_async_pool
+    monkeypatch.setattr(async_queries, "open_async_pool", lambda: opener(
+        os.environ["DATABASE_URL"], kwargs={"options": f"-c search_path={SCHEMA}"}))
+    try:
+        first = async_queries.run_queries_concurrently(timeout=30)
+        again = async_queries.run_queries_concurrently(timeout=30)
+    finally:
+        async_queries.close_async_pool()
+
+    assert first == again == run_queries(conn=async_db)
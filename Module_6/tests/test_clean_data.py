@@ -0,0 +1,127 @@
+"""Tests for the cleaning stage: record building and term/decision/date parsing."""
+
+import copy
+import pytest
+from etl import update_database
+from etl.update_database import (ApplicantRecord, RECORD_KEYS, clean_data, clean_records,
+                                 normalise_term, parse_date_added, parse_decision,
+                                 parse_term)
+
+
+@pytest.mark.parametrize("date_added, expected", [
+    ("Added on March 31, 2024", "2024-03-31"),
+    ("Added on Sept 5, 2023", "2023-09-05"),
+    ("Jan 2, 2025", "2025-01-02"),
+    ("2025-02-20", "2025-02-20"),
+    ("Added on February 30, 2024", None),
+    ("yesterday", None),
+    (None, None),
+])
+def test_parse_date_added(date_added, expected):
+    assert parse_date_added(date_added) == expected
+
+
+@pytest.mark.parametrize("term, expected", [
+    ("Fall 2025", ("Fall", 2025)),
+    ("spring 2019", ("Spring", 2019)),
+    (" Summer 2024 ", ("Summer", 2024)),
+    ("F25", (None, None)),
+    ("", (None, None)),
+    (None, (None, None)),
+])
+def test_parse_term(term, expected):
+    assert parse_term(term) == expected
+
+
+@pytest.mark.parametrize("status, date_added, expected", [
+    ("Accepted on 1 Mar", "Added on March 31, 2024", ("Accepted", "2024-03-01")),
+    ("Wait listed on 14 Feb", "2025-02-20", ("Wait listed", "2025-02-14")),
+    # A decision dated after the entry was posted belongs to the prior year.
+    ("Rejected on 20 Dec", "Added on January 5, 2025", ("Rejected", "2024-12-20")),
+    ("Interview", "Added on January 5, 2025", ("Interview", None)),
+    ("Accepted on 1 Mar", None, ("Accepted", None)),
+    ("Accepted on 31 Feb", "Added on March 31, 2024", ("Accepted", None)),
+    ("Pending", "Added on March 31, 2024", (None, None)),
+    (None, None, (None, None)),
+])
+def test_parse_decision(status, date_added, expected):
+    assert parse_decision(status, date_added) == expected
+
+
+def test_clean_data_fills_typed_columns():
+    raw = [{
+        "program": "Computer Science",
+        "school": "Johns Hopkins University",
+        "comments": "",
+        "date_added": "Added on March 31, 2025",
+        "link": "https://www.thegradcafe.com/result/1",
+        "status": "Accepted on 1 Mar",
+        "semester_year": "Fall 2025",
+        "citizenship": "American",
+        "degree": "Masters",
+    }]
+
+    entry = clean_data(raw)[0]
+
+    assert entry["date_added"] == "2025-03-31"
+    assert (entry["term_season"], entry["term_year"]) == ("Fall", 2025)
+    assert (entry["decision"], entry["decision_date"]) == ("Accepted", "2025-03-01")
+
+
+RAW_ENTRY = {
+    "school": "University 2 of Somewhere 1",
+    "program": "Computer Science",
+    "degree": "PhD",
+    "comments": "<p>Funded <b>offer</b></p>",
+    "date_added": "Added on April 2, 2024",
+    "link": "https://www.thegradcafe.com/result/2",
+    "status": "Rejected on 1 Apr",
+    "semester_year": "F24",
+    "citizenship": "International",
+    "GPA": "3.80",
+}
+
+
+@pytest.mark.parametrize("term, expected", [
+    ("F18", "Fall 2018"),
+    ("S21", "Spring 2021"),
+    ("W20", "W20"),
+    ("Fall 2025", "Fall 2025"),
+    (None, None),
+])
+def test_normalise_term(term, expected):
+    assert normalise_term(term) == expected
+
+
+def test_clean_records_builds_slotted_records():
+    record = clean_records([RAW_ENTRY])[0]
+
+    assert isinstance(record, ApplicantRecord)
+    assert record.program == "Computer Science, University  of Somewhere "
+    assert record.comments == "Funded offer"
+    assert record.term == "Fall 2024"
+    assert (record.term_season, record.term_year) == ("Fall", 2024)
+    assert (record.decision, record.decision_date) == ("Rejected", "2024-04-01")
+    assert record.gpa == "3.80" and record.gre is None
+
+
+def test_clean_data_keeps_dict_shape_and_input():
+    raw = copy.deepcopy(RAW_ENTRY)
+
+    entry = clean_data([raw])[0]
+
+    assert tuple(entry) == RECORD_KEYS
+    assert entry["US/International"] == "International"
+    assert entry["url"] == RAW_ENTRY["link"]
+    assert raw == RAW_ENTRY
+
+
+def test_clean_data_workers_match_serial(monkeypatch):
+    monkeypatch.setattr(update_database, "PARALLEL_MIN_ROWS", 10)
+    monkeypatch.setattr(update_database, "PARALLEL_CHUNK_ROWS", 3)
+    raw = [dict(RAW_ENTRY, link=f"https://example.com/{i}") for i in range(25)]
+
+    cleaned = clean_data(raw, workers=2)
+
+    assert cleaned == clean_data(raw)
+    assert [entry["url"] for entry in cleaned] == [entry["link"] for entry in raw]
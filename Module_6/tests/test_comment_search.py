@@ -0,0 +1,135 @@
+"""
+Tests for full-text comment search: the generated tsvector follows every insert
+and update, results are ranked and filtered, snippets are escaped and highlighted,
+and selective searches use the GIN index. They run against a real PostgreSQL
+server in a scratch schema filled with synthetic rows, and are skipped when
+DATABASE_URL is not set.
+"""
+
+import os
+import pytest
+
+psycopg = pytest.importorskip("psycopg")
+
+pytestmark = [
+    pytest.mark.db,
+    pytest.mark.skipif(not os.environ.get("DATABASE_URL"),
+                       reason="needs a PostgreSQL server in DATABASE_URL"),
+]
+
+ROWS = 5000
+
+# Comments set on chosen rows; every word here is missing from the synthetic ones.
+COMMENTS = {
+    101: "Got full funding & a stipend (GPA < 3.5) from the zoology department!",
+    110: "Funding was discussed at the visit day, but the zoology stipend is not full.",
+    120: "Zoology interview over zoom, no funding news yet.",
+}
+
+
+@pytest.fixture(scope="module")
+def conn():
+    """Autocommit connection whose search_path is a filled scratch schema."""
+    from benchmarks.synthetic import scratch_schema, fill_applicants
+
+    connection = psycopg.connect(os.environ["DATABASE_URL"], autocommit=True)
+    try:
+        with scratch_schema(connection, "comment_search_tests"):
+            fill_applicants(connection, ROWS)
+            for row_id, comment in COMMENTS.items():
+                connection.execute("UPDATE applicants SET comments = %s WHERE id = %s",
+                                   (comment, row_id))
+            connection.execute("ANALYZE applicants")
+            yield connection
+    finally:
+        connection.close()
+
+
+def ids(result):
+    """The ids of a search result, in order."""
+    return [row["id"] for row in result["results"]]
+
+
+def test_matches_are_ranked_with_highlighted_snippets(conn):
+    from comment_search import search_comments
+
+    result = search_comments(conn, "full funding zoology")
+
+    # Adjacent matching words rank above the same words spread out.
+    assert ids(result) == [101, 110]
+    assert result["results"][0]["rank"] > result["results"][1]["rank"]
+    # The fragment around the matches is escaped, and only the matches are marked.
+    assert result["results"][0]["snippet"] == (
+        "<mark>full</mark> <mark>funding</mark> &amp; a stipend (GPA &lt; 3.5) "
+        "from the <mark>zoology</mark> department")
+
+
+def test_web_search_syntax(conn):
+    from comment_search import search_comments
+
+    assert ids(search_comments(conn, '"full funding"')) == [101]
+    assert sorted(ids(search_comments(conn, "zoology -stipend"))) == [120]
+    assert sorted(ids(search_comments(conn, "zoom or zoology"))) == [101, 110, 120]
+    assert ids(search_comments(conn, "astrophysics")) == []
+
+
+def test_inserts_and_updates_are_searchable(conn):
+    from comment_search import search_comments
+
+    conn.execute("UPDATE applicants SET comments = 'Stipend cut after the zoology audit' "
+                 "WHERE id = 120")
+    new_id = conn.execute("""
+        INSERT INTO applicants (program, url, comments, date_added, term_season, term_year)
+        VALUES ('Zoology', 'https://example.com/new', 'An audited zoology offer',
+                '2026-01-01', 'Fall', 2026)
+        RETURNING id
+    """).fetchone()[0]
+    try:
+        assert sorted(ids(search_comments(conn, "audit"))) == sorted([120, new_id])
+        assert 120 not in ids(search_comments(conn, "zoom"))
+    finally:
+        conn.execute("DELETE FROM applicants WHERE id = %s", (new_id, ))
+        conn.execute("UPDATE applicants SET comments = %s WHERE id = 120", (COMMENTS[120], ))
+
+
+def test_filters_and_limit_narrow_the_results(conn):
+    from comment_search import search_comments
+
+    year = conn.execute("SELECT term_year FROM applicants WHERE id = 110").fetchone()[0]
+    season = conn.execute("SELECT term_season FROM applicants WHERE id = 110").fetchone()[0]
+
+    assert ids(search_comments(conn, "zoology", {"term": (season, year)})) == [110]
+    assert len(search_comments(conn, "zoology", limit=2)["results"]) == 2
+    # Only the newest RANK_CANDIDATES matches are ranked.
+    assert len(search_comments(conn, "publications", limit=100)["results"]) == 100
+
+
+@pytest.mark.parametrize("text, limit, message", [
+    ("", 20, "q is required"),
+    ("   ", 20, "q is required"),
+    ("word " * 50, 20, "at most"),
+    ("zoology", 0, "limit"),
+    ("zoology", 1000, "limit"),
+])
+def test_invalid_searches_are_rejected(conn, text, limit, message):
+    from comment_search import search_comments
+
+    with pytest.raises(ValueError, match=message):
+        search_comments(conn, text, limit=limit)
+
+
+def test_selective_searches_use_the_gin_index(conn):
+    from comment_search import _QUERY, _SEARCH, COLUMNS, HEADLINE_OPTIONS, RANK_CANDIDATES
+
+    columns = psycopg.sql.SQL(", ").join(psycopg.sql.Identifier(column) for column in COLUMNS)
+    statement = psycopg.sql.SQL("EXPLAIN (FORMAT JSON) " + _SEARCH).format(
+        columns=columns, filters=psycopg.sql.SQL("TRUE"), query=_QUERY)
+    plan = conn.execute(statement, {"text": "zoology", "limit": 20, "options": HEADLINE_OPTIONS,
+                                    "candidates": RANK_CANDIDATES}).fetchone()[0][0]["Plan"]
+
+    stack, indexes = [plan], []
+    while stack:
+        node = stack.pop()
+        indexes.append(node.get("Index Name", ""))
+        stack.extend(node.get("Plans", []))
+    assert [name for name in indexes if name.endswith("comments_tsv_idx")]
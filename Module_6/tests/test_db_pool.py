@@ -0,0 +1,163 @@
+"""Tests for the shared connection pool's sizing and reporting."""
+
+import os
+import runpy
+from types import SimpleNamespace
+import pytest
+
+GUNICORN_CONF = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             "web", "gunicorn.conf.py")
+
+
+class FakePool:
+    """Stands in for psycopg_pool.ConnectionPool."""
+
+    def __init__(self):
+        self.returned = []
+
+    def get_stats(self):
+        return {
+            "pool_min": 1,
+            "pool_max": 4,
+            "pool_size": 3,
+            "pool_available": 1,
+            "requests_waiting": 0,
+        }
+
+    def getconn(self):
+        return FakeConnection()
+
+    def putconn(self, conn):
+        self.returned.append(conn)
+
+
+class FakeConnection:
+    """Records how the request's transaction was finished."""
+
+    def __init__(self):
+        self.finished = None
+
+    def commit(self):
+        self.finished = "commit"
+
+    def rollback(self):
+        self.finished = "rollback"
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    """Swap the shared pool for a FakePool and reset latency totals."""
+    import db_pool
+
+    pool = FakePool()
+    monkeypatch.setattr(db_pool, "get_pool", lambda: pool)
+    monkeypatch.setattr(db_pool, "_ACQUIRE_STATS", {
+        "count": 0,
+        "total_ms": 0.0,
+        "max_ms": 0.0
+    })
+    return pool
+
+
+@pytest.mark.db
+def test_pool_stats_reports_saturation(fake_pool):
+    """Saturation is connections in use over the pool maximum."""
+    import db_pool
+
+    stats = db_pool.pool_stats()
+    assert stats["in_use"] == 2
+    assert stats["saturation"] == 0.5
+    assert stats["acquisitions"] == 0
+
+
+@pytest.mark.web
+def test_request_connection_checked_out_once(fake_pool):
+    """A request reuses one pooled connection and returns it at teardown."""
+    from app import app
+    import db_pool
+
+    with app.test_request_context("/"):
+        first = db_pool.get_request_connection()
+        assert db_pool.get_request_connection() is first
+    assert fake_pool.returned == [first]
+    assert first.finished == "commit"
+    assert db_pool.pool_stats()["acquisitions"] == 1
+
+
+@pytest.mark.web
+def test_request_connection_returned_when_commit_fails(fake_pool):
+    """A commit that raises at teardown still hands the connection back."""
+    from app import app
+    import db_pool
+
+    def broken_commit():
+        raise RuntimeError("connection lost")
+
+    with pytest.raises(RuntimeError):
+        with app.test_request_context("/"):
+            conn = db_pool.get_request_connection()
+            conn.commit = broken_commit
+    assert fake_pool.returned == [conn]
+
+
+def test_pool_is_sized_one_connection_per_thread(monkeypatch):
+    import db_pool
+
+    monkeypatch.delenv("DB_POOL_MAX_SIZE", raising=False)
+    monkeypatch.setenv("WEB_THREADS", "6")
+    assert db_pool.pool_max_size() == 6
+    monkeypatch.setenv("DB_POOL_MAX_SIZE", "3")
+    assert db_pool.pool_max_size() == 3
+
+
+@pytest.mark.parametrize("workers, async_queries, starts", [
+    (19, False, True),     # 19 x 4 = 76
+    (21, False, False),    # 21 x 4 = 84
+    (6, True, True),       # 6 x (4 + 8) = 72
+    (7, True, False),      # 7 x (4 + 8) = 84
+])
+def test_gunicorn_refuses_workers_over_the_connection_budget(monkeypatch, workers,
+                                                             async_queries, starts):
+    import pages_bp
+
+    monkeypatch.delenv("DB_POOL_MAX_SIZE", raising=False)
+    monkeypatch.delenv("WEB_THREADS", raising=False)
+    monkeypatch.delenv("WEB_DB_CONNECTION_BUDGET", raising=False)
+    monkeypatch.setattr(pages_bp, "ASYNC_QUERIES", async_queries)
+    monkeypatch.setenv("WEB_WORKERS", str(workers))
+    on_starting = runpy.run_path(GUNICORN_CONF)["on_starting"]
+    logged = []
+    server = SimpleNamespace(cfg=SimpleNamespace(workers=workers),
+                             log=SimpleNamespace(info=lambda *args: logged.append(args),
+                                                 warning=lambda *args: logged.append(args)))
+
+    if starts:
+        on_starting(server)
+        assert logged
+    else:
+        with pytest.raises(RuntimeError, match="exceeds WEB_DB_CONNECTION_BUDGET"):
+            on_starting(server)
+
+
+@pytest.mark.parametrize("cpus, async_queries, workers", [
+    (2, False, 5),      # 2 x 2 + 1 fits: 5 x 4 = 20
+    (16, False, 20),    # 33 would need 132; 80 // 4 = 20
+    (16, True, 6),      # 80 // (4 + 8) = 6
+])
+def test_default_workers_fit_the_connection_budget(monkeypatch, cpus, async_queries, workers):
+    import multiprocessing
+    import pages_bp
+
+    for name in ("WEB_WORKERS", "DB_POOL_MAX_SIZE", "WEB_THREADS", "WEB_DB_CONNECTION_BUDGET"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(pages_bp, "ASYNC_QUERIES", async_queries)
+    monkeypatch.setattr(multiprocessing, "cpu_count", lambda: cpus)
+    conf = runpy.run_path(GUNICORN_CONF)
+    assert conf["workers"] == workers
+
+    warned = []
+    server = SimpleNamespace(cfg=SimpleNamespace(workers=conf["workers"]),
+                             log=SimpleNamespace(info=lambda *args: None,
+                                                 warning=lambda *args: warned.append(args)))
+    conf["on_starting"](server)  # Starts, warning only when the workers were lowered.
+    assert bool(warned) == (cpus == 16)
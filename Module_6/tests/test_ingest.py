@@ -0,0 +1,163 @@
+"""
+Tests for the idempotent ingest path in etl.ingest. The upsert tests run against a
+real PostgreSQL server in a scratch schema and are skipped when DATABASE_URL is
+not set.
+"""
+
+import os
+import pytest
+
+psycopg = pytest.importorskip("psycopg")
+
+pytestmark = pytest.mark.db
+
+needs_server = pytest.mark.skipif(not os.environ.get("DATABASE_URL"),
+                                  reason="needs a PostgreSQL server in DATABASE_URL")
+
+
+def llm_entry(result_id, **changes):
+    """An LLM-extended entry as handle_scrape_new_data passes it to the upsert."""
+    entry = {
+        "program": "Computer Science, MIT",
+        "comments": "Funded offer",
+        "date_added": "2025-03-02",
+        "url": f"https://www.thegradcafe.com/result/{result_id}",
+        "status": "Accepted on 1 Mar",
+        "term": "Fall 2025",
+        "US/International": "International",
+        "Degree": "PhD",
+        "GPA": "3.90",
+        "GRE": "",
+        "GRE_V": "",
+        "GRE_AW": "",
+        "llm-generated-program": "Computer Science",
+        "llm-generated-university": "Massachusetts Institute of Technology",
+        "term_season": "Fall",
+        "term_year": 2025,
+        "decision": "Accepted",
+        "decision_date": "2025-03-01",
+    }
+    entry.update(changes)
+    return entry
+
+
+def test_row_hash_tracks_scraped_content_only():
+    from etl.ingest import row_hash, row_values
+
+    original = row_hash(row_values(llm_entry(1)))
+
+    assert row_hash(row_values(llm_entry(1))) == original
+    assert len(original) == 16
+    assert row_hash(row_values(llm_entry(1, status="Rejected on 1 Mar"))) != original
+    assert row_hash(row_values(llm_entry(1, **{"llm-generated-program": "CS"}))) == original
+
+
+@pytest.fixture()
+def ingest_db():
+    """Autocommit connection whose search_path is an empty scratch schema."""
+    from benchmarks.synthetic import scratch_schema
+
+    conn = psycopg.connect(os.environ["DATABASE_URL"], autocommit=True)
+    try:
+        with scratch_schema(conn, "ingest_tests"):
+            yield conn
+    finally:
+        conn.close()
+
+
+@needs_server
+def test_rerunning_a_scrape_skips_every_row(ingest_db):
+    from etl.ingest import upsert_applicants
+
+    batch = [llm_entry(i) for i in range(5)]
+    with ingest_db.cursor() as cur:
+        first = upsert_applicants(cur, batch)
+        again = upsert_applicants(cur, batch)
+        cur.execute("SELECT COUNT(*) FROM applicants")
+        assert cur.fetchone()[0] == 5
+
+    assert (first["inserted"], first["updated"], first["skipped"]) == (5, 0, 0)
+    assert (again["inserted"], again["updated"], again["skipped"]) == (0, 0, 5)
+    assert again["ids"] == []
+
+
+@needs_server
+def test_changed_rows_are_updated_and_rollup_stays_exact(ingest_db):
+    from etl.aggregates import check_consistency
+    from etl.ingest import upsert_applicants
+
+    with ingest_db.cursor() as cur:
+        upsert_applicants(cur, [llm_entry(1), llm_entry(2)])
+        stats = upsert_applicants(cur, [
+            llm_entry(1, status="Rejected on 1 Mar", decision="Rejected"),
+            llm_entry(2),
+            llm_entry(3),
+        ])
+        cur.execute("SELECT decision::text FROM applicants WHERE url LIKE '%/1'")
+        assert cur.fetchall() == [("Rejected", )]
+
+    assert (stats["inserted"], stats["updated"], stats["skipped"]) == (1, 1, 1)
+    assert check_consistency(ingest_db) == []
+
+
+@needs_server
+def test_results_without_a_url_are_kept_apart(ingest_db):
+    from etl.aggregates import check_consistency
+    from etl.ingest import upsert_applicants
+
+    unlinked = [llm_entry(0, url=None, comments=f"Result {n}") for n in range(3)]
+    with ingest_db.cursor() as cur:
+        first = upsert_applicants(cur, unlinked + [llm_entry(1)])
+        # The same url-less results scraped again are recognised by their content.
+        again = upsert_applicants(cur, unlinked + [llm_entry(0, url=None, comments="New")])
+        cur.execute("SELECT comments FROM applicants WHERE url IS NULL ORDER BY id")
+        assert cur.fetchall() == [("Result 0", ), ("Result 1", ), ("Result 2", ), ("New", )]
+
+    assert (first["inserted"], first["updated"], first["skipped"]) == (4, 0, 0)
+    assert (again["inserted"], again["updated"], again["skipped"]) == (1, 0, 3)
+    assert check_consistency(ingest_db) == []
+
+
+@needs_server
+def test_find_recent_reads_the_largest_result_id(ingest_db):
+    from etl.ingest import upsert_applicants
+    from etl.update_database import find_recent
+
+    assert find_recent(ingest_db) is None
+
+    with ingest_db.cursor() as cur:
+        upsert_applicants(cur, [llm_entry(7), llm_entry(120), llm_entry(9),
+                                llm_entry(0, url="https://www.thegradcafe.com/result/")])
+
+    assert find_recent(ingest_db) == 120
+
+
+@needs_server
+def test_name_dictionary_follows_inserts_and_updates(ingest_db):
+    from etl import names
+    from etl.ingest import upsert_applicants
+
+    def dictionary():
+        return ingest_db.execute(
+            "SELECT kind, name, n, acronym FROM applicant_names ORDER BY 1, 2").fetchall()
+
+    jhu = {"llm-generated-university": "Johns Hopkins University"}
+    with ingest_db.cursor() as cur:
+        upsert_applicants(cur, [llm_entry(1), llm_entry(2), llm_entry(3, **jhu)])
+        # Result 1 moves to Johns Hopkins; MIT keeps result 2.
+        upsert_applicants(cur, [llm_entry(1, comments="Moved", **jhu),
+                                llm_entry(4, **{"llm-generated-program": ""})])
+        incremental = dictionary()
+        names.rebuild(cur)
+
+    assert incremental == dictionary() == [
+        ("program", "Computer Science", 3, "CS"),
+        ("university", "Johns Hopkins University", 2, "JHU"),
+        ("university", "Massachusetts Institute of Technology", 2, "MIT"),
+    ]
+
+    with ingest_db.cursor() as cur:
+        upsert_applicants(cur, [llm_entry(2, comments="Moved", **jhu),
+                                llm_entry(4, comments="Moved", **jhu)])
+    # A name no applicant carries any more leaves the dictionary.
+    assert [row[1] for row in dictionary()] == ["Computer Science", "Johns Hopkins University"]
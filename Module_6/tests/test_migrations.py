@@ -0,0 +1,182 @@
+"""
+Tests for the migration of a pre-existing `applicants` table to the typed,
+partitioned layout, run against a real PostgreSQL server in a scratch schema
+holding the original table definition. They are skipped when DATABASE_URL is not
+set.
+"""
+
+import os
+import pytest
+
+psycopg = pytest.importorskip("psycopg")
+
+pytestmark = [
+    pytest.mark.db,
+    pytest.mark.skipif(not os.environ.get("DATABASE_URL"),
+                       reason="needs a PostgreSQL server in DATABASE_URL"),
+]
+
+# The applicants table as db/init.sql created it before the typed columns.
+LEGACY_TABLE = """
+    CREATE TABLE applicants (
+        id SERIAL PRIMARY KEY,
+        program VARCHAR(255) NOT NULL,
+        comments TEXT,
+        date_added TIMESTAMP DEFAULT NOW(),
+        url VARCHAR(255),
+        status VARCHAR(255),
+        term VARCHAR(255),
+        us_or_international VARCHAR(20),
+        gpa FLOAT CHECK (gpa >= 0 AND gpa <= 4),
+        gre FLOAT CHECK (gre >= 0),
+        gre_v FLOAT CHECK (gre_v >= 0),
+        gre_aw FLOAT CHECK (gre_aw >= 0),
+        degree VARCHAR(100),
+        llm_generated_program VARCHAR(255),
+        llm_generated_university VARCHAR(255)
+    )
+"""
+
+LEGACY_ROWS = [
+    ("https://example.org/1", "Fall 2025", "Accepted on 1 Mar", "Funded offer", "MIT"),
+    # The same result scraped twice.
+    ("https://example.org/1", "Fall 2025", "Accepted on 1 Mar", "Funded offer", "MIT"),
+    ("https://example.org/2", "Spring 2024", "Rejected on 12 Jan", "No news", "MIT"),
+    ("https://example.org/3", "F18?", "Wait listed on 3 Apr", None, "Stanford University"),
+    # Results scraped without a link; identical, yet not known to be the same one.
+    (None, "Fall 2025", "Rejected on 2 Mar", "No link", "MIT"),
+    (None, "Fall 2025", "Rejected on 2 Mar", "No link", "MIT"),
+]
+
+
+@pytest.fixture()
+def legacy_db():
+    """Autocommit connection whose search_path is a schema holding the legacy table."""
+    conn = psycopg.connect(os.environ["DATABASE_URL"], autocommit=True)
+    schema = psycopg.sql.Identifier("migration_tests")
+    try:
+        conn.execute(psycopg.sql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(schema))
+        conn.execute(psycopg.sql.SQL("CREATE SCHEMA {}").format(schema))
+        conn.execute(psycopg.sql.SQL("SET search_path TO {}").format(schema))
+        conn.execute(LEGACY_TABLE)
+        conn.execute("CREATE INDEX applicants_term_status_idx ON applicants (term, status)")
+        with conn.cursor() as cur:
+            cur.executemany("""
+                INSERT INTO applicants (program, url, term, status, comments, date_added,
+                                        llm_generated_program, llm_generated_university)
+                VALUES ('Computer Science', %s, %s, %s, %s, '2025-03-02 10:30',
+                        'Computer Science', %s)
+            """, LEGACY_ROWS)
+        yield conn
+    finally:
+        conn.execute(psycopg.sql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(schema))
+        conn.close()
+
+
+def test_migration_converts_a_legacy_table(legacy_db, capsys):
+    from etl.migrations import migrate
+
+    migrate(legacy_db, batch_size=2)
+    assert "Moved 1 duplicate results to applicants_duplicates." in capsys.readouterr().out
+    assert legacy_db.execute("SELECT id, url FROM applicants_duplicates").fetchall() == [
+        (2, "https://example.org/1")]
+
+    rows = legacy_db.execute("""
+        SELECT url, term_season::text, term_year, decision::text, decision_date::text,
+               date_added::text, tableoid::regclass::text
+        FROM applicants ORDER BY url
+    """).fetchall()
+    assert rows == [
+        ("https://example.org/1", "Fall", 2025, "Accepted", "2025-03-01", "2025-03-02",
+         "applicants_y2025"),
+        ("https://example.org/2", "Spring", 2024, "Rejected", "2025-01-12", "2025-03-02",
+         "applicants_y2024"),
+        ("https://example.org/3", None, None, "Wait listed", "2024-04-03", "2025-03-02",
+         "applicants_default"),
+        (None, "Fall", 2025, "Rejected", "2025-03-02", "2025-03-02", "applicants_y2025"),
+        (None, "Fall", 2025, "Rejected", "2025-03-02", "2025-03-02", "applicants_y2025"),
+    ]
+
+    indexes = {row[0] for row in legacy_db.execute(
+        "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema()").fetchall()}
+    assert "applicants_term_status_idx" not in indexes
+    assert {"applicants_term_decision_idx", "applicants_comments_tsv_idx",
+            "applicants_accepted_idx"} <= indexes
+
+    assert legacy_db.execute(
+        "SELECT id FROM applicants WHERE comments_tsv @@ to_tsquery('english', 'funded')"
+    ).fetchall() == [(1, )]
+    assert legacy_db.execute(
+        "SELECT SUM(n) FROM applicant_rollup").fetchone()[0] == 5
+    assert legacy_db.execute(
+        "SELECT n FROM applicant_names WHERE kind = 'university' AND name = 'MIT'"
+    ).fetchone()[0] == 4
+    for table in ("data_version", "page_cache", "tasks"):
+        assert legacy_db.execute("SELECT to_regclass(%s)", (table, )).fetchone()[0]
+
+
+def test_migration_is_idempotent(legacy_db):
+    from etl.migrations import migrate
+
+    migrate(legacy_db)
+    before = legacy_db.execute("SELECT * FROM applicants ORDER BY id").fetchall()
+    migrate(legacy_db)
+
+    assert legacy_db.execute("SELECT * FROM applicants ORDER BY id").fetchall() == before
+    # New rows continue the id sequence of the copied ones.
+    assert legacy_db.execute("""
+        INSERT INTO applicants (program, url, term_year) VALUES ('Physics', 'x', 2025)
+        RETURNING id
+    """).fetchone()[0] == 7
+
+
+def test_id_key_replaces_the_plain_id_index():
+    from benchmarks.synthetic import scratch_schema
+    from etl.migrations import add_id_key
+
+    conn = psycopg.connect(os.environ["DATABASE_URL"], autocommit=True)
+    try:
+        with scratch_schema(conn, "id_key_tests"), conn.cursor() as cur:
+            # A table partitioned before the key existed.
+            cur.execute("ALTER TABLE applicants DROP CONSTRAINT applicants_id_term_year_key")
+            cur.execute("CREATE INDEX applicants_id_idx ON applicants (id)")
+            add_id_key(cur)
+            add_id_key(cur)
+
+            cur.execute("""
+                SELECT indexname FROM pg_indexes
+                WHERE schemaname = current_schema() AND tablename = 'applicants'
+                  AND indexname LIKE 'applicants_id%'
+            """)
+            assert cur.fetchall() == [("applicants_id_term_year_key", )]
+    finally:
+        conn.close()
+
+
+def test_result_key_stops_treating_url_less_results_as_one():
+    from benchmarks.synthetic import scratch_schema
+    from etl.migrations import add_result_key
+
+    conn = psycopg.connect(os.environ["DATABASE_URL"], autocommit=True)
+    try:
+        with scratch_schema(conn, "result_key_tests"), conn.cursor() as cur:
+            # A table keyed before url-less results were told apart.
+            cur.execute("DROP INDEX applicants_url_term_year_key, applicants_unlinked_key")
+            cur.execute("""
+                ALTER TABLE applicants ADD CONSTRAINT applicants_url_term_year_key
+                    UNIQUE NULLS NOT DISTINCT (url, term_year)
+            """)
+            cur.execute("INSERT INTO applicants (program, term_year) VALUES ('Physics', 2025)")
+            assert add_result_key(cur) == 0
+            assert add_result_key(cur) == 0
+
+            cur.execute("INSERT INTO applicants (program, term_year) VALUES ('Physics', 2025)")
+            cur.execute("SELECT COUNT(*) FROM applicants WHERE url IS NULL")
+            assert cur.fetchone()[0] == 2
+            cur.execute("""
+                SELECT COUNT(*) FROM pg_constraint
+                WHERE conrelid = to_regclass('applicants') AND conname LIKE '%url%'
+            """)
+            assert cur.fetchone()[0] == 0
+    finally:
+        conn.close()
@@ -0,0 +1,111 @@
+"""
+Tests for the university and program name autocomplete: acronyms are derived from
+the names, arguments are validated, and abbreviations, prefixes and typos find
+the intended name through the trigram index. The searches run against a real
+PostgreSQL server in a scratch schema filled with a synthetic name dictionary,
+and are skipped when DATABASE_URL is not set or the server lacks pg_trgm.
+"""
+
+import os
+import pytest
+
+psycopg = pytest.importorskip("psycopg")
+
+pytestmark = pytest.mark.db
+
+needs_server = pytest.mark.skipif(not os.environ.get("DATABASE_URL"),
+                                  reason="needs a PostgreSQL server in DATABASE_URL")
+
+
+@pytest.mark.parametrize("text, acronym", [
+    ("jhu", "JHU"),
+    ("U.C.L.A.", "UCLA"),
+    ("Hopkins", "HOPKINS"),
+    ("johns hopkins", None),
+    ("Massachusetts", None),
+])
+def test_one_word_texts_are_looked_up_as_acronyms(text, acronym):
+    from name_search import _acronym
+
+    assert _acronym(text) == acronym
+
+
+@pytest.mark.parametrize("args, message", [
+    ({"text": "j"}, "at least"),
+    ({"text": "x" * 101}, "at most"),
+    ({"text": "jhu", "kind": "college"}, "kind must be one of"),
+    ({"text": "jhu", "limit": 0}, "limit"),
+])
+def test_invalid_searches_are_rejected(args, message):
+    from name_search import search_names
+
+    with pytest.raises(ValueError, match=message):
+        search_names(None, **args)
+
+
+@pytest.fixture(scope="module")
+def conn():
+    """Autocommit connection whose search_path is a scratch schema with a name dictionary."""
+    from benchmarks.synthetic import scratch_schema, fill_names
+
+    connection = psycopg.connect(os.environ["DATABASE_URL"], autocommit=True)
+    try:
+        if not connection.execute(
+                "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'").fetchone():
+            pytest.skip("the PostgreSQL server does not ship pg_trgm")
+        with scratch_schema(connection, "name_search_tests"):
+            fill_names(connection, 2000, 1000)
+            yield connection
+    finally:
+        connection.close()
+
+
+def top(conn, text, kind="university"):
+    """The best matching name."""
+    from name_search import search_names
+
+    return search_names(conn, text, kind)["names"][0]["name"]
+
+
+@needs_server
+@pytest.mark.parametrize("text", ["JHU", "jhu", "Johns Hopkins", "hopkins", "Hopkns", "johns hop"])
+def test_abbreviations_prefixes_and_typos_find_the_name(conn, text):
+    assert top(conn, text) == "Johns Hopkins University"
+
+
+@needs_server
+def test_acronyms_and_kinds(conn):
+    from name_search import search_names
+
+    assert top(conn, "UCLA") == "University of California, Los Angeles"
+    assert top(conn, "mit") == "Massachusetts Institute of Technology"
+    assert top(conn, "ECE", "program") == "Electrical and Computer Engineering"
+    assert top(conn, "comp sci", "program") == "Computer Science"
+
+    virginia = {name["name"] for name in search_names(conn, "virginia")["names"]}
+    assert {"University of Virginia", "Virginia Tech"} <= virginia
+    result = search_names(conn, "washington", limit=5)
+    assert len(result["names"]) == 5
+    scores = [name["score"] for name in result["names"]]
+    assert scores == sorted(scores, reverse=True)
+    assert search_names(conn, "zzqx")["names"] == []
+
+
+@needs_server
+def test_searches_use_the_trigram_index(conn):
+    from name_search import _SEARCH
+
+    conn.execute("SET enable_seqscan = off")
+    try:
+        plan = conn.execute("EXPLAIN (FORMAT JSON) " + _SEARCH, {
+            "text": "hopkins", "kind": "university", "limit": 10, "acronym": "HOPKINS",
+            "acronym_prefix": "HOPKINS%"}).fetchone()[0][0]["Plan"]
+    finally:
+        conn.execute("RESET enable_seqscan")
+
+    stack, indexes = [plan], []
+    while stack:
+        node = stack.pop()
+        indexes.append(node.get("Index Name"))
+        stack.extend(node.get("Plans", []))
+    assert "applicant_names_name_trgm_idx" in indexes
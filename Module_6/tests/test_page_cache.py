@@ -0,0 +1,211 @@
+"""
+Tests for the rendered-page cache. The shared-tier test runs against a real
+PostgreSQL server in a scratch schema and is skipped when DATABASE_URL is not set.
+"""
+
+import gzip
+import os
+from datetime import datetime, timezone
+import pytest
+from flask import Flask
+
+UPDATED_AT = datetime(2025, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+
+
+class FakeConnection:
+    """Answers the data_version query with a settable version."""
+
+    def __init__(self):
+        self.version = 1
+        self.reads = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+
+class FakeCursor:
+    """Cursor over FakeConnection's data_version row."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        assert "data_version" in query
+        self.conn.reads += 1
+
+    def fetchone(self):
+        return self.conn.version, UPDATED_AT
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """A fresh page cache that re-reads the data version on every request."""
+    import page_cache
+
+    monkeypatch.setattr(page_cache, "VERSION_TTL", 0)
+    monkeypatch.setattr(page_cache, "SHARED", False)
+    monkeypatch.setattr(page_cache, "_PAGES", {})
+    monkeypatch.setattr(page_cache, "_VERSION", {"value": None, "read_at": 0.0})
+    monkeypatch.setattr(page_cache, "_STATS", dict.fromkeys(page_cache._STATS, 0))
+    return page_cache
+
+
+@pytest.fixture
+def site(cache):
+    """A Flask app serving one cached page; returns (client, connection, renders)."""
+    conn = FakeConnection()
+    renders = []
+
+    def render():
+        renders.append(conn.version)
+        return f"<p>version {conn.version}</p>"
+
+    app = Flask(__name__)
+    app.add_url_rule("/", "home",
+                     lambda: cache.page_response(cache.cached_page("home", lambda: conn, render)))
+    return app.test_client(), conn, renders
+
+
+@pytest.mark.web
+def test_page_is_rendered_once_per_data_version(site, cache):
+    client, conn, renders = site
+
+    assert client.get("/").data == b"<p>version 1</p>"
+    assert client.get("/").data == b"<p>version 1</p>"
+    conn.version = 2
+    assert client.get("/").data == b"<p>version 2</p>"
+
+    assert renders == [1, 2]
+    stats = cache.cache_stats()
+    assert (stats["hits"], stats["misses"], stats["data_version"]) == (1, 2, 2)
+    assert stats["hit_ratio"] == pytest.approx(1 / 3, abs=1e-3)
+
+
+@pytest.mark.web
+def test_conditional_requests_get_304_until_the_data_changes(site, cache):
+    client, conn, _ = site
+
+    first = client.get("/")
+    etag = first.headers["ETag"]
+    assert first.headers["Last-Modified"] == "Sat, 01 Mar 2025 12:30:15 GMT"
+    assert "no-cache" in first.headers["Cache-Control"]
+
+    assert client.get("/", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/", headers={
+        "If-Modified-Since": first.headers["Last-Modified"]}).status_code == 304
+
+    conn.version = 2
+    changed = client.get("/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert cache.cache_stats()["not_modified"] == 2
+
+
+@pytest.mark.web
+def test_version_is_reread_only_after_its_ttl(site, cache, monkeypatch):
+    client, conn, renders = site
+    monkeypatch.setattr(cache, "VERSION_TTL", 3600)
+
+    client.get("/")
+    conn.version = 2
+    client.get("/")
+
+    # Within the TTL the cached version is trusted, so no connection is needed.
+    assert conn.reads == 1
+    assert renders == [1]
+
+
+@pytest.mark.db
+@pytest.mark.skipif(not os.environ.get("DATABASE_URL"),
+                    reason="needs a PostgreSQL server in DATABASE_URL")
+def test_shared_tier_serves_other_processes_until_the_next_ingest(cache, monkeypatch):
+    psycopg = pytest.importorskip("psycopg")
+    from benchmarks.synthetic import scratch_schema
+    from etl.data_version import bump_data_version, current_data_version
+
+    monkeypatch.setattr(cache, "SHARED", True)
+    renders = []
+
+    def render():
+        renders.append(1)
+        return "<p>rendered</p>"
+
+    conn = psycopg.connect(os.environ["DATABASE_URL"], autocommit=True)
+    try:
+        with scratch_schema(conn, "page_cache_tests"):
+            first = cache.cached_page("home", lambda: conn, render)
+            # A second web process starts with an empty in-process cache.
+            cache.clear()
+            again = cache.cached_page("home", lambda: conn, render)
+
+            with conn.cursor() as cur:
+                assert bump_data_version(cur) == 1
+                assert current_data_version(cur) == 1
+            cache.clear()
+            after_ingest = cache.cached_page("home", lambda: conn, render)
+    finally:
+        conn.close()
+
+    assert renders == [1, 1]
+    assert again["etag"] == first["etag"] and again["body"] == first["body"]
+    assert after_ingest["version"] == 1 != first["version"]
+    assert cache.cache_stats()["shared_hits"] == 1
+
+
+@pytest.fixture
+def api(cache):
+    """A Flask app serving a cached JSON document the way /api/analytics does."""
+    conn = FakeConnection()
+    body = '{"1": {"question": "How many?", "answer": 42}, "padding": "%s"}' % ("x" * 2000)
+
+    def serve():
+        page = cache.cached_page("analytics", lambda: conn, lambda: body)
+        return cache.page_response(page, mimetype="application/json", max_age=5)
+
+    app = Flask(__name__)
+    app.add_url_rule("/api/analytics", "analytics", serve)
+    return app.test_client(), body
+
+
+@pytest.mark.web
+@pytest.mark.parametrize("accept, encoding", [
+    ("gzip", "gzip"),
+    ("gzip, br", "br"),
+    ("identity", None),
+])
+def test_api_responses_are_compressed_as_accepted(api, cache, accept, encoding):
+    client, body = api
+    if encoding == "br" and cache.brotli is None:
+        pytest.skip("brotli is not installed")
+
+    response = client.get("/api/analytics", headers={"Accept-Encoding": accept})
+
+    assert response.mimetype == "application/json"
+    assert response.headers.get("Content-Encoding") == encoding
+    assert "Accept-Encoding" in response.headers["Vary"]
+    decode = {"gzip": gzip.decompress, "br": getattr(cache.brotli, "decompress", None),
+              None: bytes}[encoding]
+    assert decode(response.data) == body.encode()
+
+    # Each encoding is its own representation, so revalidation matches per encoding.
+    etag = response.headers["ETag"]
+    again = client.get("/api/analytics", headers={"Accept-Encoding": accept,
+                                                  "If-None-Match": etag})
+    assert again.status_code == 304
+
+
+@pytest.mark.web
+def test_api_responses_may_be_reused_by_caches(api):
+    client, _ = api
+
+    cache_control = client.get("/api/analytics").headers["Cache-Control"]
+
+    assert "public" in cache_control
+    assert "max-age=5" in cache_control
+    assert "must-revalidate" in cache_control
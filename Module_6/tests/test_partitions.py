@@ -0,0 +1,75 @@
+"""
+Tests for the term-year partitions of applicants, run against a real PostgreSQL
+server in a scratch schema. They are skipped when DATABASE_URL is not set.
+"""
+
+import os
+import pytest
+
+psycopg = pytest.importorskip("psycopg")
+
+pytestmark = [
+    pytest.mark.db,
+    pytest.mark.skipif(not os.environ.get("DATABASE_URL"),
+                       reason="needs a PostgreSQL server in DATABASE_URL"),
+]
+
+INSERT_APPLICANT = """
+    INSERT INTO applicants (program, url, term, term_season, term_year)
+    VALUES ('Computer Science, MIT', %s, %s, %s, %s)
+    RETURNING tableoid::regclass::text
+"""
+
+
+@pytest.fixture()
+def partitioned_db():
+    """Autocommit connection whose search_path is an empty scratch schema."""
+    from benchmarks.synthetic import scratch_schema
+
+    conn = psycopg.connect(os.environ["DATABASE_URL"], autocommit=True)
+    try:
+        with scratch_schema(conn, "partition_tests"):
+            yield conn
+    finally:
+        conn.close()
+
+
+def test_rows_route_to_their_year(partitioned_db):
+    with partitioned_db.cursor() as cur:
+        cur.execute(INSERT_APPLICANT, ("https://example.org/1", "Fall 2025", "Fall", 2025))
+        assert cur.fetchone()[0] == "applicants_y2025"
+        cur.execute(INSERT_APPLICANT, ("https://example.org/2", "F18?", None, None))
+        assert cur.fetchone()[0] == "applicants_default"
+
+
+def test_ensure_partitions_moves_rows_out_of_default(partitioned_db):
+    from etl.partitions import ensure_partitions
+
+    with partitioned_db.cursor() as cur:
+        cur.execute(INSERT_APPLICANT, ("https://example.org/3", "Fall 2031", "Fall", 2031))
+        assert cur.fetchone()[0] == "applicants_default"
+
+        # The worker calls it inside its insert transaction (LOCK needs one).
+        with partitioned_db.transaction():
+            assert ensure_partitions(cur, [2031, 2025, None]) == ["applicants_y2031"]
+            assert ensure_partitions(cur, [2031]) == []
+
+        cur.execute("SELECT tableoid::regclass::text FROM applicants WHERE term_year = 2031")
+        assert cur.fetchall() == [("applicants_y2031", )]
+
+
+def test_ids_are_unique_within_a_year(partitioned_db):
+    insert_with_id = """
+        INSERT INTO applicants (id, program, url, term_year) VALUES (%s, 'Physics', %s, %s)
+    """
+    with partitioned_db.cursor() as cur:
+        cur.execute(INSERT_APPLICANT, ("https://example.org/4", "Fall 2025", "Fall", 2025))
+        cur.execute("SELECT id FROM applicants")
+        row_id = cur.fetchone()[0]
+
+        with pytest.raises(psycopg.errors.UniqueViolation):
+            cur.execute(insert_with_id, (row_id, "https://example.org/5", 2025))
+        # Rows without a parsed year share one key space (NULLs are not distinct).
+        cur.execute(insert_with_id, (row_id, "https://example.org/6", None))
+        with pytest.raises(psycopg.errors.UniqueViolation):
+            cur.execute(insert_with_id, (row_id, "https://example.org/7", None))
@@ -0,0 +1,111 @@
+"""
+Tests for the long-lived task publisher, against the in-memory AMQP stand-in
+from benchmarks/amqp_standin.py.
+"""
+
+import json
+import threading
+import pytest
+from benchmarks.amqp_standin import AmqpStandIn
+
+pytestmark = pytest.mark.buttons
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    """A running stand-in broker, with the publisher pointed at it and reset."""
+    import publisher
+
+    publisher.close_publisher()
+    monkeypatch.setattr(publisher, "_STATS", dict.fromkeys(publisher._STATS, 0))
+    with AmqpStandIn() as standin:
+        monkeypatch.setenv("RABBITMQ_URL", standin.url)
+        yield standin
+        publisher.close_publisher()
+
+
+def kinds(broker):
+    """The task kinds the broker has stored, in order."""
+    return [json.loads(body)["kind"] for _, _, body in broker.messages]
+
+
+def test_publishes_share_one_connection(broker):
+    import publisher
+
+    publisher.publish_task("scrape_new_data", headers={"task_id": "abc"})
+    publisher.publish_task("recompute_analytics")
+
+    assert kinds(broker) == ["scrape_new_data", "recompute_analytics"]
+    assert broker.messages[0][1].headers == {"task_id": "abc"}
+    assert broker.messages[0][1].delivery_mode == 2
+    # The topology is declared once, not once per message.
+    assert broker.stats["connections"] == 1
+    assert broker.stats["declares"] == 3
+    assert publisher.publisher_stats()["publishes"] == 2
+
+
+def test_reconnects_after_the_connection_drops(broker):
+    import publisher
+
+    publisher.publish_task("scrape_new_data")
+    broker.drop_connections()
+    publisher.publish_task("recompute_analytics")
+
+    assert kinds(broker) == ["scrape_new_data", "recompute_analytics"]
+    assert broker.stats["connections"] == 2
+
+
+def pages(broker):
+    """The pages of the scrape_page tasks the broker has stored, in order."""
+    return [json.loads(body)["payload"]["page"] for _, _, body in broker.messages]
+
+
+def test_batches_are_published_with_confirms(broker):
+    import publisher
+
+    published = publisher.publish_tasks("scrape_page", [{"page": n} for n in range(25)],
+                                        batch_size=10)
+
+    assert published == 25
+    assert pages(broker) == list(range(25))
+    assert broker.stats["acks"] == 25
+    assert broker.stats["connections"] == 1
+    assert len({properties.message_id for _, properties, _ in broker.messages}) == 25
+    assert publisher.publisher_stats()["publishes"] == 3
+
+
+def test_an_interrupted_batch_resends_only_unconfirmed_messages(broker):
+    import publisher
+
+    publisher.publish_tasks("scrape_page", [{"page": n} for n in range(5)])
+    # The broker stores the third message of the next batch, then the connection
+    # drops before any of that batch is confirmed.
+    broker.drop_after(3)
+    publisher.publish_tasks("scrape_page", [{"page": n} for n in range(5, 15)])
+
+    assert broker.stats["connections"] == 2
+    # The first batch and the two confirmed messages of the second are not sent
+    # again. Only the third, stored but not confirmed before the drop, is
+    # repeated, under its message_id.
+    assert pages(broker) == list(range(8)) + list(range(7, 15))
+    ids = {}
+    for _, properties, body in broker.messages:
+        ids.setdefault(properties.message_id, set()).add(body)
+    assert len(ids) == 15 and all(len(bodies) == 1 for bodies in ids.values())
+
+
+def test_threads_can_publish_concurrently(broker):
+    import publisher
+
+    def publish_many():
+        for _ in range(20):
+            publisher.publish_task("recompute_analytics")
+
+    threads = [threading.Thread(target=publish_many) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(broker.messages) == 80
+    assert broker.stats["connections"] == 1
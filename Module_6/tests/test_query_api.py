@@ -0,0 +1,105 @@
+"""
+Tests for the parameterised query API. The database tests run against a real
+PostgreSQL server in a scratch schema and are skipped when DATABASE_URL is not set.
+"""
+
+import os
+import pytest
+
+psycopg = pytest.importorskip("psycopg")
+
+needs_database = pytest.mark.skipif(not os.environ.get("DATABASE_URL"),
+                                    reason="needs a PostgreSQL server in DATABASE_URL")
+
+
+@pytest.mark.analysis
+def test_parameters_are_validated_before_running():
+    from query_api import run_query
+
+    with pytest.raises(ValueError):
+        run_query(None, "term_count", term_season="Autumn")
+    with pytest.raises(ValueError):
+        run_query(None, "term_count", university="MIT")
+    with pytest.raises(ValueError):
+        run_query(None, "top_universities", limit=0)
+    with pytest.raises(KeyError):
+        run_query(None, "no_such_query")
+
+
+@pytest.fixture(scope="module")
+def analysis_db():
+    """A scratch schema with synthetic applicants, on an autocommit connection."""
+    from benchmarks.synthetic import scratch_schema, fill_applicants
+
+    conn = psycopg.connect(os.environ["DATABASE_URL"], autocommit=True)
+    try:
+        with scratch_schema(conn, "query_api_tests"):
+            fill_applicants(conn, 20000)
+            yield conn
+    finally:
+        conn.close()
+
+
+@pytest.mark.db
+@needs_database
+def test_defaults_answer_the_homepage_questions(analysis_db):
+    from query_api import run_query
+    from query_data import _applicant_stats
+
+    with analysis_db.cursor() as cur:
+        expected = _applicant_stats(cur)
+        # The synthetic universities tie, so compare the top count rather than the name.
+        cur.execute("SELECT MAX(n) FROM (SELECT COUNT(*) AS n FROM applicants "
+                    "WHERE term_season = 'Fall' AND term_year = 2025 "
+                    "GROUP BY llm_generated_university) AS counts")
+        top_count = cur.fetchone()[0]
+
+    def result(name):
+        return run_query(analysis_db, name)["result"]
+
+    assert result("term_count")["count"] == expected["count_f_2025"]
+    assert result("citizenship_share")["percentage"] == pytest.approx(
+        float(expected["percentage_international"]))
+    assert result("score_averages")["average_gre_aw"] == pytest.approx(
+        expected["average_gre_aw"])
+    assert result("acceptance_rate")["percentage"] == pytest.approx(
+        float(expected["percentage_accepted_f25"]))
+    assert result("program_count")["count"] == expected["count_jhu_cs_masters"]
+    assert result("program_acceptances")["count"] == expected["count_hoya_cs_phd_2025"]
+    assert result("top_universities")[0]["count"] == top_count
+    gpas = {row["university"]: row["average_gpa"] for row in result("university_gpa")}
+    assert gpas.get("University of Virginia") == pytest.approx(expected["uva_gpa"])
+    assert gpas.get("Virginia Tech") == pytest.approx(expected["vt_gpa"])
+
+
+@pytest.mark.db
+@needs_database
+def test_parameters_change_the_answer(analysis_db):
+    from query_api import run_query
+
+    with analysis_db.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM applicants "
+                    "WHERE term_season = 'Spring' AND term_year = 2021")
+        expected = cur.fetchone()[0]
+
+    answer = run_query(analysis_db, "term_count", term_season="Spring", term_year="2021")
+
+    assert answer["params"] == {"term_season": "Spring", "term_year": 2021}
+    assert answer["result"]["count"] == expected > 0
+    assert len(run_query(analysis_db, "top_universities", limit=5)["result"]) == 5
+
+
+@pytest.mark.db
+@needs_database
+def test_statements_are_prepared_once_per_connection(analysis_db):
+    from query_api import prepared_statements, query_stats, run_query
+
+    run_query(analysis_db, "accepted_gpa", term_year=2018)
+    prepared = prepared_statements(analysis_db)
+    for year in range(2019, 2024):
+        run_query(analysis_db, "accepted_gpa", term_year=year)
+
+    # The first call prepared the statement; the later ones reuse it.
+    assert prepared >= 1
+    assert prepared_statements(analysis_db) == prepared
+    assert query_stats()["accepted_gpa"]["calls"] >= 5
@@ -0,0 +1,220 @@
+"""
+EXPLAIN-based tests checking that the analysis statements use the index set, that
+term-filtered statements only read the matching term-year partition, and that no
+analytics statement does more sequential scans than its budget allows.
+
+These run against a real PostgreSQL server: they create a scratch schema from
+db/init.sql in the database named by DATABASE_URL, fill it with synthetic rows,
+and drop it afterwards. They are skipped when DATABASE_URL is not set.
+"""
+
+import os
+import pytest
+
+psycopg = pytest.importorskip("psycopg")
+
+pytestmark = [
+    pytest.mark.db,
+    pytest.mark.skipif(not os.environ.get("DATABASE_URL"),
+                       reason="needs a PostgreSQL server in DATABASE_URL"),
+]
+
+PLAN_TEST_ROWS = 60000
+
+# Statements selective enough that a sequential scan would be a regression.
+INDEXED_STATEMENTS = [
+    "count_jhu_cs_masters",
+    "count_hoya_cs_phd_2025",
+]
+
+# Statements filtered on the Fall 2025 term, which must be pruned to one partition.
+PRUNED_STATEMENTS = [
+    "count_f_2025",
+    "percentage_accepted_f25",
+    "average_gpa_accepted_f25",
+    "popular_u_f25",
+    "uva_vt_gpa",
+]
+
+# Sequential scans each analytics statement may do over populated partitions.
+# ALL_PARTITIONS marks statements that aggregate every applicant, which may read
+# each partition once; a statement doing more scans than this is a plan regression.
+ALL_PARTITIONS = "all"
+SEQ_SCAN_BUDGET = {
+    "count_f_2025": 1,
+    "applicant_totals": ALL_PARTITIONS,
+    "percentage_accepted_f25": 1,
+    "average_gpa_accepted_f25": 1,
+    "count_jhu_cs_masters": 0,
+    "count_hoya_cs_phd_2025": 0,
+    "popular_u_f25": 1,
+    "uva_vt_gpa": 1,
+}
+
+# The same budget for the parameterised queries, run with their default parameters.
+QUERY_API_SEQ_SCAN_BUDGET = {
+    "term_count": 1,
+    "citizenship_share": ALL_PARTITIONS,
+    "score_averages": ALL_PARTITIONS,
+    "citizenship_gpa": ALL_PARTITIONS,
+    "acceptance_rate": 1,
+    "accepted_gpa": 1,
+    "program_count": 0,
+    "program_acceptances": 0,
+    "top_universities": 1,
+    "university_gpa": 1,
+}
+
+
+@pytest.fixture(scope="module")
+def plan_db():
+    """Autocommit connection whose search_path is a filled scratch schema."""
+    from benchmarks.synthetic import scratch_schema, fill_applicants
+
+    conn = psycopg.connect(os.environ["DATABASE_URL"], autocommit=True)
+    try:
+        with scratch_schema(conn, "plan_tests"):
+            fill_applicants(conn, PLAN_TEST_ROWS)
+            yield conn
+    finally:
+        conn.close()
+
+
+def plan_nodes(conn, statement, params=None):
+    """Return every node of the statement's EXPLAIN plan as a flat list."""
+    with conn.cursor() as cur:
+        cur.execute(psycopg.sql.SQL("EXPLAIN (FORMAT JSON) ") + statement, params)
+        stack = [cur.fetchone()[0][0]["Plan"]]
+    nodes = []
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        stack.extend(node.get("Plans", []))
+    return nodes
+
+
+def populated_partitions(conn):
+    """Names of the applicants partitions that hold rows."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT DISTINCT tableoid::regclass::text FROM applicants")
+        return {row[0] for row in cur.fetchall()}
+
+
+def seq_scans(conn, statement, params=None):
+    """Sequential scans over populated partitions in the statement's plan."""
+    populated = populated_partitions(conn)
+    return [n["Relation Name"] for n in plan_nodes(conn, statement, params)
+            if n["Node Type"] == "Seq Scan" and n["Relation Name"] in populated]
+
+
+def check_budget(conn, budget, scans):
+    """Assert that `scans` stays within `budget` (ALL_PARTITIONS: one per partition)."""
+    if budget == ALL_PARTITIONS:
+        assert len(scans) == len(set(scans)), scans
+    else:
+        assert len(scans) <= budget, scans
+
+
+@pytest.mark.parametrize("name", INDEXED_STATEMENTS)
+def test_statement_uses_index(plan_db, name):
+    """Filtered analysis statements read applicants through an index, never a seq scan."""
+    from query_data import applicant_statements
+
+    statement = applicant_statements()[name]
+    nodes = plan_nodes(plan_db, statement)
+
+    # Empty partitions (a future year, the default) are always seq-scanned at no cost.
+    populated = populated_partitions(plan_db)
+    assert not [n for n in nodes
+                if n["Node Type"] == "Seq Scan" and n["Relation Name"] in populated]
+    assert [
+        n for n in nodes
+        if n["Node Type"] in ("Index Scan", "Index Only Scan", "Bitmap Index Scan")
+        and n["Index Name"].startswith("applicants_")
+    ]
+
+
+@pytest.mark.parametrize("name", PRUNED_STATEMENTS)
+def test_statement_prunes_partitions(plan_db, name):
+    """Term-filtered analysis statements read only the 2025 partition."""
+    from query_data import applicant_statements
+
+    statement = applicant_statements()[name]
+    nodes = plan_nodes(plan_db, statement)
+
+    assert {n["Relation Name"] for n in nodes if "Relation Name" in n} == {"applicants_y2025"}
+
+
+def test_every_analytics_statement_has_a_budget():
+    """New statements must be given a sequential-scan budget before they ship."""
+    from query_api import QUERIES
+    from query_data import applicant_statements
+
+    assert set(applicant_statements()) == set(SEQ_SCAN_BUDGET)
+    assert set(QUERIES) == set(QUERY_API_SEQ_SCAN_BUDGET)
+
+
+@pytest.mark.parametrize("name", SEQ_SCAN_BUDGET)
+def test_statement_seq_scans_within_budget(plan_db, name):
+    """run_queries statements scan applicants no more often than budgeted."""
+    from query_data import applicant_statements
+
+    scans = seq_scans(plan_db, applicant_statements()[name])
+    check_budget(plan_db, SEQ_SCAN_BUDGET[name], scans)
+
+
+@pytest.mark.parametrize("name", QUERY_API_SEQ_SCAN_BUDGET)
+def test_query_api_seq_scans_within_budget(plan_db, name):
+    """Parameterised queries, bound to their defaults, stay within their budget."""
+    from query_api import QUERIES, query_catalog
+
+    query = QUERIES[name]
+    scans = seq_scans(plan_db, query["statement"], query_catalog()[name])
+    check_budget(plan_db, QUERY_API_SEQ_SCAN_BUDGET[name], scans)
+
+
+def test_applicant_stats_runs_one_statement_per_entry(plan_db):
+    """The full recompute issues only its analytics statements, with no row count first."""
+    from query_data import applicant_statements, _applicant_stats
+
+    executed = []
+
+    class CountingCursor:
+        """Wraps a cursor, recording every statement it executes."""
+
+        def __init__(self, cur):
+            self.cur = cur
+
+        def execute(self, query, params=None):
+            executed.append(query)
+            return self.cur.execute(query, params)
+
+        def fetchone(self):
+            return self.cur.fetchone()
+
+    with plan_db.cursor() as cur:
+        _applicant_stats(CountingCursor(cur))
+
+    assert len(executed) == len(applicant_statements())
+
+
+def test_date_range_uses_date_index(plan_db):
+    """
+    A one-month date_added range can be answered through the (date_added, id)
+    index. Sequential scans are disabled to check that the index applies, not
+    that it wins at this table size.
+    """
+    statement = psycopg.sql.SQL("""
+        SELECT COUNT(*) FROM applicants
+        WHERE date_added >= DATE '2022-01-01' AND date_added < DATE '2022-02-01'
+    """)
+    with plan_db.cursor() as cur:
+        cur.execute("SET enable_seqscan = off")
+    try:
+        nodes = plan_nodes(plan_db, statement)
+    finally:
+        with plan_db.cursor() as cur:
+            cur.execute("RESET enable_seqscan")
+
+    # Partition indexes are named after their partition, e.g. applicants_y2022_date_added_id_idx.
+    assert [n for n in nodes if n.get("Index Name", "").endswith("_y2022_date_added_id_idx")]
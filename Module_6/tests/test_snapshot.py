@@ -0,0 +1,50 @@
+"""Tests for the snapshot files handed between the pipeline stages."""
+
+import gzip
+import json
+import pytest
+from etl.snapshot import load_records, read_snapshot, save_records, write_snapshot
+
+RECORDS = [
+    {"program": "Computer Science, MIT", "GPA": "3.90", "comments": "Fundé"},
+    {"program": "Physics, Université Laval", "GPA": None},
+]
+
+
+@pytest.mark.db
+def test_snapshot_round_trips_records(tmp_path):
+    path = tmp_path / "data.jsonl.gz"
+
+    assert save_records(path, RECORDS) == 2
+
+    # Keys a record lacks come back as None, in the schema's field order.
+    assert load_records(path) == [RECORDS[0], dict(RECORDS[1], comments=None)]
+    with gzip.open(path, "rt", encoding="utf-8") as source:
+        header = json.loads(source.readline())
+    assert header["fields"] == ["program", "GPA", "comments"]
+
+
+@pytest.mark.db
+def test_plain_json_paths_keep_the_old_format(tmp_path):
+    path = tmp_path / "data.json"
+
+    save_records(path, iter(RECORDS))
+
+    assert json.loads(path.read_text(encoding="utf-8")) == RECORDS
+    assert load_records(path) == RECORDS
+
+
+@pytest.mark.db
+def test_snapshot_rejects_fields_outside_the_schema(tmp_path):
+    with pytest.raises(ValueError):
+        write_snapshot(tmp_path / "data.jsonl.gz", RECORDS, fields=["program"])
+
+
+@pytest.mark.db
+def test_read_snapshot_rejects_other_files(tmp_path):
+    path = tmp_path / "other.jsonl.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as sink:
+        sink.write('{"rows": []}\n')
+
+    with pytest.raises(ValueError):
+        list(read_snapshot(path))
@@ -0,0 +1,120 @@
+"""Tests for the fingerprinted static build and its long-lived caching."""
+
+import gzip
+import io
+import os
+import pytest
+from flask import Flask, render_template_string
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The other Flask sites' copies of web/static_assets.py.
+COPIES = ["Module 1", "Module_3/website", "Module_4/src/website", "Module_5/src/website"]
+
+CSS = b"h1 {\n  color: #f9f7fa;\n  background-color: #280142;\n}\n" * 20
+
+
+@pytest.fixture
+def assets():
+    import static_assets
+
+    return static_assets
+
+
+def make_site(assets, static_dir, build=True):
+    """A Flask app serving `static_dir`, built first unless `build` is False."""
+    if build:
+        assets.build(str(static_dir))
+    app = Flask(__name__, static_folder=str(static_dir), static_url_path="/static")
+    app.add_url_rule("/", "home", lambda: render_template_string(
+        "<link rel=stylesheet href=\"{{ url_for('static', filename='style.css') }}\">"))
+    assets.init_app(app)
+    return app
+
+
+@pytest.mark.web
+def test_url_for_points_at_an_immutable_fingerprinted_copy(assets, tmp_path):
+    (tmp_path / "style.css").write_bytes(CSS)
+    app = make_site(assets, tmp_path)
+    client = app.test_client()
+
+    page = client.get("/").get_data(as_text=True)
+    url = page.split('href="')[1].split('"')[0]
+    assert url.startswith("/static/build/style.") and url.endswith(".css")
+
+    response = client.get(url, headers={"Accept-Encoding": ""})
+    assert response.data == CSS
+    assert response.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+    assert response.mimetype == "text/css"
+    assert assets.build_id(app)
+
+    # Editing the file gives it a new name, so cached copies are never stale.
+    (tmp_path / "style.css").write_bytes(CSS + b"p { color: #495057; }\n")
+    rebuilt = make_site(assets, tmp_path).test_client().get("/").get_data(as_text=True)
+    assert url not in rebuilt
+
+
+@pytest.mark.web
+@pytest.mark.parametrize("encoding", ["br", "gzip"])
+def test_stylesheets_are_served_precompressed(assets, tmp_path, encoding):
+    if encoding == "br" and assets.brotli is None:
+        pytest.skip("brotli is not installed")
+    (tmp_path / "style.css").write_bytes(CSS)
+    client = make_site(assets, tmp_path).test_client()
+    url = "/static/build/" + assets.build(str(tmp_path))["files"]["style.css"]
+
+    response = client.get(url, headers={"Accept-Encoding": encoding})
+    assert response.headers["Content-Encoding"] == encoding
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.mimetype == "text/css"
+    decode = {"gzip": gzip.decompress, "br": getattr(assets.brotli, "decompress", None)}
+    assert decode[encoding](response.data) == CSS
+    assert len(response.data) < len(CSS)
+
+
+@pytest.mark.web
+def test_images_are_scaled_down_and_rotated(assets, tmp_path):
+    image_module = pytest.importorskip("PIL.Image")
+    exif = image_module.Exif()
+    exif[0x0112] = 6  # Orientation: rotate 90 degrees clockwise to display.
+    photo = io.BytesIO()
+    image_module.effect_noise((2400, 1800), 60).convert("RGB").save(
+        photo, "JPEG", quality=95, exif=exif)
+    (tmp_path / "Photo.JPG").write_bytes(photo.getvalue())
+
+    built = assets.build(str(tmp_path), max_px=600)["files"]["Photo.JPG"]
+    assert built.endswith(".jpg")
+    data = (tmp_path / "build" / built).read_bytes()
+    assert len(data) < len(photo.getvalue())
+    with image_module.open(io.BytesIO(data)) as scaled:
+        assert scaled.size == (450, 600)
+        assert 0x0112 not in scaled.getexif()
+
+
+def test_building_images_without_pillow_fails(assets, tmp_path, monkeypatch):
+    monkeypatch.setattr(assets, "Image", None)
+    (tmp_path / "style.css").write_bytes(CSS)
+    (tmp_path / "photo.png").write_bytes(b"\x89PNG")
+
+    with pytest.raises(RuntimeError, match="Pillow is needed to optimise photo.png"):
+        assets.build(str(tmp_path))
+    # Stylesheets alone still build.
+    (tmp_path / "photo.png").unlink()
+    assert list(assets.build(str(tmp_path))["files"]) == ["style.css"]
+
+
+@pytest.mark.parametrize("site", COPIES)
+def test_other_sites_carry_an_identical_copy(assets, site):
+    with open(assets.__file__, "rb") as f:
+        reference = f.read()
+    with open(os.path.join(REPO_DIR, site, "static_assets.py"), "rb") as f:
+        assert f.read() == reference, f"{site}/static_assets.py differs from web/static_assets.py"
+
+
+@pytest.mark.web
+def test_without_a_build_static_files_are_left_alone(assets, tmp_path):
+    (tmp_path / "style.css").write_bytes(CSS)
+    app = make_site(assets, tmp_path, build=False)
+
+    assert 'href="/static/style.css"' in app.test_client().get("/").get_data(as_text=True)
+    assert assets.build_id(app) == ""
@@ -0,0 +1,331 @@
+"""
+Tests for the task registry: the web app registers a task, the worker records its
+progress and the web app reports it, and duplicate requests and messages are
+coalesced into the active task. They run against a real PostgreSQL server in a
+scratch schema and are skipped when DATABASE_URL is not set.
+"""
+
+import json
+import os
+from contextlib import nullcontext
+from types import SimpleNamespace
+import pytest
+
+psycopg = pytest.importorskip("psycopg")
+
+pytestmark = [
+    pytest.mark.db,
+    pytest.mark.skipif(not os.environ.get("DATABASE_URL"),
+                       reason="needs a PostgreSQL server in DATABASE_URL"),
+]
+
+
+@pytest.fixture
+def conn():
+    """Autocommit connection whose search_path is an empty scratch schema."""
+    from benchmarks.synthetic import scratch_schema
+
+    connection = psycopg.connect(os.environ["DATABASE_URL"], autocommit=True)
+    try:
+        with scratch_schema(connection, "task_registry_tests"):
+            yield connection
+    finally:
+        connection.close()
+
+
+def events(stream):
+    """Parse Server-Sent Events text into (event, data) pairs."""
+    parsed = []
+    for block in "".join(stream).split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines()
+                      if not line.startswith(":") and ": " in line)
+        if "event" in fields:
+            parsed.append((fields["event"], json.loads(fields["data"])))
+    return parsed
+
+
+def test_worker_progress_is_merged_into_the_task(conn):
+    from task_registry import claim_task, get_task
+    from etl.task_registry import finish_task, report_progress, start_task
+
+    task_id, _ = claim_task(conn, "scrape_new_data")
+    assert get_task(conn, task_id)["status"] == "queued"
+
+    start_task(task_id, "scrape_new_data", conn=conn)
+    report_progress(task_id, conn=conn, pages_fetched=2, rows_scraped=40)
+    report_progress(task_id, conn=conn, pages_fetched=3, rows_scraped=55)
+    finish_task(task_id, "succeeded", conn=conn, rows_inserted=50)
+
+    task = get_task(conn, task_id)
+    assert task["status"] == "succeeded"
+    assert task["progress"] == {"pages_fetched": 3, "rows_scraped": 55, "rows_inserted": 50}
+    assert task["started_at"] and task["finished_at"]
+    assert get_task(conn, "00000000-0000-0000-0000-000000000000") is None
+
+
+def test_event_stream_follows_the_task_until_it_finishes(conn):
+    from task_registry import claim_task, task_events
+    from etl.task_registry import finish_task, report_progress, start_task, single_flight
+
+    task_id, _ = claim_task(conn, "scrape_new_data")
+    # Advance the task between the stream's reads, as the worker would.
+    steps = iter([
+        lambda: None,
+        lambda: start_task(task_id, "scrape_new_data", conn=conn),
+        lambda: None,
+        lambda: report_progress(task_id, conn=conn, pages_fetched=1),
+        lambda: finish_task(task_id, "succeeded", conn=conn, rows_inserted=20),
+    ])
+
+    def checkout():
+        next(steps)()
+        return nullcontext(conn)
+
+    with single_flight("scrape_new_data", conn=conn):
+        parsed = events(task_events(task_id, checkout, poll_seconds=0))
+
+    assert [name for name, _ in parsed] == ["task", "task", "task", "task", "done"]
+    assert [data["status"] for _, data in parsed[:4]] == \
+        ["queued", "running", "running", "succeeded"]
+    assert parsed[2][1]["progress"] == {"pages_fetched": 1}
+    assert parsed[-1][1] == {"id": task_id, "status": "succeeded", "coalesced_into": None}
+
+
+@pytest.mark.web
+def test_pull_data_returns_a_task_to_follow(conn, monkeypatch):
+    import pages_bp
+    from app import app
+
+    published = []
+    monkeypatch.setattr(pages_bp, "publish_task",
+                        lambda kind, payload, headers: published.append((kind, headers)))
+    monkeypatch.setattr(pages_bp, "get_db_connection", lambda: conn)
+    client = app.test_client()
+
+    queued = client.post("/button-click")
+    body = queued.get_json()
+
+    assert queued.status_code == 202
+    assert published == [("scrape_new_data", {"task_id": body["task_id"]})]
+    assert queued.headers["Location"] == body["status_url"] == f"/api/tasks/{body['task_id']}"
+    status = client.get(body["status_url"]).get_json()
+    assert (status["kind"], status["status"]) == ("scrape_new_data", "queued")
+    assert client.get("/api/tasks/00000000-0000-0000-0000-000000000000").status_code == 404
+    assert client.get("/api/tasks/not-a-uuid").status_code == 404
+
+    # A second click, from this or any other web process, joins the queued scrape.
+    again = client.post("/button-click").get_json()
+    assert (again["status"], again["task_id"]) == ("coalesced", body["task_id"])
+    assert len(published) == 1
+    assert [task["id"] for task in client.get("/api/tasks").get_json()["active"]] == \
+        [body["task_id"]]
+    assert client.post("/another-button-click").status_code == 409
+
+
+@pytest.mark.integration
+def test_consumer_records_progress_and_acks(conn, monkeypatch):
+    import consumer
+    import etl.task_registry
+    from benchmarks.synthetic import scraped_entries
+    from task_registry import claim_task, get_task
+
+    conn.execute("""
+        CREATE TABLE ingestion_watermarks (
+            source TEXT PRIMARY KEY, last_seen TEXT, updated_at TIMESTAMPTZ DEFAULT now())
+    """)
+    checkout = lambda: nullcontext(conn)  # pylint: disable=C3001
+    monkeypatch.setattr(etl.task_registry, "connection", checkout)
+    monkeypatch.setattr(consumer, "get_db_connection", checkout)
+
+    def scrape(recent_id, on_page):
+        for page in (1, 2):
+            on_page(page, 10 * page)
+        return scraped_entries(20)
+
+    monkeypatch.setattr(consumer, "updated_scrape", scrape)
+    monkeypatch.setattr(consumer, "process_data_with_llm", lambda rows: [
+        dict(row, id=n, **{"llm-generated-program": "CS", "llm-generated-university": "MIT"})
+        for n, row in enumerate(rows)])
+    acked = []
+    channel = SimpleNamespace(basic_ack=lambda delivery_tag: acked.append(delivery_tag),
+                              basic_nack=lambda **kwargs: acked.append("nack"))
+
+    task_id, _ = claim_task(conn, "scrape_new_data")
+    consumer.callback(channel, SimpleNamespace(delivery_tag=7),
+                      SimpleNamespace(headers={"task_id": task_id}),
+                      json.dumps({"kind": "scrape_new_data"}))
+
+    task = get_task(conn, task_id)
+    assert acked == [7]
+    assert task["status"] == "succeeded"
+    assert task["progress"] == {"pages_fetched": 2, "rows_scraped": 20, "rows_cleaned": 20,
+                                "rows_standardised": 20, "rows_inserted": 20,
+                                "rows_updated": 0, "rows_skipped": 0}
+
+
+def test_duplicate_requests_join_the_active_task(conn):
+    from task_registry import claim_task
+    from etl.task_registry import finish_task
+
+    first, created = claim_task(conn, "scrape_new_data")
+    again, created_again = claim_task(conn, "scrape_new_data")
+    other, _ = claim_task(conn, "recompute_analytics")
+
+    assert created and not created_again
+    assert again == first != other
+
+    finish_task(first, "succeeded", conn=conn)
+    after, created_after = claim_task(conn, "scrape_new_data")
+    assert created_after and after != first
+
+
+def test_running_task_is_expired_once_its_worker_lock_is_gone(conn):
+    from task_registry import active_tasks, claim_task, get_task
+    from etl.task_registry import LOCK_KEY, LOCK_NAMESPACE, start_task
+
+    task_id, _ = claim_task(conn, "scrape_new_data")
+    worker = psycopg.connect(os.environ["DATABASE_URL"], autocommit=True)
+    try:
+        worker.execute(f"SELECT pg_advisory_lock(%s, {LOCK_KEY})",
+                       (LOCK_NAMESPACE, "scrape_new_data"))
+        start_task(task_id, "scrape_new_data", conn=conn)
+        # While the worker holds the lock, the running task stays active.
+        assert claim_task(conn, "scrape_new_data") == (task_id, False)
+        # The worker dies without unlocking; its session's lock goes with it. Wait
+        # for the backend to exit, as a plain close() returns before the lock is freed.
+        conn.execute("SELECT pg_terminate_backend(%s, 5000)", (worker.info.backend_pid, ))
+    finally:
+        worker.close()
+
+    assert active_tasks(conn) == []
+    assert (get_task(conn, task_id)["status"], get_task(conn, task_id)["error"]) == \
+        ("failed", "worker_lost")
+    assert claim_task(conn, "scrape_new_data")[1]
+
+
+@pytest.mark.integration
+def test_duplicate_message_is_coalesced_into_the_running_task(conn, monkeypatch):
+    import consumer
+    import etl.task_registry
+    from task_registry import claim_task, get_task
+    from etl.task_registry import finish_task, single_flight, start_task
+
+    monkeypatch.setattr(etl.task_registry, "connection", lambda: nullcontext(conn))
+    running, _ = claim_task(conn, "scrape_new_data")
+    start_task(running, "scrape_new_data", conn=conn)
+    # A message sent by hand, duplicating the running scrape.
+    duplicate = "11111111-1111-1111-1111-111111111111"
+    conn.execute("INSERT INTO tasks (id, kind, status) VALUES (%s, 'scrape_new_data', 'failed')",
+                 (duplicate, ))
+    acked, ran = [], []
+    channel = SimpleNamespace(basic_ack=lambda delivery_tag: acked.append(delivery_tag),
+                              basic_nack=lambda **kwargs: acked.append("nack"))
+
+    other_worker = psycopg.connect(os.environ["DATABASE_URL"], autocommit=True)
+    try:
+        with single_flight("scrape_new_data", conn=other_worker):
+            consumer.run_single_flight("scrape_new_data", channel,
+                                       SimpleNamespace(delivery_tag=3), duplicate,
+                                       lambda: ran.append(True))
+        # Once the lock is free the next message runs.
+        consumer.run_single_flight("scrape_new_data", channel, SimpleNamespace(delivery_tag=4),
+                                   running, lambda: ran.append(True))
+    finally:
+        other_worker.close()
+    finish_task(running, "succeeded", conn=conn)
+
+    task = get_task(conn, duplicate)
+    assert (task["status"], task["coalesced_into"]) == ("coalesced", running)
+    assert acked == [3]
+    assert ran == [True]
+
+
+@pytest.mark.integration
+def test_task_fails_when_the_lock_cannot_be_taken(conn, monkeypatch):
+    import consumer
+    import etl.task_registry
+    from task_registry import active_tasks, claim_task, get_task
+
+    def broken_single_flight(kind):
+        raise psycopg.OperationalError("connection refused")
+
+    monkeypatch.setattr(etl.task_registry, "connection", lambda: nullcontext(conn))
+    monkeypatch.setattr(consumer, "single_flight", broken_single_flight)
+    acked, ran = [], []
+    channel = SimpleNamespace(basic_ack=lambda delivery_tag: acked.append(delivery_tag),
+                              basic_nack=lambda **kwargs: acked.append("nack"))
+
+    task_id, _ = claim_task(conn, "scrape_new_data")
+    consumer.run_single_flight("scrape_new_data", channel, SimpleNamespace(delivery_tag=5),
+                               task_id, lambda: ran.append(True))
+
+    task = get_task(conn, task_id)
+    assert (task["status"], task["error"]) == ("failed", "connection refused")
+    assert acked == ["nack"] and ran == []
+    # The failed task no longer absorbs new requests.
+    assert active_tasks(conn) == []
+    assert claim_task(conn, "scrape_new_data")[1]
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("scrape, clean, standardise, outcome", [
+    (lambda: [], None, None, ("succeeded", None, 7)),
+    (lambda: [{}], lambda rows: [], None,
+     ("failed", "no valid entries after cleaning", 7)),
+    (lambda: [{}], lambda rows: rows, lambda rows: None,
+     ("failed", "LLM processing returned no data", 7)),
+    (lambda: 1 / 0, None, None, ("failed", "division by zero", "nack")),
+])
+def test_scrapes_without_rows_to_insert_settle_the_task(conn, monkeypatch, scrape, clean,
+                                                        standardise, outcome):
+    import consumer
+    import etl.task_registry
+    from task_registry import claim_task, get_task
+
+    conn.execute("CREATE TABLE ingestion_watermarks (source TEXT PRIMARY KEY, last_seen TEXT)")
+    checkout = lambda: nullcontext(conn)  # pylint: disable=C3001
+    monkeypatch.setattr(etl.task_registry, "connection", checkout)
+    monkeypatch.setattr(consumer, "get_db_connection", checkout)
+    monkeypatch.setattr(consumer, "updated_scrape", lambda recent_id, on_page: scrape())
+    monkeypatch.setattr(consumer, "clean_data", clean)
+    monkeypatch.setattr(consumer, "process_data_with_llm", standardise)
+    acked = []
+    channel = SimpleNamespace(basic_ack=lambda delivery_tag: acked.append(delivery_tag),
+                              basic_nack=lambda **kwargs: acked.append("nack"))
+
+    task_id, _ = claim_task(conn, "scrape_new_data")
+    consumer.callback(channel, SimpleNamespace(delivery_tag=7),
+                      SimpleNamespace(headers={"task_id": task_id}),
+                      json.dumps({"kind": "scrape_new_data"}))
+
+    task = get_task(conn, task_id)
+    assert (task["status"], task["error"], acked[0]) == outcome
+    assert len(acked) == 1
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("queries, status", [
+    (lambda: {"answers": []}, "succeeded"),
+    (lambda: 1 / 0, "failed"),
+])
+def test_recompute_messages_run_the_queries_and_ack(conn, monkeypatch, queries, status):
+    import consumer
+    import etl.task_registry
+    from task_registry import claim_task, get_task
+
+    monkeypatch.setattr(etl.task_registry, "connection", lambda: nullcontext(conn))
+    monkeypatch.setattr(consumer, "run_queries", queries)
+    acked = []
+    channel = SimpleNamespace(basic_ack=lambda delivery_tag: acked.append(delivery_tag),
+                              basic_nack=lambda **kwargs: acked.append("nack"))
+
+    task_id, _ = claim_task(conn, "recompute_analytics")
+    consumer.callback(channel, SimpleNamespace(delivery_tag=8),
+                      SimpleNamespace(headers={"task_id": task_id}),
+                      json.dumps({"kind": "recompute_analytics"}))
+    # Messages of an unknown kind are dropped rather than left to stall the queue.
+    consumer.callback(channel, SimpleNamespace(delivery_tag=9), SimpleNamespace(headers=None),
+                      json.dumps({"kind": "reindex"}))
+
+    assert get_task(conn, task_id)["status"] == status
+    assert acked == [8, 9]
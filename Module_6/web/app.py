@@ -1,9 +1,12 @@
 """
 This module sets up a Flask app, registers blueprints, and starts the server.
-It is intended to be run as the main module.
+Running it directly starts the single-process Flask development server; in
+production the app is served by gunicorn (see gunicorn.conf.py).
 
 Usage:
-    python src/website/app.py
+    python app.py                             (development)
+    gunicorn -c gunicorn.conf.py app:app      (production)
+    python static_assets.py                   (build fingerprinted static files)
 
 Environment Variables:
     PORT (optional): The port number on which to run the Flask app. Defaults to 5000.
@@ -19,6 +22,8 @@ Notes:
 import os
 from flask import Flask
 from pages_bp import pages
+import db_pool
+import static_assets
 
 # Instantiate app, create key to let us use Flash statements.
 app = Flask(__name__)
@@ -27,6 +32,12 @@ app.secret_key = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-product
 # Call blueprint from pages module.
 app.register_blueprint(pages)
 
+# Return each request's pooled database connection when the request ends.
+db_pool.init_app(app)
+
+# Serve content-hashed static files with long-lived caching, once built.
+static_assets.init_app(app)
+
 # Run web application.
 if __name__ == "__main__":
     # Get configuration from environment variables with sensible defaults
@@ -0,0 +1,233 @@
+"""
+This module serves the rows of the `applicants` table, filtered, one page at a
+time or as a full export.
+
+Pages are keyset-paginated on (date_added, id), newest first. Each page ends
+with an opaque cursor holding the last row's key, and the next page starts
+strictly after it, so every page is an index range scan of `limit` rows however
+deep the client has paged (an OFFSET would read and discard every earlier row).
+Rows without a date_added sort last and are paged by id alone. Pages and
+exports are read in index order from the (date_added, id) index, merged across
+the term-year partitions, with no sort. The university filter has its own
+(llm_generated_university, date_added, id) index, and a term filter prunes the
+scan to one partition.
+
+Exports stream every matching row as CSV or NDJSON from a server-side cursor,
+fetching EXPORT_BATCH_ROWS rows at a time, so memory use does not grow with
+the size of the export. The export holds one pooled connection while it runs.
+
+Environment Variables:
+    EXPORT_BATCH_ROWS (optional): Rows fetched per round trip by an export. Defaults to 2000.
+
+Functions:
+    parse_filters(args) -> dict
+        Validate the filter parameters of a request.
+    where_clause(filters) -> tuple
+        The SQL condition for the filters and its parameters.
+    applicant_page(conn, filters, cursor=None, limit=50) -> dict
+        One page of applicants and the cursor of the next page.
+    export_rows(checkout, filters, fmt) -> Iterator[str]
+        Every matching applicant as CSV or NDJSON text, in chunks.
+
+Usage:
+    $ curl "localhost:8080/api/applicants?term=Fall%202025&status=Accepted&limit=100"
+    $ curl "localhost:8080/api/applicants?cursor=MjAyNS0wMy0wMTo0MjE3"
+    $ curl "localhost:8080/api/applicants/export?format=csv&university=Stanford%20University"
+"""
+
+import base64
+import binascii
+import csv
+import io
+import json
+import os
+from datetime import date
+import psycopg
+from query_api import TERM_SEASONS
+
+DECISIONS = ("Accepted", "Rejected", "Wait listed", "Interview", "Other")
+EXPORT_FORMATS = ("csv", "ndjson")
+EXPORT_BATCH_ROWS = int(os.environ.get("EXPORT_BATCH_ROWS", 2000))
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+COLUMNS = ("id", "date_added", "term", "status", "program", "degree",
+           "llm_generated_university", "llm_generated_program", "us_or_international",
+           "gpa", "gre", "gre_v", "gre_aw", "url", "comments")
+
+# Request parameter -> column it filters (term and status filter the parsed columns).
+FILTERS = {
+    "term": ("term_season", "term_year"),
+    "status": "decision",
+    "university": "llm_generated_university",
+    "program": "llm_generated_program",
+    "degree": "degree",
+    "citizenship": "us_or_international",
+}
+
+# Sorts after every real date, so the first page starts from the newest row.
+_FIRST_KEY = {"after_date": date.max, "after_id": 2 ** 31 - 1}
+
+_SELECT = psycopg.sql.SQL(", ").join(psycopg.sql.Identifier(column) for column in COLUMNS)
+
+# Dated rows after the cursor, then (once those run out) undated rows by id. A
+# cursor on an undated row has after_date NULL, which leaves the first branch empty.
+_PAGE = """
+    (SELECT {columns} FROM applicants
+     WHERE {filters} AND (date_added, id) < (%(after_date)s, %(after_id)s)
+     ORDER BY date_added DESC NULLS LAST, id DESC LIMIT %(limit)s)
+    UNION ALL
+    (SELECT {columns} FROM applicants
+     WHERE {filters} AND date_added IS NULL
+       AND (%(after_date)s::date IS NOT NULL OR id < %(after_id)s)
+     ORDER BY id DESC LIMIT %(limit)s)
+    ORDER BY date_added DESC NULLS LAST, id DESC
+    LIMIT %(limit)s
+"""
+
+_EXPORT = """
+    SELECT {columns} FROM applicants WHERE {filters}
+    ORDER BY date_added DESC NULLS LAST, id DESC
+"""
+
+
+def _term(value):
+    """Split a term such as "Fall 2025" into (season, year)."""
+    parts = value.split()
+    if len(parts) != 2 or parts[0].capitalize() not in TERM_SEASONS or not parts[1].isdigit():
+        raise ValueError(f"term must look like 'Fall 2025', with a season from "
+                         f"{', '.join(TERM_SEASONS)}")
+    return parts[0].capitalize(), int(parts[1])
+
+
+def _decision(value):
+    """Validate a decision."""
+    for decision in DECISIONS:
+        if value.lower() == decision.lower():
+            return decision
+    raise ValueError(f"status must be one of {', '.join(DECISIONS)}")
+
+
+def parse_filters(args):
+    """
+    Return the filters given in `args` (a request's query string) as
+    {parameter: value}, with term parsed into (season, year). Raises ValueError
+    for an invalid value.
+    """
+    filters = {}
+    for param in FILTERS:
+        value = args.get(param)
+        if value is None or value == "":
+            continue
+        if param == "term":
+            filters[param] = _term(value)
+        elif param == "status":
+            filters[param] = _decision(value)
+        else:
+            filters[param] = value
+    return filters
+
+
+def where_clause(filters):
+    """The WHERE clause for `filters` and its parameters."""
+    clauses, params = [psycopg.sql.SQL("TRUE")], {}
+    for param, value in filters.items():
+        columns = FILTERS[param] if param == "term" else (FILTERS[param], )
+        values = value if param == "term" else (value, )
+        for column, column_value in zip(columns, values):
+            clauses.append(psycopg.sql.SQL("{} = {}").format(
+                psycopg.sql.Identifier(column), psycopg.sql.Placeholder(column)))
+            params[column] = column_value
+    return psycopg.sql.SQL(" AND ").join(clauses), params
+
+
+def encode_cursor(row):
+    """The opaque cursor for the page after `row` (a dict with date_added and id)."""
+    after_date = row["date_added"] or ""
+    token = f"{after_date}:{row['id']}".encode("ascii")
+    return base64.urlsafe_b64encode(token).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return the {after_date, after_id} key stored in `cursor`; raises ValueError."""
+    try:
+        token = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+        after_date, after_id = token.split(":")
+        return {"after_date": date.fromisoformat(after_date) if after_date else None,
+                "after_id": int(after_id)}
+    except (binascii.Error, UnicodeDecodeError, ValueError) as error:
+        raise ValueError("invalid cursor") from error
+
+
+def _limit(value):
+    """Validate a page size."""
+    value = int(value)
+    if not 1 <= value <= MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+    return value
+
+
+def _record(row):
+    """A row as a JSON-ready dict."""
+    record = dict(zip(COLUMNS, row))
+    if record["date_added"] is not None:
+        record["date_added"] = record["date_added"].isoformat()
+    return record
+
+
+def _page_query(filters, cursor, limit):
+    """The page statement for `filters` and its parameters."""
+    where, params = where_clause(filters)
+    params.update(decode_cursor(cursor) if cursor else _FIRST_KEY)
+    params["limit"] = _limit(limit)
+    return psycopg.sql.SQL(_PAGE).format(columns=_SELECT, filters=where), params
+
+
+def applicant_page(conn, filters, cursor=None, limit=DEFAULT_LIMIT):
+    """
+    Return {"applicants": [...], "next_cursor": str | None}: up to `limit`
+    applicants matching `filters`, newest first, starting after `cursor` (from
+    the previous page). next_cursor is None on the last page. Raises ValueError
+    for an invalid cursor or limit.
+    """
+    statement, params = _page_query(filters, cursor, limit)
+    with conn.cursor() as cur:
+        cur.execute(statement, params, prepare=True)
+        rows = [_record(row) for row in cur.fetchall()]
+    return {"applicants": rows,
+            "next_cursor": encode_cursor(rows[-1]) if len(rows) == params["limit"] else None}
+
+
+def export_rows(checkout, filters, fmt):
+    """
+    Yield every applicant matching `filters`, newest first, as CSV (with a
+    header row) or NDJSON text in chunks of EXPORT_BATCH_ROWS rows. Rows are read
+    through a server-side cursor on a connection from `checkout()`, a context
+    manager that is held until the export ends.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    where, params = where_clause(filters)
+
+    if fmt == "csv":
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(COLUMNS)
+        yield out.getvalue()
+
+    with checkout() as conn, conn.transaction(), conn.cursor(name="applicants_export") as cur:
+        cur.itersize = EXPORT_BATCH_ROWS
+        cur.execute(psycopg.sql.SQL(_EXPORT).format(columns=_SELECT, filters=where), params)
+        while True:
+            rows = cur.fetchmany(EXPORT_BATCH_ROWS)
+            if not rows:
+                return
+            if fmt == "csv":
+                out.seek(0)
+                out.truncate()
+                writer.writerows(rows)
+                yield out.getvalue()
+            else:
+                yield "".join(json.dumps(_record(row), ensure_ascii=False) + "\n"
+                              for row in rows)
@@ -0,0 +1,123 @@
+"""
+This module answers the `run_queries` questions with asyncio. The independent
+analysis statements are issued concurrently, each on its own connection from a
+`psycopg_pool.AsyncConnectionPool` of `psycopg.AsyncConnection`s, so answering
+takes as long as the slowest statement rather than the sum of all of them.
+
+The statements and the formatting of `query_results` are the ones in
+`query_data`; only the scheduling differs. Each statement runs in its own
+transaction, so an ingest committing mid-way can show in some answers and not
+others, exactly as between two sequential page loads.
+
+Flask views are synchronous, so the async pool lives on one event loop running
+in a background thread. `run_queries_concurrently` submits work to that loop and
+blocks until the answers are assembled.
+
+Environment Variables:
+    DATABASE_URL (str): PostgreSQL connection string used to connect to the database.
+    ASYNC_POOL_MAX_SIZE (optional): Connections available to concurrent statements.
+        Defaults to 8, one per statement of the full recompute. Each gunicorn
+        worker opens this pool on top of db_pool's when ASYNC_QUERIES is set.
+
+Functions:
+    open_async_pool(conninfo=None, **kwargs) -> AsyncConnectionPool (coroutine)
+        Open an async connection pool.
+    fetch_stats(pool, source="rollup") -> dict (coroutine)
+        Run the statements of `source` concurrently and collect their raw values.
+    run_queries_async(pool, source="rollup") -> dict (coroutine)
+        The `run_queries` answers, computed concurrently.
+    run_queries_concurrently(source="rollup", timeout=None) -> dict
+        Blocking wrapper for synchronous callers, using a shared background loop.
+    close_async_pool() -> None
+        Close the shared pool and stop its loop (used on shutdown).
+
+Usage:
+    >>> from async_queries import run_queries_concurrently
+    >>> results = run_queries_concurrently(source="applicants")
+"""
+
+import asyncio
+import os
+import threading
+from psycopg_pool import AsyncConnectionPool
+from db_pool import database_url
+from query_data import SOURCE_STATEMENTS, _collect, format_results
+
+POOL_MAX_SIZE = int(os.environ.get("ASYNC_POOL_MAX_SIZE", 8))
+
+_LOOP = None
+_POOL = None
+_LOCK = threading.Lock()
+
+
+async def open_async_pool(conninfo=None, **kwargs):
+    """Open and return an async connection pool; `kwargs` go to AsyncConnectionPool."""
+    kwargs.setdefault("max_size", POOL_MAX_SIZE)
+    pool = AsyncConnectionPool(conninfo=conninfo or database_url(),
+                               min_size=1,
+                               check=AsyncConnectionPool.check_connection,
+                               name="web-async",
+                               open=False,
+                               **kwargs)
+    await pool.open()
+    return pool
+
+
+async def _fetch(pool, name, statement):
+    """Run one statement on a connection of its own; returns (name, first row)."""
+    async with pool.connection() as conn:
+        cur = await conn.execute(statement)
+        return name, await cur.fetchone()
+
+
+async def fetch_stats(pool, source="rollup"):
+    """Run every statement of `source` concurrently and collect the raw analysis values."""
+    if source not in SOURCE_STATEMENTS:
+        raise ValueError(f"Unknown query source: {source}")
+
+    rows = await asyncio.gather(*(_fetch(pool, name, statement)
+                                  for name, statement in SOURCE_STATEMENTS[source].items()))
+    stats = {}
+    for name, row in rows:
+        _collect(stats, name, row)
+    return stats
+
+
+async def run_queries_async(pool, source="rollup"):
+    """Return the same `query_results` as run_queries, with the statements run concurrently."""
+    return format_results(await fetch_stats(pool, source))
+
+
+def _shared_pool():
+    """Start the background loop and open the shared pool on it, once."""
+    global _LOOP, _POOL  # pylint: disable=W0603
+    with _LOCK:
+        if _LOOP is None:
+            _LOOP = asyncio.new_event_loop()
+            threading.Thread(target=_LOOP.run_forever, name="async-queries",
+                             daemon=True).start()
+        if _POOL is None:
+            _POOL = asyncio.run_coroutine_threadsafe(open_async_pool(), _LOOP).result()
+    return _LOOP, _POOL
+
+
+def run_queries_concurrently(source="rollup", timeout=None):
+    """
+    Answer the questions concurrently from a synchronous caller (such as a Flask view).
+    Waits at most `timeout` seconds for the answers when given.
+    """
+    loop, pool = _shared_pool()
+    return asyncio.run_coroutine_threadsafe(run_queries_async(pool, source),
+                                            loop).result(timeout)
+
+
+def close_async_pool():
+    """Close the shared pool and stop the background loop."""
+    global _LOOP, _POOL  # pylint: disable=W0603
+    with _LOCK:
+        if _POOL is not None:
+            asyncio.run_coroutine_threadsafe(_POOL.close(), _LOOP).result()
+            _POOL = None
+        if _LOOP is not None:
+            _LOOP.call_soon_threadsafe(_LOOP.stop)
+            _LOOP = None
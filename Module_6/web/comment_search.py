@@ -0,0 +1,125 @@
+"""
+This module searches applicant comments with PostgreSQL full-text search.
+
+`comments_tsv` is a stored generated column holding
+to_tsvector('english', comments), indexed with GIN (see db/init.sql). Because
+PostgreSQL computes it on every insert and update, the ingest path keeps it
+current without writing it. A search is parsed with websearch_to_tsquery, so it
+takes what users type into a search box: words, "quoted phrases", `or`, and
+`-excluded` words. The newest RANK_CANDIDATES matching rows are ranked with
+ts_rank_cd (matches close together and in phrases count for more), and only
+the top `limit` of them are given a highlighted snippet from ts_headline. The
+statement is planned with the search words, so rare words are looked up in the
+GIN index while a word found in most comments walks the date index and stops
+after the candidates.
+
+Snippets are HTML-escaped, with the matched words wrapped in <mark>...</mark>.
+The search also takes the applicant filters of /api/applicants (term, status,
+university, program, degree, citizenship).
+
+Environment Variables:
+    COMMENT_SEARCH_CANDIDATES (optional): Newest matches ranked per search. Defaults to 2000.
+
+Functions:
+    search_comments(conn, text, filters=None, limit=20) -> dict
+        The best-ranked matching comments with snippets, and the latency.
+
+Usage:
+    $ curl "localhost:8080/api/comments/search?q=full+funding+-waitlist&term=Fall%202025"
+"""
+
+import html
+import os
+import time
+import psycopg
+from applicant_api import where_clause
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+MAX_QUERY_LENGTH = 200
+RANK_CANDIDATES = int(os.environ.get("COMMENT_SEARCH_CANDIDATES", 2000))
+
+# Control characters mark the matches, so the comment text can be escaped as a
+# whole and the marks turned into tags afterwards.
+_START, _STOP = "\x02", "\x03"
+HEADLINE_OPTIONS = (f"StartSel={_START}, StopSel={_STOP}, MaxWords=35, MinWords=15, "
+                    "MaxFragments=2, FragmentDelimiter=\" … \"")
+
+COLUMNS = ("id", "date_added", "term", "status", "llm_generated_university",
+           "llm_generated_program", "degree")
+
+_QUERY = psycopg.sql.SQL("websearch_to_tsquery('english', %(text)s)")
+
+# The newest RANK_CANDIDATES matches are ranked, the best `limit` of those get a
+# snippet. Ranking reads every candidate's tsvector, so without the cap a search
+# for a word in most comments would rank most of the table.
+_SEARCH = """
+    SELECT {columns}, rank, ts_headline('english', comments, {query}, %(options)s)
+    FROM (
+        SELECT {columns}, comments, ts_rank_cd(comments_tsv, {query}) AS rank
+        FROM (
+            SELECT {columns}, comments, comments_tsv FROM applicants
+            WHERE comments_tsv @@ {query} AND {filters}
+            ORDER BY date_added DESC NULLS LAST, id DESC
+            LIMIT %(candidates)s
+        ) AS recent
+        ORDER BY rank DESC, date_added DESC NULLS LAST, id DESC
+        LIMIT %(limit)s
+    ) AS best
+    ORDER BY rank DESC, date_added DESC NULLS LAST, id DESC
+"""
+
+
+def _snippet(headline):
+    """Escape a ts_headline fragment and turn its match marks into <mark> tags."""
+    return html.escape(headline).replace(_START, "<mark>").replace(_STOP, "</mark>")
+
+
+def _text(value):
+    """Validate the search text."""
+    value = (value or "").strip()
+    if not value:
+        raise ValueError("q is required")
+    if len(value) > MAX_QUERY_LENGTH:
+        raise ValueError(f"q must be at most {MAX_QUERY_LENGTH} characters")
+    return value
+
+
+def _limit(value):
+    """Validate a result count."""
+    value = int(value)
+    if not 1 <= value <= MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+    return value
+
+
+def search_comments(conn, text, filters=None, limit=DEFAULT_LIMIT):
+    """
+    Return the `limit` applicants whose comments best match `text` (most recent
+    first among equal ranks), optionally narrowed by applicant `filters`, each
+    with its rank and a highlighted snippet, plus the latency in milliseconds.
+    Raises ValueError for empty or overlong text and an invalid limit.
+    """
+    where, params = where_clause(filters or {})
+    params.update(text=_text(text), limit=_limit(limit), candidates=RANK_CANDIDATES,
+                  options=HEADLINE_OPTIONS)
+    columns = psycopg.sql.SQL(", ").join(psycopg.sql.Identifier(column) for column in COLUMNS)
+
+    started = time.perf_counter()
+    with conn.cursor() as cur:
+        # Not prepared: the planner needs the search words to estimate how many rows
+        # match, which decides between the GIN index and walking the date index.
+        cur.execute(psycopg.sql.SQL(_SEARCH).format(columns=columns, filters=where, query=_QUERY),
+                    params)
+        rows = cur.fetchall()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    results = []
+    for row in rows:
+        result = dict(zip(COLUMNS, row))
+        if result["date_added"] is not None:
+            result["date_added"] = result["date_added"].isoformat()
+        result["rank"] = round(row[-2], 6)
+        result["snippet"] = _snippet(row[-1])
+        results.append(result)
+    return {"query": params["text"], "results": results, "elapsed_ms": round(elapsed_ms, 3)}
@@ -0,0 +1,128 @@
+"""
+Gunicorn settings for serving the web app in production (the Docker image's CMD).
+
+The Flask development server started by `python app.py` runs in one process, so
+it can only use one core. Gunicorn runs WEB_WORKERS processes with WEB_THREADS
+threads each (the gthread worker), so requests are spread over every core while
+each process still overlaps the time its threads spend waiting on PostgreSQL.
+State that every process must agree on (the task registry, which coalesces
+duplicate "Pull Data" clicks, and optionally the rendered-page cache) lives in
+PostgreSQL, not in module variables.
+
+The app is imported once in the master before the workers are forked
+(preload_app), so workers start quickly and share the imported code. Database
+pools and the broker connection are opened lazily on first use, so each worker
+opens its own connections after the fork; they are closed when the worker exits.
+
+Connection budget:
+    Each worker may open up to DB_POOL_MAX_SIZE connections (one per thread by
+    default; a request holds at most one) plus, with ASYNC_QUERIES on,
+    ASYNC_POOL_MAX_SIZE for the concurrent homepage statements. A task event
+    stream (/api/tasks/<id>/events) occupies a thread for up to
+    TASK_STREAM_MAX_SECONDS but borrows a connection only for each poll, so it
+    is covered by the one-per-thread sizing. Unless WEB_WORKERS is set, the
+    number of workers is lowered from 2 * CPUs + 1 to what fits in
+    WEB_DB_CONNECTION_BUDGET (at least one), with a warning in the log. On
+    start, workers x per-worker connections is checked against the budget and
+    gunicorn refuses to start when it is over, which only happens when
+    WEB_WORKERS or the pool sizes are set above it. Keep the budget below the
+    server's max_connections (100 by default) less the worker service's pool,
+    loads and admin sessions.
+
+Reloading:
+    kill -HUP <master pid>    Start new workers and stop the old ones gracefully
+                              (in-flight requests get WEB_GRACEFUL_TIMEOUT seconds).
+                              With preload_app this does not pick up code changes.
+    kill -USR2 <master pid>   Start a new master with the new code alongside the
+                              old one; then send the old master TERM.
+
+Usage (from the web folder):
+    $ gunicorn -c gunicorn.conf.py app:app
+
+Environment Variables:
+    WEB_BIND (optional): Address to listen on. Defaults to 0.0.0.0:8080, the
+        port the development server and docker-compose use. (PORT is not used:
+        web/.env sets it for the development server, and gunicorn re-reads this
+        file on reload, after the app has loaded .env.)
+    WEB_WORKERS (optional): Worker processes. Defaults to 2 * CPUs + 1, or
+        fewer when their pools would exceed WEB_DB_CONNECTION_BUDGET.
+    WEB_THREADS (optional): Threads per worker. Defaults to 4.
+    WEB_TIMEOUT (optional): Seconds before a silent worker is restarted. Defaults to 60.
+    WEB_GRACEFUL_TIMEOUT (optional): Seconds workers get to finish on reload or
+        shutdown. Defaults to 30.
+    WEB_MAX_REQUESTS (optional): Requests after which a worker is recycled
+        (0 disables). Defaults to 2000.
+    WEB_DB_CONNECTION_BUDGET (optional): Most database connections all workers
+        together may open. Defaults to 80.
+"""
+
+# pylint: disable=C0103,W0613
+
+import multiprocessing
+import os
+
+DB_CONNECTION_BUDGET = int(os.environ.get("WEB_DB_CONNECTION_BUDGET", 80))
+
+
+def _connections_per_worker():
+    """Most database connections one worker's pools can open."""
+    import db_pool  # pylint: disable=C0415,E0401
+    import async_queries  # pylint: disable=C0415,E0401
+    import pages_bp  # pylint: disable=C0415,E0401
+
+    per_worker = db_pool.pool_max_size()
+    if pages_bp.ASYNC_QUERIES:
+        per_worker += async_queries.POOL_MAX_SIZE
+    return per_worker
+
+
+def _default_workers():
+    """2 * CPUs + 1 workers, or as many as DB_CONNECTION_BUDGET allows if fewer."""
+    fitting = DB_CONNECTION_BUDGET // _connections_per_worker()
+    return max(1, min(multiprocessing.cpu_count() * 2 + 1, fitting))
+
+
+bind = os.environ.get("WEB_BIND", "0.0.0.0:8080")
+workers = int(os.environ.get("WEB_WORKERS") or _default_workers())
+worker_class = "gthread"
+threads = int(os.environ.get("WEB_THREADS", 4))
+preload_app = True
+timeout = int(os.environ.get("WEB_TIMEOUT", 60))
+graceful_timeout = int(os.environ.get("WEB_GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+
+# Recycle workers now and then, staggered so they do not all restart at once.
+max_requests = int(os.environ.get("WEB_MAX_REQUESTS", 2000))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    """Refuse to start when the workers' pools could exceed the connection budget."""
+    per_worker = _connections_per_worker()
+    needed = server.cfg.workers * per_worker
+    if needed > DB_CONNECTION_BUDGET:
+        raise RuntimeError(
+            f"{server.cfg.workers} workers x {per_worker} connections = {needed} exceeds "
+            f"WEB_DB_CONNECTION_BUDGET ({DB_CONNECTION_BUDGET}); lower WEB_WORKERS, "
+            "DB_POOL_MAX_SIZE or ASYNC_POOL_MAX_SIZE, or raise the budget")
+    lowered = server.cfg.workers < multiprocessing.cpu_count() * 2 + 1
+    if lowered and not os.environ.get("WEB_WORKERS"):
+        server.log.warning("Running %s workers instead of 2 * CPUs + 1 to stay within "
+                           "WEB_DB_CONNECTION_BUDGET (%s)", server.cfg.workers,
+                           DB_CONNECTION_BUDGET)
+    server.log.info("Database connections: %s workers x %s = %s of %s", server.cfg.workers,
+                    per_worker, needed, DB_CONNECTION_BUDGET)
+
+
+def worker_exit(server, worker):
+    """Close the worker's database pools and broker connection when it stops."""
+    import db_pool  # pylint: disable=C0415,E0401
+    import async_queries  # pylint: disable=C0415,E0401
+    import publisher  # pylint: disable=C0415,E0401
+
+    db_pool.close_pool()
+    async_queries.close_async_pool()
+    publisher.close_publisher()
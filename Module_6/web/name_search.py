@@ -0,0 +1,117 @@
+"""
+This module completes university and program names as the user types, so "JHU",
+"Johns Hopkins" and "hopkns" all find "Johns Hopkins University".
+
+It searches `applicant_names`, the dictionary of distinct standardized names the
+worker keeps in step with `applicants` (see worker/etl/names.py), never the
+applicants themselves. A name matches when the text is trigram-similar to some
+run of its words (pg_trgm's `<%` operator, word similarity at least
+pg_trgm.word_similarity_threshold, 0.6 by default), which tolerates prefixes and
+typos and is answered from the GIN trigram index. A one-word text also matches
+the names whose acronym ("JHU", "UCLA", "MIT") starts with it. Matches are
+ordered by score (the word similarity, 1 for an exact acronym and 0.75 for an
+acronym prefix), then by the number of applicants, so the common spelling of a
+name comes before rare variants.
+
+The trigram operators come from the pg_trgm extension; without it the search
+raises RuntimeError and the endpoint answers 503.
+
+The target is a p99 under 10 ms at realistic dictionary sizes. This is
+unverified: it has not been measured against a server with pg_trgm (see
+benchmarks/bench_name_search.py).
+
+Functions:
+    search_names(conn, text, kind="university", limit=10) -> dict
+        The best matching names of `kind`, with their applicant counts and scores.
+
+Usage:
+    $ curl "localhost:8080/api/names?q=hopkins"
+    $ curl "localhost:8080/api/names?q=comp+sci&kind=program&limit=5"
+"""
+
+import re
+import time
+import psycopg
+
+KINDS = ("university", "program")
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+MIN_QUERY_LENGTH = 2
+MAX_QUERY_LENGTH = 100
+
+# Longest one-word text also looked up as an acronym.
+MAX_ACRONYM_LENGTH = 8
+
+_SEARCH = """
+    SELECT name, n, GREATEST(
+        word_similarity(%(text)s, name),
+        CASE WHEN acronym = %(acronym)s THEN 1
+             WHEN acronym LIKE %(acronym_prefix)s THEN 0.75
+             ELSE 0 END
+    ) AS score
+    FROM applicant_names
+    WHERE kind = %(kind)s AND (%(text)s <%% name OR acronym LIKE %(acronym_prefix)s)
+    ORDER BY score DESC, n DESC, name
+    LIMIT %(limit)s
+"""
+
+
+def _text(value):
+    """Validate the search text."""
+    value = " ".join((value or "").split())
+    if len(value) < MIN_QUERY_LENGTH:
+        raise ValueError(f"q must be at least {MIN_QUERY_LENGTH} characters")
+    if len(value) > MAX_QUERY_LENGTH:
+        raise ValueError(f"q must be at most {MAX_QUERY_LENGTH} characters")
+    return value
+
+
+def _acronym(text):
+    """The acronym a one-word text may stand for ("jhu" -> "JHU"), or None."""
+    letters = re.sub(r"[\W_]", "", text).upper()
+    if " " in text or not MIN_QUERY_LENGTH <= len(letters) <= MAX_ACRONYM_LENGTH:
+        return None
+    return letters
+
+
+def _kind(value):
+    """Validate a dictionary kind."""
+    if value not in KINDS:
+        raise ValueError(f"kind must be one of {', '.join(KINDS)}")
+    return value
+
+
+def _limit(value):
+    """Validate a result count."""
+    value = int(value)
+    if not 1 <= value <= MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+    return value
+
+
+def search_names(conn, text, kind="university", limit=DEFAULT_LIMIT):
+    """
+    Return up to `limit` names of `kind` ("university" or "program") matching
+    `text`, best first, each with its number of applicants and its score, plus
+    the latency in milliseconds. Raises ValueError for invalid arguments and
+    RuntimeError when the database lacks the pg_trgm extension.
+    """
+    text = _text(text)
+    acronym = _acronym(text)
+    params = {"text": text, "kind": _kind(kind), "limit": _limit(limit), "acronym": acronym,
+              "acronym_prefix": acronym + "%" if acronym else None}
+
+    started = time.perf_counter()
+    try:
+        with conn.cursor() as cur:
+            # Not prepared: a generic plan cannot use the acronym index for LIKE.
+            cur.execute(_SEARCH, params)
+            rows = cur.fetchall()
+    except psycopg.errors.UndefinedFunction as error:
+        raise RuntimeError("name search needs the pg_trgm extension") from error
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    return {"query": text, "kind": kind,
+            "names": [{"name": name, "applicants": n, "score": round(float(score), 3)}
+                      for name, n, score in rows],
+            "elapsed_ms": round(elapsed_ms, 3)}
@@ -0,0 +1,261 @@
+"""
+This module caches rendered pages (the homepage and /api/analytics) so a GET
+does not run the analysis queries and render the page every time.
+
+Rendered pages are tagged with the data version, a counter the worker bumps in
+the same transaction as every ingest that writes rows (see
+worker/etl/data_version.py). A cached page is served while its version is
+current and its in-process TTL has not run out. An ingest therefore invalidates
+every cached page as soon as it commits, and the TTL only bounds how long an
+unused page stays in memory. The version itself is re-read at most every
+PAGE_CACHE_VERSION_TTL seconds, so cache hits within that window need no
+database connection at all.
+
+With PAGE_CACHE_SHARED=postgres, pages are also kept in the `page_cache` table,
+so one process's render serves every other web process until the next ingest.
+
+Responses carry a strong ETag (data version plus body digest) and a
+Last-Modified date (when the data version last changed), and conditional
+requests that match are answered with 304 Not Modified. Bodies are compressed
+with brotli or gzip when the client accepts it; each encoding is computed once
+per cached page and has its own ETag, as a distinct representation.
+
+Environment Variables:
+    PAGE_CACHE_TTL (optional): Seconds a rendered page is kept in process. Defaults to 300.
+    PAGE_CACHE_VERSION_TTL (optional): Seconds a data version read is reused. Defaults to 2.
+    PAGE_CACHE_SHARED (optional): "postgres" to share rendered pages between
+        processes through the `page_cache` table. Off by default.
+
+Functions:
+    data_version(connect) -> tuple
+        The current (version, updated_at), re-read at most every PAGE_CACHE_VERSION_TTL.
+    cached_page(key, connect, render) -> dict
+        The cached page for `key`, rendering it with `render()` when stale.
+    page_response(page, mimetype="text/html", max_age=None) -> flask.Response
+        A compressed response for a cached page, answering conditional requests with 304.
+    cache_stats() -> dict
+        Hit ratio, 304 count and render time figures.
+    clear() -> None
+        Drop every cached page and the cached version.
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from flask import make_response, request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; without it bodies are only gzip-compressed.
+    brotli = None
+
+CACHE_TTL = float(os.environ.get("PAGE_CACHE_TTL", 300))
+VERSION_TTL = float(os.environ.get("PAGE_CACHE_VERSION_TTL", 2))
+SHARED = os.environ.get("PAGE_CACHE_SHARED", "").lower() == "postgres"
+
+# Bodies smaller than this are sent uncompressed; the saving would not cover the cost.
+MIN_COMPRESS_BYTES = 512
+
+# Cached pages by key, the last version read and running totals, guarded by _LOCK.
+_LOCK = threading.Lock()
+_PAGES = {}
+_VERSION = {"value": None, "read_at": 0.0}
+_STATS = {
+    "hits": 0,
+    "shared_hits": 0,
+    "misses": 0,
+    "not_modified": 0,
+    "render_total_ms": 0.0,
+    "render_max_ms": 0.0,
+}
+
+
+def data_version(connect):
+    """
+    Return the current (version, updated_at) of the data. The value is reused for
+    VERSION_TTL seconds; after that `connect()` is called for a connection to re-read it.
+    """
+    now = time.monotonic()
+    with _LOCK:
+        if _VERSION["value"] is not None and now - _VERSION["read_at"] < VERSION_TTL:
+            return _VERSION["value"]
+
+    with connect().cursor() as cur:
+        cur.execute("SELECT version, updated_at FROM data_version")
+        row = cur.fetchone()
+    value = (row[0], row[1]) if row else (0, None)
+
+    with _LOCK:
+        _VERSION.update(value=value, read_at=now)
+    return value
+
+
+def _shared_get(connect, key, version):
+    """The page for `key` at `version` from the shared tier, or None."""
+    with connect().cursor() as cur:
+        cur.execute("""
+            SELECT body, etag, last_modified FROM page_cache
+            WHERE key = %s AND version = %s
+        """, (key, version))
+        row = cur.fetchone()
+    if row is None:
+        return None
+    return {"version": version, "body": bytes(row[0]), "etag": row[1], "last_modified": row[2],
+            "encoded": {}}
+
+
+def _shared_put(connect, key, page):
+    """Store `page` in the shared tier unless a newer version is already there."""
+    with connect().cursor() as cur:
+        cur.execute("""
+            INSERT INTO page_cache (key, version, etag, last_modified, body)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (key) DO UPDATE
+            SET version = EXCLUDED.version, etag = EXCLUDED.etag,
+                last_modified = EXCLUDED.last_modified, body = EXCLUDED.body
+            WHERE page_cache.version < EXCLUDED.version
+        """, (key, page["version"], page["etag"], page["last_modified"], page["body"]))
+
+
+def _render(render, version, updated_at):
+    """Render a page with `render()` and time it."""
+    started = time.perf_counter()
+    body = render().encode("utf-8")
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    with _LOCK:
+        _STATS["render_total_ms"] += elapsed_ms
+        _STATS["render_max_ms"] = max(_STATS["render_max_ms"], elapsed_ms)
+
+    digest = hashlib.blake2b(body, digest_size=8).hexdigest()
+    return {
+        "version": version,
+        "body": body,
+        "etag": f"v{version}-{digest}",
+        # HTTP dates have one-second resolution.
+        "last_modified": (updated_at or datetime.now(timezone.utc)).replace(microsecond=0),
+        "encoded": {},
+    }
+
+
+def cached_page(key, connect, render):
+    """
+    Return the page cached under `key` for the current data version, as a dict
+    with its body (bytes), etag, last_modified and version. On a miss the page
+    comes from the shared tier when enabled, or else is rendered with `render()`
+    (which returns the page text). `connect()` returns the database connection
+    to use, and is only called when the database has to be read.
+    """
+    version, updated_at = data_version(connect)
+    now = time.monotonic()
+    with _LOCK:
+        page = _PAGES.get(key)
+        if page is not None and page["version"] == version and page["expires"] > now:
+            _STATS["hits"] += 1
+            return page
+
+    page = _shared_get(connect, key, version) if SHARED else None
+    if page is not None:
+        counter = "shared_hits"
+    else:
+        counter = "misses"
+        page = _render(render, version, updated_at)
+        if SHARED:
+            _shared_put(connect, key, page)
+
+    page["expires"] = now + CACHE_TTL
+    with _LOCK:
+        _STATS[counter] += 1
+        current = _PAGES.get(key)
+        # Never replace a page rendered from newer data by one from older data.
+        if current is None or current["version"] <= version:
+            _PAGES[key] = page
+    return page
+
+
+def _negotiate(page):
+    """The content encoding to send `page` with: "br", "gzip" or None (identity)."""
+    if len(page["body"]) < MIN_COMPRESS_BYTES:
+        return None
+    accepted = request.accept_encodings
+    if brotli is not None and accepted.quality("br") > 0:
+        return "br"
+    if accepted.quality("gzip") > 0:
+        return "gzip"
+    return None
+
+
+def _encoded_body(page, encoding):
+    """The body of `page` compressed with `encoding`, compressed once and then reused."""
+    with _LOCK:
+        body = page["encoded"].get(encoding)
+    if body is None:
+        if encoding == "br":
+            body = brotli.compress(page["body"], quality=5)
+        else:
+            body = gzip.compress(page["body"], compresslevel=6)
+        with _LOCK:
+            page["encoded"][encoding] = body
+    return body
+
+
+def page_response(page, mimetype="text/html", max_age=None):
+    """
+    Build the response for a cached page, compressed as the client accepts.
+
+    With no `max_age`, clients are told to revalidate on every use
+    (Cache-Control: no-cache), which costs a 304 while the data is unchanged.
+    Otherwise any cache may reuse the response for `max_age` seconds before
+    revalidating it.
+    """
+    encoding = _negotiate(page)
+    response = make_response(_encoded_body(page, encoding) if encoding else page["body"])
+    response.mimetype = mimetype
+    response.vary.add("Accept-Encoding")
+    if encoding:
+        response.content_encoding = encoding
+        response.set_etag(f"{page['etag']}-{encoding}")
+    else:
+        response.set_etag(page["etag"])
+    response.last_modified = page["last_modified"]
+    if max_age is None:
+        response.cache_control.no_cache = True
+    else:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+        response.cache_control.must_revalidate = True
+    response = response.make_conditional(request)
+    if response.status_code == 304:
+        with _LOCK:
+            _STATS["not_modified"] += 1
+    return response
+
+
+def cache_stats():
+    """Report page cache hit ratio, 304 responses and render times."""
+    with _LOCK:
+        served = _STATS["hits"] + _STATS["shared_hits"] + _STATS["misses"]
+        renders = _STATS["misses"]
+        version = _VERSION["value"][0] if _VERSION["value"] else None
+        return {
+            "data_version": version,
+            "pages": len(_PAGES),
+            "shared": SHARED,
+            "hits": _STATS["hits"],
+            "shared_hits": _STATS["shared_hits"],
+            "misses": _STATS["misses"],
+            "hit_ratio": round((served - renders) / served, 3) if served else 0.0,
+            "not_modified": _STATS["not_modified"],
+            "render_avg_ms": round(_STATS["render_total_ms"] / renders, 3) if renders else 0.0,
+            "render_max_ms": round(_STATS["render_max_ms"], 3),
+        }
+
+
+def clear():
+    """Drop every cached page and the cached data version (totals are kept)."""
+    with _LOCK:
+        _PAGES.clear()
+        _VERSION.update(value=None, read_at=0.0)
@@ -1,47 +1,226 @@
-"""This module publishes messages to a RabbitMQ queue, 
-to be consumed by a consumer module."""
+"""
+This module publishes messages to a RabbitMQ queue, to be consumed by a
+consumer module.
+
+One connection is kept open per process and shared by every thread, instead of
+connecting, declaring the exchange, queue and binding, and disconnecting for
+each message. It is opened on the first publish and reopened when it has
+dropped (a broker restart or missed heartbeats), and a publish that fails on a
+dropped connection is retried once on a fresh one. pika connections are not
+thread-safe, so publishes are serialised by a lock.
+
+Tasks are published on a channel in confirm mode: `publish_task` returns once
+the broker has taken the message, and raises if it refuses it. Many tasks (for
+example one per page to scrape) are published with `publish_tasks` in batches:
+a batch is sent under one hold of the lock and one connection check, each
+message waiting for its own confirm. Each message carries a message_id, and a
+batch interrupted by a dropped connection is resumed with only the messages the
+broker has not confirmed. A message the broker stored but whose confirm was
+lost is therefore sent twice, under the same message_id. No route calls
+`publish_tasks` yet; it is API only, for producers of many tasks.
+
+Environment Variables:
+    RABBITMQ_URL (str): AMQP URL of the broker.
+    PUBLISH_BATCH_SIZE (optional): Messages publish_tasks sends per hold of the
+        lock. Defaults to 500.
+
+Functions:
+    publish_task(kind, payload=None, headers=None) -> None
+        Publish one task and wait for the broker's confirm.
+    publish_tasks(kind, payloads, headers=None) -> int
+        Publish one confirmed task per payload, in batches; returns how many.
+    publisher_stats() -> dict
+        Connections opened and publish latency figures.
+    close_publisher() -> None
+        Close the shared connection.
+"""
 
 from datetime import datetime
 import json
 import os
+import threading
+import time
+import uuid
 import pika
 
 EXCHANGE = "tasks"
 QUEUE = "tasks_q"
 ROUTING_KEY = "scrape_new_data"
+BATCH_SIZE = int(os.environ.get("PUBLISH_BATCH_SIZE", 500))
+
+# Errors after which the connection is reopened and the publish retried once.
+# A refused message (NackError, UnroutableError) is not retried.
+_RETRYABLE = (pika.exceptions.AMQPConnectionError, pika.exceptions.ChannelClosed,
+              pika.exceptions.ChannelWrongStateError)
+
+# The shared connection and its confirm-mode channel, guarded by _LOCK.
+_LOCK = threading.Lock()
+_STATE = {"connection": None, "channel": None}
+
+# Running totals for publish latency, guarded by _LOCK.
+_STATS = {"connections": 0, "publishes": 0, "messages": 0, "total_ms": 0.0, "max_ms": 0.0}
+
 
 def _open_channel():
-    """Create a RabbitMQ connection and channel."""
+    """Create a RabbitMQ connection and a channel with the topology declared."""
     url = os.environ["RABBITMQ_URL"]
     params = pika.URLParameters(url)
     conn = pika.BlockingConnection(params)
     ch = conn.channel()
 
-    # Durable exchange & queue; bind once per process (idempotent)
+    # Durable exchange & queue; bind once per connection (idempotent)
     ch.exchange_declare(exchange=EXCHANGE, exchange_type="direct", durable=True)
     ch.queue_declare(queue=QUEUE, durable=True)
     ch.queue_bind(exchange=EXCHANGE, queue=QUEUE, routing_key=ROUTING_KEY)
     return conn, ch
 
-def publish_task(kind: str, payload: dict | None = None, headers: dict | None =
-None):
-    """Publish tasks to exchange."""
-    body = json.dumps(
+
+def _channel():
+    """
+    Return the shared confirm-mode channel, opening the connection or the
+    channel if needed. Call with _LOCK held.
+    """
+    conn = _STATE["connection"]
+    if conn is not None and conn.is_open:
+        try:
+            # Service heartbeats missed while idle; raises if the broker has gone.
+            conn.process_data_events(time_limit=0)
+        except pika.exceptions.AMQPConnectionError:
+            conn = None
+    if conn is None or not conn.is_open:
+        _reset()
+        conn, ch = _open_channel()
+        ch.confirm_delivery()
+        _STATE.update(connection=conn, channel=ch)
+        _STATS["connections"] += 1
+
+    ch = _STATE["channel"]
+    if not ch.is_open:
+        ch = conn.channel()
+        ch.confirm_delivery()
+        _STATE["channel"] = ch
+    return ch
+
+
+def _reset():
+    """Forget (and close, if still open) the shared connection. Call with _LOCK held."""
+    conn = _STATE["connection"]
+    _STATE.update(connection=None, channel=None)
+    if conn is not None and conn.is_open:
+        try:
+            conn.close()
+        except pika.exceptions.AMQPError:
+            pass
+
+
+def _publish(send):
+    """Run send(channel) on the shared channel, reconnecting and retrying once."""
+    with _LOCK:
+        try:
+            return send(_channel())
+        except _RETRYABLE:
+            _reset()
+            return send(_channel())
+
+
+def _record(started, messages):
+    """Add one publish call of `messages` messages to the latency totals."""
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    with _LOCK:
+        _STATS["publishes"] += 1
+        _STATS["messages"] += messages
+        _STATS["total_ms"] += elapsed_ms
+        _STATS["max_ms"] = max(_STATS["max_ms"], elapsed_ms)
+
+
+def _body(kind, payload):
+    """Encode a task message."""
+    return json.dumps(
         {"kind": kind, "ts": datetime.utcnow().isoformat(), "payload": payload or {}},
         separators=(",", ":")
         ).encode("utf-8")
-    conn, ch = _open_channel()
-    try:
+
+
+def _properties(headers, message_id=None):
+    """Persistent message properties with `headers`."""
+    return pika.BasicProperties(delivery_mode=2, headers=headers or {}, message_id=message_id)
+
+
+def publish_task(kind: str, payload: dict | None = None, headers: dict | None =
+None):
+    """Publish tasks to exchange, waiting for the broker to confirm it."""
+    body = _body(kind, payload)
+    started = time.perf_counter()
+
+    def send(ch):
         ch.basic_publish(
         exchange=EXCHANGE,
         routing_key=ROUTING_KEY,
         body=body,
-        properties=pika.BasicProperties(delivery_mode=2, headers=headers or {}),
-        mandatory=False,
+        properties=_properties(headers),
+        mandatory=True,
         )
 
-# If using confirms:
-# if not ch.wait_for_confirms():
-# raise RuntimeError("Publish not confirmed")
-    finally:
-        conn.close()
+    try:
+        # With confirms on, basic_publish returns once the broker has acked.
+        _publish(send)
+    except (pika.exceptions.NackError, pika.exceptions.UnroutableError) as exc:
+        raise RuntimeError("Publish not confirmed") from exc
+    _record(started, 1)
+
+
+def _send_batch(ch, unconfirmed, headers):
+    """
+    Publish every message in `unconfirmed` (message_id -> body) on the confirm
+    channel `ch`, removing each one once the broker has confirmed it.
+    """
+    for message_id, body in list(unconfirmed.items()):
+        # With confirms on, basic_publish returns once the broker has acked.
+        ch.basic_publish(exchange=EXCHANGE, routing_key=ROUTING_KEY, body=body,
+                         properties=_properties(headers, message_id), mandatory=True)
+        del unconfirmed[message_id]
+
+
+def publish_tasks(kind: str, payloads, headers: dict | None = None,
+                  batch_size: int | None = None):
+    """
+    Publish one confirmed `kind` task per payload, `batch_size` messages
+    (PUBLISH_BATCH_SIZE by default) per hold of the lock, so single publishes from
+    other threads go out between batches. Returns the number of tasks published.
+    If the connection drops during a batch, the messages not yet confirmed are
+    sent again once on a new connection; earlier batches stay published. Raises
+    RuntimeError if the broker refuses a message.
+    """
+    batch_size = batch_size or BATCH_SIZE
+    payloads = list(payloads)
+    for start in range(0, len(payloads), batch_size):
+        unconfirmed = {str(uuid.uuid4()): _body(kind, payload)
+                       for payload in payloads[start:start + batch_size]}
+        messages = len(unconfirmed)
+        started = time.perf_counter()
+        try:
+            _publish(lambda ch, unconfirmed=unconfirmed: _send_batch(ch, unconfirmed, headers))
+        except (pika.exceptions.NackError, pika.exceptions.UnroutableError) as exc:
+            raise RuntimeError("Publish not confirmed") from exc
+        _record(started, messages)
+    return len(payloads)
+
+
+def publisher_stats():
+    """Report connections opened and publish latency."""
+    with _LOCK:
+        publishes = _STATS["publishes"]
+        return {
+            "connected": _STATE["connection"] is not None and _STATE["connection"].is_open,
+            "connections": _STATS["connections"],
+            "publishes": publishes,
+            "messages": _STATS["messages"],
+            "publish_avg_ms": round(_STATS["total_ms"] / publishes, 3) if publishes else 0.0,
+            "publish_max_ms": round(_STATS["max_ms"], 3),
+        }
+
+
+def close_publisher():
+    """Close the shared connection (used on shutdown)."""
+    with _LOCK:
+        _reset()
@@ -0,0 +1,252 @@
+"""
+This module exposes the analyses behind `run_queries` as parameterised queries,
+so the same questions can be asked for any term, university, program, degree or
+citizenship group instead of only the ones fixed in the homepage questions.
+
+Every statement is composed once, at import, with bound placeholders in place of
+literals. Statements are executed with ``prepare=True``: the first execution on a
+connection prepares the statement on the server, and psycopg keeps it in that
+connection's prepared-statement cache, so later calls on the same pooled
+connection only bind parameters and execute the cached plan. Each execution is
+timed, and per-query call counts and latencies are kept for reporting.
+
+Functions:
+    query_catalog() -> dict
+        Query names mapped to their parameters and default values.
+    run_query(conn, name, **params) -> dict
+        Run a named query with bound parameters; returns its result and latency.
+    query_stats() -> dict
+        Calls and average / maximum latency of every query run by this process.
+    prepared_statements(conn) -> int
+        Number of statements prepared on the server for `conn`.
+
+Usage:
+    >>> from query_api import run_query
+    >>> run_query(conn, "term_count", term_season="Spring", term_year=2024)
+    {'query': 'term_count', 'params': {...}, 'result': {'count': 1234}, 'elapsed_ms': 0.8}
+
+    $ curl "localhost:8080/api/queries/top_universities?term_year=2024&limit=5"
+"""
+
+import threading
+import time
+import psycopg
+
+TERM_SEASONS = ("Winter", "Spring", "Summer", "Fall")
+
+# Upper bound for the `limit` parameter of list queries.
+MAX_LIMIT = 100
+
+# Running per-query latency totals, guarded by _STATS_LOCK.
+_STATS_LOCK = threading.Lock()
+_QUERY_STATS = {}
+
+_TABLE = psycopg.sql.Identifier("applicants")
+_ACCEPTED = psycopg.sql.SQL("decision = {value}").format(value=psycopg.sql.Literal("Accepted"))
+_TERM = psycopg.sql.SQL("term_season = %(term_season)s AND term_year = %(term_year)s")
+_PROGRAM = psycopg.sql.SQL("llm_generated_university = %(university)s "
+                           "AND llm_generated_program = %(program)s "
+                           "AND degree = %(degree)s")
+
+
+def _season(value):
+    """Validate a term season."""
+    if value not in TERM_SEASONS:
+        raise ValueError(f"term_season must be one of {', '.join(TERM_SEASONS)}")
+    return value
+
+
+def _limit(value):
+    """Validate a row limit."""
+    value = int(value)
+    if not 1 <= value <= MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+    return value
+
+
+def _names(value):
+    """Validate a list of names (a single name is accepted too)."""
+    values = [value] if isinstance(value, str) else [str(name) for name in value]
+    if not values:
+        raise ValueError("at least one name is required")
+    return values
+
+
+# Parameter name -> converter applied to caller (or query string) values.
+PARAMETERS = {
+    "term_season": _season,
+    "term_year": int,
+    "us_or_international": str,
+    "university": str,
+    "program": str,
+    "degree": str,
+    "universities": _names,
+    "limit": _limit,
+}
+
+# Parameters that take several values (repeated in a query string).
+LIST_PARAMETERS = {"universities"}
+
+
+def _query(statement, defaults, many=False):
+    """A catalog entry: the composed statement, its parameter defaults, and whether it returns rows."""
+    return {"statement": statement.format(table=_TABLE, term=_TERM, program=_PROGRAM,
+                                          accepted=_ACCEPTED),
+            "defaults": defaults,
+            "many": many}
+
+
+_FALL_2025 = {"term_season": "Fall", "term_year": 2025}
+
+QUERIES = {
+    # 1. Entries for a term.
+    "term_count": _query(psycopg.sql.SQL("""
+        SELECT COUNT(*) AS count FROM {table} WHERE {term}
+    """), _FALL_2025),
+
+    # 2. Share of all entries from one citizenship group.
+    "citizenship_share": _query(psycopg.sql.SQL("""
+        SELECT (COUNT(*) FILTER (WHERE us_or_international = %(us_or_international)s)
+                * 100.0 / NULLIF(COUNT(*), 0))::float8 AS percentage
+        FROM {table}
+    """), {"us_or_international": "International"}),
+
+    # 3. Average scores of applicants who report them.
+    "score_averages": _query(psycopg.sql.SQL("""
+        SELECT AVG(gpa) FILTER (WHERE gpa < 5) AS average_gpa,
+               AVG(gre) FILTER (WHERE gre < 170) AS average_gre,
+               AVG(gre_v) FILTER (WHERE gre_v < 170) AS average_gre_v,
+               AVG(gre_aw) FILTER (WHERE gre_aw < 6) AS average_gre_aw
+        FROM {table}
+    """), {}),
+
+    # 4. Average GPA of one citizenship group.
+    "citizenship_gpa": _query(psycopg.sql.SQL("""
+        SELECT AVG(gpa) AS average_gpa FROM {table}
+        WHERE us_or_international = %(us_or_international)s
+    """), {"us_or_international": "American"}),
+
+    # 5. Share of a term's entries that are acceptances.
+    "acceptance_rate": _query(psycopg.sql.SQL("""
+        SELECT (COUNT(*) FILTER (WHERE {accepted}) * 100.0
+                / NULLIF(COUNT(*), 0))::float8 AS percentage
+        FROM {table} WHERE {term}
+    """), _FALL_2025),
+
+    # 6. Average GPA of a term's acceptances.
+    "accepted_gpa": _query(psycopg.sql.SQL("""
+        SELECT AVG(gpa) AS average_gpa FROM {table}
+        WHERE {term} AND {accepted} AND gpa < 5
+    """), _FALL_2025),
+
+    # 7. Entries for a university, program and degree.
+    "program_count": _query(psycopg.sql.SQL("""
+        SELECT COUNT(*) AS count FROM {table} WHERE {program}
+    """), {"university": "Johns Hopkins University", "program": "Computer Science",
+           "degree": "Masters"}),
+
+    # 8. Acceptances for a university, program and degree.
+    "program_acceptances": _query(psycopg.sql.SQL("""
+        SELECT COUNT(*) AS count FROM {table} WHERE {program} AND {accepted}
+    """), {"university": "Georgetown University", "program": "Computer Science",
+           "degree": "PhD"}),
+
+    # 9. Universities with the most entries for a term.
+    "top_universities": _query(psycopg.sql.SQL("""
+        SELECT llm_generated_university AS university, COUNT(*) AS count
+        FROM {table} WHERE {term}
+        GROUP BY llm_generated_university
+        ORDER BY count DESC, university
+        LIMIT %(limit)s
+    """), dict(_FALL_2025, limit=1), many=True),
+
+    # 10. Average accepted GPA of several universities for a term.
+    "university_gpa": _query(psycopg.sql.SQL("""
+        SELECT llm_generated_university AS university, AVG(gpa) AS average_gpa
+        FROM {table}
+        WHERE {term} AND {accepted} AND gpa < 5
+          AND llm_generated_university = ANY(%(universities)s)
+        GROUP BY llm_generated_university
+        ORDER BY university
+    """), dict(_FALL_2025, universities=["University of Virginia", "Virginia Tech"]),
+        many=True),
+}
+
+
+def query_catalog():
+    """Return every query name with its parameters and their default values."""
+    return {name: dict(query["defaults"]) for name, query in QUERIES.items()}
+
+
+def _bind(name, params):
+    """Merge `params` over the defaults of query `name`, validating every value."""
+    defaults = QUERIES[name]["defaults"]
+    unknown = set(params) - set(defaults)
+    if unknown:
+        raise ValueError(f"{name} does not take {', '.join(sorted(unknown))}")
+
+    bound = {}
+    for param, value in dict(defaults, **params).items():
+        try:
+            bound[param] = PARAMETERS[param](value)
+        except (TypeError, ValueError) as error:
+            raise ValueError(f"invalid {param}: {error}") from error
+    return bound
+
+
+def _record(name, elapsed_ms):
+    """Add one execution of query `name` to the latency totals."""
+    with _STATS_LOCK:
+        stats = _QUERY_STATS.setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        stats["count"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+
+def run_query(conn, name, **params):
+    """
+    Run query `name` on `conn` with `params` bound over its defaults.
+
+    The statement is prepared on the server the first time `conn` runs it and
+    reused from the connection's cache afterwards. Returns the query name, the
+    bound parameters, the result (a dict for single-row queries, a list of dicts
+    for `top_universities` and `university_gpa`) and the latency in milliseconds.
+    Raises KeyError for an unknown query and ValueError for invalid parameters.
+    """
+    query = QUERIES[name]
+    bound = _bind(name, params)
+
+    started = time.perf_counter()
+    with conn.cursor() as cur:
+        cur.execute(query["statement"], bound, prepare=True)
+        columns = [column.name for column in cur.description]
+        rows = [dict(zip(columns, row)) for row in cur.fetchall()]
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    _record(name, elapsed_ms)
+
+    return {
+        "query": name,
+        "params": bound,
+        "result": rows if query["many"] else rows[0],
+        "elapsed_ms": round(elapsed_ms, 3),
+    }
+
+
+def query_stats():
+    """Report calls and average / maximum latency of every query run so far."""
+    with _STATS_LOCK:
+        return {
+            name: {
+                "calls": stats["count"],
+                "avg_ms": round(stats["total_ms"] / stats["count"], 3),
+                "max_ms": round(stats["max_ms"], 3),
+            }
+            for name, stats in sorted(_QUERY_STATS.items())
+        }
+
+
+def prepared_statements(conn):
+    """Return how many statements are prepared on the server for `conn`."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM pg_prepared_statements")
+        return cur.fetchone()[0]
@@ -0,0 +1,192 @@
+"""
+This module registers the tasks the web app queues and reports their status,
+so a client that clicked "Pull Data" can follow the scrape instead of reloading
+the homepage.
+
+Each task is a row in the `tasks` table. The web app inserts it (status
+"queued") before publishing the message, and sends the task's ID in the message
+headers. At most one task of each kind is queued or running (a partial unique
+index enforces it), so a duplicate request, from any web process, is coalesced
+into the active task and given its ID instead of queueing another run.
+
+A running task is only active while its worker holds the task kind's advisory
+lock (see worker/etl/task_registry.py). The lock is released when the worker's
+connection closes, so before claiming, tasks marked running without the lock
+held (their worker died) are marked failed, as are tasks queued for longer
+than TASK_QUEUE_TIMEOUT seconds (their message was lost).
+
+The worker records status and progress counts against the task as it runs.
+Clients read the row from
+/api/tasks/<id>, or follow it with Server-Sent Events from
+/api/tasks/<id>/events. The stream polls the row (a primary-key read) every
+TASK_STREAM_POLL_SECONDS and sends an event only when the row has changed. Each
+poll borrows a pooled connection, so an open stream does not hold one.
+
+Environment Variables:
+    TASK_QUEUE_TIMEOUT (optional): Seconds a task may stay queued before it is
+        given up as lost. Defaults to 3600.
+    TASK_STREAM_POLL_SECONDS (optional): Seconds between reads of a followed task.
+        Defaults to 1.
+    TASK_STREAM_MAX_SECONDS (optional): Seconds before a stream is closed; the
+        browser's EventSource then reconnects. Defaults to 300.
+
+Functions:
+    claim_task(conn, kind) -> tuple
+        Queue a task, or join the active one; returns (task ID, whether it is new).
+    active_tasks(conn) -> list
+        The queued and running tasks.
+    get_task(conn, task_id) -> dict | None
+        The task's status, progress and timestamps.
+    fail_task(conn, task_id, error) -> None
+        Mark a task failed (when its message could not be published).
+    task_events(task_id, checkout) -> Iterator[str]
+        Server-Sent Events for the task until it finishes.
+"""
+
+import json
+import os
+import time
+
+POLL_SECONDS = float(os.environ.get("TASK_STREAM_POLL_SECONDS", 1))
+MAX_SECONDS = float(os.environ.get("TASK_STREAM_MAX_SECONDS", 300))
+
+# Seconds between comment lines that keep an idle stream open through proxies.
+HEARTBEAT_SECONDS = 15
+
+QUEUE_TIMEOUT = int(os.environ.get("TASK_QUEUE_TIMEOUT", 3600))
+
+FINISHED = ("succeeded", "failed", "coalesced")
+COLUMNS = ("id", "kind", "status", "progress", "error", "coalesced_into",
+           "created_at", "started_at", "finished_at", "updated_at")
+
+# The worker's task locks (see LOCK_NAMESPACE and LOCK_KEY in worker/etl/task_registry.py).
+LOCK_NAMESPACE = 0x7461736B
+
+
+def _expire_stale_tasks(cur):
+    """Fail running tasks whose worker no longer holds the lock, and long-queued tasks."""
+    cur.execute("""
+        UPDATE tasks
+        SET status = 'failed', finished_at = now(), updated_at = now(),
+            error = CASE status WHEN 'running' THEN 'worker_lost' ELSE 'queue_timeout' END
+        WHERE (status = 'running' AND NOT EXISTS (
+                  SELECT 1 FROM pg_locks
+                  WHERE locktype = 'advisory' AND granted AND objsubid = 2
+                    AND classid = %(namespace)s::oid
+                    AND objid = (hashtext(tasks.kind) & 2147483647)::oid))
+           OR (status = 'queued'
+               AND created_at < now() - make_interval(secs => %(queue_timeout)s))
+    """, {"namespace": LOCK_NAMESPACE, "queue_timeout": QUEUE_TIMEOUT})
+
+
+def claim_task(conn, kind):
+    """
+    Queue a `kind` task unless one is already queued or running. Returns
+    (task_id, True) for a new task, to be published, or (task_id, False) for the
+    active task the request was coalesced into. Commits at once, so a new row
+    exists before the worker can receive the message.
+    """
+    with conn.cursor() as cur:
+        _expire_stale_tasks(cur)
+        # The active task can finish between the insert and the select; then retry.
+        while True:
+            cur.execute("""
+                INSERT INTO tasks (kind) VALUES (%s)
+                ON CONFLICT (kind) WHERE status IN ('queued', 'running') DO NOTHING
+                RETURNING id
+            """, (kind, ))
+            row = cur.fetchone()
+            if row is not None:
+                claimed = (str(row[0]), True)
+                break
+            cur.execute("""
+                SELECT id FROM tasks WHERE kind = %s AND status IN ('queued', 'running')
+            """, (kind, ))
+            row = cur.fetchone()
+            if row is not None:
+                claimed = (str(row[0]), False)
+                break
+    conn.commit()
+    return claimed
+
+
+def _task(row):
+    """A tasks row as a JSON-ready dict."""
+    task = dict(zip(COLUMNS, row))
+    task["id"] = str(task["id"])
+    if task["coalesced_into"] is not None:
+        task["coalesced_into"] = str(task["coalesced_into"])
+    for column in ("created_at", "started_at", "finished_at", "updated_at"):
+        if task[column] is not None:
+            task[column] = task[column].isoformat()
+    return task
+
+
+def get_task(conn, task_id):
+    """Return task `task_id` as a JSON-ready dict, or None if there is no such task."""
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT {', '.join(COLUMNS)} FROM tasks WHERE id = %s", (task_id, ))
+        row = cur.fetchone()
+    return _task(row) if row is not None else None
+
+
+def active_tasks(conn):
+    """Return the queued and running tasks, oldest first, after expiring stale ones."""
+    with conn.cursor() as cur:
+        _expire_stale_tasks(cur)
+        cur.execute(f"""
+            SELECT {', '.join(COLUMNS)} FROM tasks
+            WHERE status IN ('queued', 'running') ORDER BY created_at
+        """)
+        return [_task(row) for row in cur.fetchall()]
+
+
+def fail_task(conn, task_id, error):
+    """Mark task `task_id` failed with `error`."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            UPDATE tasks SET status = 'failed', error = %s, finished_at = now(),
+                             updated_at = now()
+            WHERE id = %s
+        """, (error, task_id))
+
+
+def _event(name, data):
+    """Format one Server-Sent Event."""
+    return f"event: {name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def task_events(task_id, checkout, poll_seconds=None, max_seconds=None):
+    """
+    Yield Server-Sent Events for task `task_id`: a "task" event with the full
+    task whenever it changes, ending with a "done" event once it has finished.
+    `checkout()` returns a context manager yielding a connection for each read.
+    """
+    poll_seconds = POLL_SECONDS if poll_seconds is None else poll_seconds
+    max_seconds = MAX_SECONDS if max_seconds is None else max_seconds
+    started = last_sent = time.monotonic()
+    seen = None
+
+    yield f"retry: {int(poll_seconds * 2000)}\n\n"
+    while True:
+        with checkout() as conn:
+            task = get_task(conn, task_id)
+        if task is None:
+            yield _event("error", {"error": "not_found", "id": task_id})
+            return
+        if task["updated_at"] != seen:
+            seen = task["updated_at"]
+            last_sent = time.monotonic()
+            yield _event("task", task)
+        if task["status"] in FINISHED:
+            yield _event("done", {"id": task_id, "status": task["status"],
+                                  "coalesced_into": task["coalesced_into"]})
+            return
+
+        now = time.monotonic()
+        if now - started >= max_seconds:
+            return
+        if now - last_sent >= HEARTBEAT_SECONDS:
+            last_sent = now
+            yield ": keep-alive\n\n"
+        time.sleep(poll_seconds)
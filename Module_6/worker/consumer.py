@@ -5,7 +5,6 @@ import json
 import os
 import time
 import pika
-import psycopg
 from etl.update_database import ( # pylint: disable=E0401
     find_recent,
     updated_scrape,
@@ -14,160 +13,191 @@ from etl.update_database import ( # pylint: disable=E0401
     get_db_connection,
 )
 from etl.query_data import run_queries # pylint: disable=E0401
+from etl.ingest import upsert_applicants # pylint: disable=E0401
+from etl.partitions import ensure_partitions # pylint: disable=E0401
+from etl.data_version import bump_data_version # pylint: disable=E0401
+from etl.db_pool import pool_stats, close_pool # pylint: disable=E0401
+from etl.task_registry import ( # pylint: disable=E0401
+    single_flight,
+    running_task,
+    start_task,
+    report_progress,
+    finish_task,
+)
 
-def update_watermark(source, last_seen):
-    """Update watermark table with most recent id."""
-    conn = get_db_connection()
-    try:
-        with conn:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    INSERT INTO ingestion_watermarks (source, last_seen)
-                    VALUES (%s, %s)
-                    ON CONFLICT (source) 
-                    DO UPDATE SET last_seen = EXCLUDED.last_seen, updated_at = now();
-                """, (source, last_seen))
-    finally:
-        if conn:
-            conn.close()
-
-def get_last_seen(source):
+def update_watermark(conn, source, last_seen):
+    """Update watermark table with most recent id (in the caller's transaction)."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO ingestion_watermarks (source, last_seen)
+            VALUES (%s, %s)
+            ON CONFLICT (source) 
+            DO UPDATE SET last_seen = EXCLUDED.last_seen, updated_at = now();
+        """, (source, last_seen))
+
+def get_last_seen(conn, source):
     """Extract last_seen from watermark table."""
-    conn = get_db_connection()
-    try:
-        with conn:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT last_seen FROM ingestion_watermarks WHERE source = %s;
-                """, (source,))
-                result = cur.fetchone()
-                return result[0] if result else None
-    finally:
-        if conn:
-            conn.close()
-
-def handle_scrape_new_data(channel, method): # pylint: disable=R0914,R0915
-    """Call function for scrape new data task."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT last_seen FROM ingestion_watermarks WHERE source = %s;
+        """, (source,))
+        result = cur.fetchone()
+        return result[0] if result else None
+
+def handle_scrape_new_data(channel, method, task_id=None):  # pylint: disable=R0914
+    """
+    Call function for scrape new data task. Progress is recorded against
+    `task_id` (from the message headers) when it is given.
+    """
     try:
-        conn = get_db_connection()
+        start_task(task_id, "scrape_new_data")
         data_source = "TheGradCafe"
-        last_seen = get_last_seen(data_source)  # Get last seen identifier from the watermark table
-        recent_id = find_recent() or 0  # Start from ID 0 if no previous entries exist
+        # One pooled connection for both lookups; it is not held during the scrape.
+        with get_db_connection() as conn:
+            last_seen = get_last_seen(conn, data_source)  # Get last seen id from watermark table
+            recent_id = find_recent(conn) or 0  # Start from ID 0 if no previous entries exist
 
-        scraped_entries = updated_scrape(last_seen or recent_id)
+        scraped_entries = updated_scrape(
+            last_seen or recent_id,
+            on_page=lambda pages, rows: report_progress(task_id, pages_fetched=pages,
+                                                        rows_scraped=rows))
 
         if not scraped_entries:
             print("No new data found to scrape.")
+            finish_task(task_id, "succeeded", rows_inserted=0)
+            channel.basic_ack(delivery_tag=method.delivery_tag)
             return
 
         print(f"Found {len(scraped_entries)} new entries. Cleaning the data...")
         cleaned_data = clean_data(scraped_entries)
+        report_progress(task_id, rows_cleaned=len(cleaned_data))
 
         if not cleaned_data:
             print("Data cleaning failed - no valid entries found.")
+            finish_task(task_id, "failed", error="no valid entries after cleaning")
+            channel.basic_ack(delivery_tag=method.delivery_tag)
             return
 
         print(f"Processing {len(cleaned_data)} entries with LLM for standardization...")
         llm_extended_data = process_data_with_llm(cleaned_data)
+        report_progress(task_id, rows_standardised=len(llm_extended_data or []))
 
         if not llm_extended_data:
             print("LLM processing failed - no data to add.")
+            finish_task(task_id, "failed", error="LLM processing returned no data")
+            channel.basic_ack(delivery_tag=method.delivery_tag)
             return
 
         last_seen = llm_extended_data[-1]["id"]  # Assuming the last entry has an "id"
 
-        with conn:
+        # Rows, aggregates and watermark commit together on one pooled connection
+        with get_db_connection() as conn, conn.transaction():
             with conn.cursor() as cur:  # pylint: disable=E1101
-                for entry in llm_extended_data:
-                    # Prepare data for the database insertion (as in your original implementation)
-                    program = entry["program"] if entry["program"] else None
-                    comments = entry["comments"] if entry["comments"] else None
-                    date_added = entry["date_added"] if entry["date_added"] else None
-                    url = entry["url"] if entry["url"] else None
-                    status = entry["status"] if entry["status"] else None
-                    term = entry["term"] if entry["term"] else None
-                    us_int = entry["US/International"]
-                    us_or_international = us_int if us_int else None
-                    gpa = float(entry["GPA"]) if entry["GPA"] else None
-                    gre = float(entry["GRE"]) if entry["GRE"] else None
-                    gre_v = float(entry["GRE_V"]) if entry["GRE_V"] else None
-                    gre_aw = float(entry["GRE_AW"]) if entry["GRE_AW"] else None
-                    degree = entry["Degree"] if entry["Degree"] else None
-                    llm_prog = entry["llm-generated-program"]
-                    llm_generated_program = llm_prog if llm_prog else None
-                    llm_uni = entry["llm-generated-university"]
-                    llm_generated_university = llm_uni if llm_uni else None
-
-                    # Define variables for table and columns
-                    table_name = psycopg.sql.Identifier("applicants")
-                    columns = [
-                        "program", "comments", "date_added", "url", "status",
-                        "term", "us_or_international", "gpa", "gre", "gre_v",
-                        "gre_aw", "degree", "llm_generated_program",
-                        "llm_generated_university"
-                    ]
-                    column_identifiers = [psycopg.sql.Identifier(col) for col in columns]
-
-                    # SQL string composition for the insert query
-                    query = psycopg.sql.SQL("""
-                        INSERT INTO {table} ({fields})
-                        VALUES ({placeholders})
-                    """).format(
-                        table=table_name,
-                        fields=psycopg.sql.SQL(', ').join(column_identifiers),
-                        placeholders = psycopg.sql.SQL(', ').join(
-                            psycopg.sql.Placeholder() for _ in columns
-                        )
-                    )
-
-                    # Execute the query
-                    cur.execute(query, (
-                        program, comments, date_added, url, status, term,
-                        us_or_international, gpa, gre, gre_v,
-                        gre_aw, degree, llm_generated_program,
-                        llm_generated_university
-                    ))
-
-        # Update the watermark table with the last seen after all data has been processed
-        if last_seen is not None:
-            update_watermark(data_source, last_seen)
+                # Give any new term year its own partition before routing rows to it
+                ensure_partitions(cur, [entry.get("term_year") for entry in llm_extended_data])
+
+                # Insert new results, update changed ones and skip the rest;
+                # the rollup is adjusted for the rows written
+                stats = upsert_applicants(cur, llm_extended_data)
+                print(f"Inserted {stats['inserted']}, updated {stats['updated']}, "
+                      f"skipped {stats['skipped']} unchanged entries.")
+
+                # Mark cached pages stale; they see the new version once this commits
+                if stats["inserted"] or stats["updated"]:
+                    print(f"Data version is now {bump_data_version(cur)}.")
+
+            # Update the watermark table with the last seen after all data has been processed
+            if last_seen is not None:
+                update_watermark(conn, data_source, last_seen)
+
+            # The task reads as succeeded exactly when its rows are committed
+            finish_task(task_id, "succeeded", conn=conn, rows_inserted=stats["inserted"],
+                        rows_updated=stats["updated"], rows_skipped=stats["skipped"])
 
         # Acknowledge the RabbitMQ message after a successful commit
         channel.basic_ack(delivery_tag=method.delivery_tag)
         print("Data scraping and processing completed successfully!")
 
-    # Rollback and nack if not success
+    # Nack if not success (the transaction block has already rolled back)
     except Exception as e: # pylint: disable=W0718
-        conn.rollback()
         # Nack the message with requeue=False in case of failure
         channel.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
         print(f"Error while scraping and processing new data: {str(e)}")
+        try:
+            finish_task(task_id, "failed", error=str(e))
+        except Exception as registry_error: # pylint: disable=W0718
+            print(f"Could not record the task failure: {registry_error}")
 
     finally:
-        if conn:
-            conn.close()  # Ensure the connection is closed
+        print(f"DB pool: {pool_stats()}")
 
-def handle_recompute_analytics():
+def handle_recompute_analytics(task_id=None):
     """Call function to rerun queries (recompute analytics) for newly scraped data."""
     try:
+        start_task(task_id, "recompute_analytics")
         print("Recomputing analytics...")
         results = run_queries()
+        finish_task(task_id, "succeeded")
         print("Analytics recomputed successfully!")
         return results
     except Exception as e: # pylint: disable=W0718
         print(f"Error while recomputing analytics: {str(e)}")
+        try:
+            finish_task(task_id, "failed", error=str(e))
+        except Exception as registry_error: # pylint: disable=W0718
+            print(f"Could not record the task failure: {registry_error}")
         return e
 
-def callback(channel, method, body):
+def run_single_flight(kind, channel, method, task_id, run):
+    """
+    Call run() while holding the lock for `kind`, so only one task of each kind
+    runs at a time across workers; run() settles the message. While another
+    worker holds the lock, the duplicate message is acknowledged and its task
+    marked as coalesced into the running one instead.
+    """
+    ran = False
+    try:
+        with single_flight(kind) as acquired:
+            if acquired:
+                ran = True
+                run()
+                return
+        running = running_task(kind)
+        print(f"A {kind} task is already running ({running}); coalescing into it.")
+        finish_task(task_id, "coalesced", coalesced_into=running)
+        channel.basic_ack(delivery_tag=method.delivery_tag)
+
+    except Exception as e: # pylint: disable=W0718
+        # run() settles its own message and task; this covers taking the lock and
+        # coalescing. A task left queued would keep absorbing new requests.
+        if not ran:
+            try:
+                finish_task(task_id, "failed", error=str(e))
+            except Exception as registry_error: # pylint: disable=W0718
+                print(f"Could not record the task failure: {registry_error}")
+            channel.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+        print(f"Error while running {kind} single-flight: {str(e)}")
+
+def callback(channel, method, properties, body):
     """Define RabbitMQ message callback and determine message kind."""
     payload = json.loads(body)
     task_type = payload.get("kind")
+    # The web app registers each task it queues and sends its ID in the headers
+    task_id = (properties.headers or {}).get("task_id")
+
+    def recompute():
+        handle_recompute_analytics(task_id)
+        channel.basic_ack(delivery_tag=method.delivery_tag)
 
     # Route by "kind"
     if task_type == "scrape_new_data":
-        handle_scrape_new_data(channel, method)
+        run_single_flight(task_type, channel, method, task_id,
+                          lambda: handle_scrape_new_data(channel, method, task_id))
     elif task_type == "recompute_analytics":
-        handle_recompute_analytics()
+        run_single_flight(task_type, channel, method, task_id, recompute)
+    else:
+        # With prefetch_count=1 an unacknowledged message would stall the queue
+        channel.basic_ack(delivery_tag=method.delivery_tag)
 
 def main():
     """Start up RabbitMQ connection and consume messages."""
@@ -200,6 +230,7 @@ def main():
         channel.stop_consuming()
     finally:
         connection.close()
+        close_pool()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,226 @@
+"""
+This module maintains running aggregates of the `applicants` table so that the
+analysis answers can be refreshed in time proportional to newly ingested rows
+rather than to the size of the whole table.
+
+The aggregates live in the `applicant_rollup` table, which holds one row per
+combination of the low-cardinality dimensions the analysis queries filter on
+(term season and year, citizenship, accepted flag, degree), so it stays a few
+hundred rows however many applicants there are. Each row stores the number of
+applicants in that group together with the sums and non-null counts of the GPA
+and GRE metrics that fall under the validity thresholds used by `run_queries`.
+The questions about a university or program are not kept here: grouping by
+those names as well would leave about one group per applicant, so `run_queries`
+answers them from the narrow indexes on `applicants` instead.
+
+Functions:
+    create_rollup_table(cur) -> None
+        Create the `applicant_rollup` table if it does not exist.
+    apply_delta(cur, ids) -> None
+        Fold a batch of freshly inserted applicant rows into the rollup.
+    retract(cur, ids) -> None
+        Take a batch of applicant rows about to change out of the rollup.
+    rebuild(cur) -> None
+        Recompute the whole rollup from the `applicants` table.
+    check_consistency(conn) -> list
+        Compare the rollup with a full recompute and return any drifted groups.
+
+Usage:
+    $ python -m etl.aggregates            # check only
+    $ python -m etl.aggregates --rebuild  # rebuild, then check
+"""
+
+import argparse
+import psycopg
+from etl.update_database import get_db_connection  # pylint: disable=E0401
+
+ROLLUP_TABLE = "applicant_rollup"
+
+# Dimensions the rollup is grouped by (shared with db/init.sql).
+DIMENSIONS = [
+    "term_season", "term_year", "us_or_international", "is_accepted", "degree"
+]
+
+# Additive measures kept per group.
+MEASURES = [
+    "n", "gpa_sum", "gpa_n", "gpa_all_sum", "gpa_all_n", "gre_sum", "gre_n",
+    "gre_v_sum", "gre_v_n", "gre_aw_sum", "gre_aw_n"
+]
+
+# Grouped aggregate over `applicants`; the thresholds match run_queries.
+GROUPED_SELECT = """
+    SELECT
+        term_season,
+        term_year,
+        us_or_international,
+        COALESCE(decision = 'Accepted', FALSE) AS is_accepted,
+        degree,
+        COUNT(*) AS n,
+        COALESCE(SUM(gpa) FILTER (WHERE gpa < 5), 0) AS gpa_sum,
+        COUNT(gpa) FILTER (WHERE gpa < 5) AS gpa_n,
+        COALESCE(SUM(gpa), 0) AS gpa_all_sum,
+        COUNT(gpa) AS gpa_all_n,
+        COALESCE(SUM(gre) FILTER (WHERE gre < 170), 0) AS gre_sum,
+        COUNT(gre) FILTER (WHERE gre < 170) AS gre_n,
+        COALESCE(SUM(gre_v) FILTER (WHERE gre_v < 170), 0) AS gre_v_sum,
+        COUNT(gre_v) FILTER (WHERE gre_v < 170) AS gre_v_n,
+        COALESCE(SUM(gre_aw) FILTER (WHERE gre_aw < 6), 0) AS gre_aw_sum,
+        COUNT(gre_aw) FILTER (WHERE gre_aw < 6) AS gre_aw_n
+    FROM applicants
+    {where}
+    GROUP BY 1, 2, 3, 4, 5
+"""
+
+
+def create_rollup_table(cur):
+    """Create the `applicant_rollup` table (as in db/init.sql) if it does not exist."""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS applicant_rollup (
+            term_season term_season,
+            term_year SMALLINT,
+            us_or_international TEXT,
+            is_accepted BOOLEAN NOT NULL,
+            degree TEXT,
+            n BIGINT NOT NULL DEFAULT 0,
+            gpa_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+            gpa_n BIGINT NOT NULL DEFAULT 0,
+            gpa_all_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+            gpa_all_n BIGINT NOT NULL DEFAULT 0,
+            gre_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+            gre_n BIGINT NOT NULL DEFAULT 0,
+            gre_v_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+            gre_v_n BIGINT NOT NULL DEFAULT 0,
+            gre_aw_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+            gre_aw_n BIGINT NOT NULL DEFAULT 0,
+            UNIQUE NULLS NOT DISTINCT (term_season, term_year, us_or_international,
+                                       is_accepted, degree)
+        )
+    """)
+
+
+def _columns(names):
+    """Join column names into a comma separated list of identifiers."""
+    return psycopg.sql.SQL(", ").join(psycopg.sql.Identifier(n) for n in names)
+
+
+def _fold(cur, ids, sign):
+    """Add (sign 1) or subtract (sign -1) the given applicant rows in the rollup."""
+    table = psycopg.sql.Identifier(ROLLUP_TABLE)
+    measures = psycopg.sql.SQL(", ").join(
+        psycopg.sql.SQL("{sign} * {col}").format(sign=psycopg.sql.Literal(sign),
+                                                 col=psycopg.sql.Identifier(m))
+        for m in MEASURES)
+    updates = psycopg.sql.SQL(", ").join(
+        psycopg.sql.SQL("{col} = {table}.{col} + EXCLUDED.{col}").format(
+            col=psycopg.sql.Identifier(m), table=table) for m in MEASURES)
+
+    delta_query = psycopg.sql.SQL("""
+        INSERT INTO {table} ({fields})
+        SELECT {dimensions}, {measures} FROM (""" + GROUPED_SELECT + """) AS delta
+        ON CONFLICT ({dimensions}) DO UPDATE SET {updates}
+    """).format(table=table,
+                fields=_columns(DIMENSIONS + MEASURES),
+                measures=measures,
+                where=psycopg.sql.SQL("WHERE id = ANY(%s)"),
+                dimensions=_columns(DIMENSIONS),
+                updates=updates)
+
+    cur.execute(delta_query, (list(ids), ))
+
+
+def apply_delta(cur, ids):
+    """
+    Add the applicant rows with the given ids to the rollup.
+
+    Must be called with the cursor of the transaction that inserted the rows,
+    so the rollup and the `applicants` table commit (or roll back) together.
+    """
+    if not ids:
+        return
+    _fold(cur, ids, 1)
+
+
+def retract(cur, ids):
+    """
+    Subtract the applicant rows with the given ids from the rollup, e.g. before
+    they are updated or deleted, and drop groups left empty. Like apply_delta,
+    it must run in the transaction that changes the rows.
+    """
+    if not ids:
+        return
+    _fold(cur, ids, -1)
+    cur.execute(psycopg.sql.SQL("DELETE FROM {table} WHERE n = 0").format(
+        table=psycopg.sql.Identifier(ROLLUP_TABLE)))
+
+
+def rebuild(cur):
+    """Recompute the rollup from scratch out of the `applicants` table."""
+    table = psycopg.sql.Identifier(ROLLUP_TABLE)
+    cur.execute(psycopg.sql.SQL("TRUNCATE {table}").format(table=table))
+    cur.execute(
+        psycopg.sql.SQL("INSERT INTO {table} ({fields})" +
+                        GROUPED_SELECT).format(
+                            table=table,
+                            fields=_columns(DIMENSIONS + MEASURES),
+                            where=psycopg.sql.SQL("")))
+
+
+def check_consistency(conn):
+    """
+    Compare the running aggregates against a full recompute.
+
+    Sums are compared after rounding to six decimal places so that the order in
+    which floating point values were added does not register as drift.
+    Returns a list of (side, row) tuples, where side is "rollup" for groups only
+    present in the stored rollup and "recompute" for groups only present in the
+    recomputed one. An empty list means the rollup is consistent.
+    """
+    rounded = psycopg.sql.SQL(", ").join(
+        psycopg.sql.SQL("ROUND({col}::numeric, 6)").format(
+            col=psycopg.sql.Identifier(m)) if m.endswith("_sum") else
+        psycopg.sql.Identifier(m) for m in MEASURES)
+
+    check_query = psycopg.sql.SQL("""
+        WITH stored AS (
+            SELECT {dimensions}, {rounded} FROM {table}
+        ), recomputed AS (
+            SELECT {dimensions}, {rounded} FROM (""" + GROUPED_SELECT +
+                                  """) AS full_recompute
+        )
+        (SELECT 'rollup' AS side, * FROM (
+            SELECT * FROM stored EXCEPT SELECT * FROM recomputed) AS only_stored)
+        UNION ALL
+        (SELECT 'recompute' AS side, * FROM (
+            SELECT * FROM recomputed EXCEPT SELECT * FROM stored) AS only_recomputed)
+    """).format(dimensions=_columns(DIMENSIONS),
+                rounded=rounded,
+                table=psycopg.sql.Identifier(ROLLUP_TABLE),
+                where=psycopg.sql.SQL(""))
+
+    with conn.cursor() as cur:
+        cur.execute(check_query)
+        return [(row[0], row[1:]) for row in cur.fetchall()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Check or rebuild the applicant rollup.")
+    parser.add_argument("--rebuild",
+                        action="store_true",
+                        help="recompute the rollup before checking it")
+    args = parser.parse_args()
+
+    with get_db_connection() as connection:
+        if args.rebuild:
+            with connection.transaction():
+                with connection.cursor() as cursor:
+                    rebuild(cursor)
+            print("Rollup rebuilt.")
+
+        drift = check_consistency(connection)
+        if drift:
+            print(f"Rollup is inconsistent ({len(drift)} differing groups):")
+            for side, group in drift:
+                print(f"  {side}: {group}")
+        else:
+            print("Rollup is consistent with a full recompute.")
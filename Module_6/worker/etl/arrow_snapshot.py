@@ -0,0 +1,153 @@
+"""
+This module answers the `run_queries` questions from a columnar Arrow snapshot of
+the `applicants` table instead of the database, for notebooks and CLI runs that
+re-run the analysis many times.
+
+`export_arrow` streams the analysed columns of `applicants` into an Arrow IPC
+file. `open_arrow` memory-maps that file, so columns are read straight from the
+page cache without being copied or parsed, and opening it costs milliseconds
+whatever its size. `arrow_stats` then computes the same raw values as the SQL
+statements in `query_data`, with vectorised Arrow compute masks for the term,
+decision, citizenship and university filters.
+
+Functions:
+    export_arrow(conn, path, batch_size=50000) -> int
+        Write the analysed columns of `applicants` to an Arrow file; returns the row count.
+    open_arrow(path) -> pyarrow.Table
+        Memory-map an Arrow snapshot (zero-copy).
+    arrow_stats(table) -> dict
+        Compute the raw analysis values from a snapshot.
+
+Usage:
+    >>> from query_data import run_queries
+    >>> results = run_queries(source="arrow", path="applicants.arrow")
+
+    $ python query_data.py --export-arrow applicants.arrow
+    $ python query_data.py --source arrow --arrow applicants.arrow
+"""
+
+import psycopg
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Columns the analysis questions read, with their Arrow types.
+ARROW_SCHEMA = pa.schema([
+    ("term_season", pa.string()),
+    ("term_year", pa.int16()),
+    ("decision", pa.string()),
+    ("us_or_international", pa.string()),
+    ("degree", pa.string()),
+    ("llm_generated_university", pa.string()),
+    ("llm_generated_program", pa.string()),
+    ("gpa", pa.float64()),
+    ("gre", pa.float64()),
+    ("gre_v", pa.float64()),
+    ("gre_aw", pa.float64()),
+])
+
+
+def export_arrow(conn, path, batch_size=50000):
+    """
+    Stream the analysed columns of `applicants` into an Arrow IPC file at `path`.
+    Rows are fetched with a server-side cursor and written `batch_size` at a time,
+    so the export never holds the whole table. Returns the number of rows written.
+    """
+    export_query = psycopg.sql.SQL("SELECT {fields} FROM {table}").format(
+        fields=psycopg.sql.SQL(", ").join(
+            psycopg.sql.SQL("{col}::text").format(col=psycopg.sql.Identifier(name))
+            if pa.types.is_string(ARROW_SCHEMA.field(name).type)
+            else psycopg.sql.Identifier(name) for name in ARROW_SCHEMA.names),
+        table=psycopg.sql.Identifier("applicants"))
+
+    written = 0
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, ARROW_SCHEMA) as writer:
+        with conn.transaction(), conn.cursor(name="arrow_export") as cur:
+            cur.itersize = batch_size
+            cur.execute(export_query)
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                columns = list(zip(*rows))
+                writer.write_batch(pa.record_batch(
+                    [pa.array(values, type=field.type)
+                     for values, field in zip(columns, ARROW_SCHEMA)],
+                    schema=ARROW_SCHEMA))
+                written += len(rows)
+    return written
+
+
+def open_arrow(path):
+    """Memory-map the Arrow snapshot at `path` and return it as a zero-copy table."""
+    with pa.memory_map(str(path), "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def _is(table, column, value):
+    """Mask of rows where `column` equals `value` (nulls never match, as in SQL)."""
+    return pc.fill_null(pc.equal(table[column], value), False)
+
+
+def _below(table, column, limit):
+    """Mask of rows where `column` is below `limit` (nulls never match)."""
+    return pc.fill_null(pc.less(table[column], limit), False)
+
+
+def _count(mask):
+    """Number of rows selected by `mask`."""
+    return pc.sum(mask).as_py() or 0
+
+
+def _mean(table, column, mask):
+    """Mean of the non-null values of `column` under `mask`, or None (like SQL AVG)."""
+    return pc.mean(pc.filter(table[column], mask)).as_py()
+
+
+def _percentage(part, whole):
+    """part / whole as a percentage, or None for an empty whole."""
+    return part * 100.0 / whole if whole else None
+
+
+def arrow_stats(table):
+    """
+    Compute the raw analysis values of `run_queries` from an Arrow snapshot.
+    Returns the same keys and values as the SQL statements over `applicants`.
+    """
+    f25 = pc.and_(_is(table, "term_season", "Fall"), _is(table, "term_year", 2025))
+    accepted = _is(table, "decision", "Accepted")
+    f25_accepted = pc.and_(f25, accepted)
+    f25_accepted_gpa = pc.and_(f25_accepted, _below(table, "gpa", 5))
+    computer_science = _is(table, "llm_generated_program", "Computer Science")
+
+    stats = {
+        "count_f_2025": _count(f25),
+        "percentage_international": _percentage(
+            _count(_is(table, "us_or_international", "International")), table.num_rows),
+        "average_gpa": _mean(table, "gpa", _below(table, "gpa", 5)),
+        "average_gre": _mean(table, "gre", _below(table, "gre", 170)),
+        "average_gre_v": _mean(table, "gre_v", _below(table, "gre_v", 170)),
+        "average_gre_aw": _mean(table, "gre_aw", _below(table, "gre_aw", 6)),
+        "average_gpa_american": _mean(table, "gpa",
+                                      _is(table, "us_or_international", "American")),
+        "percentage_accepted_f25": _percentage(_count(f25_accepted), _count(f25)),
+        "average_gpa_accepted_f25": _mean(table, "gpa", f25_accepted_gpa),
+        "count_jhu_cs_masters": _count(pc.and_(pc.and_(
+            _is(table, "llm_generated_university", "Johns Hopkins University"),
+            _is(table, "degree", "Masters")), computer_science)),
+        "count_hoya_cs_phd_2025": _count(pc.and_(pc.and_(pc.and_(
+            _is(table, "llm_generated_university", "Georgetown University"),
+            _is(table, "degree", "PhD")), computer_science), accepted)),
+        "uva_gpa": _mean(table, "gpa", pc.and_(
+            f25_accepted_gpa, _is(table, "llm_generated_university", "University of Virginia"))),
+        "vt_gpa": _mean(table, "gpa", pc.and_(
+            f25_accepted_gpa, _is(table, "llm_generated_university", "Virginia Tech"))),
+    }
+
+    # 9. Most common university among Fall 2025 applicants.
+    counts = pc.value_counts(pc.filter(table["llm_generated_university"], f25))
+    if len(counts):
+        top = pc.index(counts.field("counts"), pc.max(counts.field("counts"))).as_py()
+        stats["popular_u_f25"] = counts.field("values")[top].as_py()
+    else:
+        stats["popular_u_f25"] = "No data"
+    return stats
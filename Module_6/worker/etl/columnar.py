@@ -0,0 +1,212 @@
+"""
+This module is a columnar alternative to `clean_data` for bulk reprocessing, such
+as re-cleaning the full historical scrape.
+
+Scraped entries are loaded once into pyarrow string arrays, one per field, and
+every cleaning step runs as a vectorised Arrow compute kernel over the whole
+column. The steps are: strip digits from school names, strip HTML tags from
+comments, expand old-style terms ("F18" -> "Fall 2018"), parse the posting
+date, the term season/year and the decision/decision date, and coerce the GPA
+and GRE strings to numbers. The result is an Arrow table with the `applicants`
+column names and types. It can be COPYed into the database as is, or turned into
+the dicts `clean_data` returns.
+
+Functions:
+    load_columns(raw_data) -> dict
+        Transpose scraped entries into one Arrow string array per raw field.
+    clean_columns(raw_data) -> pyarrow.Table
+        Clean scraped entries into a columnar batch keyed by `applicants` columns.
+    to_dicts(table) -> list
+        Convert a cleaned batch into the list of dicts `clean_data` returns.
+    copy_table(cur, table) -> None
+        COPY a cleaned batch into the `applicants` table.
+
+Usage:
+    $ python -m etl.columnar raw.json --out clean.jsonl.gz   # dicts for the LLM stage
+    $ python -m etl.columnar raw.json --copy                 # load straight into applicants
+"""
+
+import argparse
+import psycopg
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+from etl.update_database import (  # pylint: disable=E0401
+    RECORD_KEYS, SHORT_SEASONS, get_db_connection)
+from etl.snapshot import load_records, save_records  # pylint: disable=E0401
+
+# Raw scraped fields read into columns.
+RAW_FIELDS = (
+    "school", "program", "degree", "comments", "date_added", "status", "link",
+    "semester_year", "citizenship", "GPA", "GRE", "GRE_V", "GRE_AW"
+)
+
+# Cleaned columns, named as in `applicants` and ordered as RECORD_KEYS.
+COLUMNS = (
+    "program", "comments", "date_added", "url", "status", "term", "us_or_international",
+    "degree", "gre", "gre_v", "gpa", "gre_aw", "term_season", "term_year", "decision",
+    "decision_date"
+)
+
+RE_TERM_FULL = r"(?i)^\s*(?P<season>winter|spring|summer|fall)\s+(?P<year>\d{4})\s*$"
+RE_DECISION = (r"(?i)^\s*(?P<decision>accepted|rejected|wait listed|interview|other)"
+               r"(?:\s+on\s+(?P<day>\d{1,2})\s+(?P<month>[a-z]{3}))?")
+RE_NUMBER = r"^\s*\d+(\.\d+)?\s*$"
+
+
+def load_columns(raw_data: list):
+    """Transpose scraped entries into one Arrow string array per raw field."""
+    return {
+        field: pa.array([entry.get(field) for entry in raw_data], type=pa.string())
+        for field in RAW_FIELDS
+    }
+
+
+def _null_if(strings, value):
+    """Replace `value` (e.g. the empty match of an optional group) with null."""
+    return pc.if_else(pc.equal(strings, value), pa.scalar(None, pa.string()), strings)
+
+
+def _numbers(strings):
+    """Coerce numeric strings to float64; anything unparsable becomes null."""
+    valid = pc.match_substring_regex(strings, RE_NUMBER)
+    return pc.cast(pc.if_else(valid, pc.utf8_trim_whitespace(strings),
+                              pa.scalar(None, pa.string())), pa.float64())
+
+
+def _dates(strings, fmt):
+    """Parse strings with a strptime format into date32; failures become null."""
+    return pc.cast(pc.strptime(strings, format=fmt, unit="s", error_is_null=True),
+                   pa.date32())
+
+
+def _posting_dates(date_added):
+    """Parse "Added on March 31, 2024", "March 31, 2024" or ISO posting dates."""
+    return pc.coalesce(_dates(date_added, "Added on %B %d, %Y"),
+                       _dates(date_added, "%B %d, %Y"),
+                       _dates(date_added, "%Y-%m-%d"))
+
+
+def _terms(semester_year):
+    """Expand old-style terms ("F18", "S19") to "Fall 2018"/"Spring 2019"."""
+    term = semester_year
+    for letter, season in SHORT_SEASONS.items():
+        term = pc.replace_substring_regex(term, pattern=rf"^{letter}(\d{{2}})$",
+                                          replacement=rf"{season} 20\1")
+    return term
+
+
+def _decision_dates(day, month, added):
+    """
+    Build decision dates from the day and month in the status. The year comes
+    from the posting date, stepping back a year when the result would fall
+    after it (as parse_decision does). Impossible dates such as 31 Feb are null.
+    """
+    day = _null_if(day, "")
+
+    def on_year(year):
+        text = pc.binary_join_element_wise(pc.cast(year, pa.string()), month, day, "-")
+        candidate = _dates(text, "%Y-%b-%d")
+        # strptime normalises overflowing days, so check the day survived intact.
+        same_day = pc.equal(pc.day(candidate), pc.cast(day, pa.int64()))
+        return pc.if_else(same_day, candidate, pa.scalar(None, pa.date32()))
+
+    year = pc.year(added)
+    this_year = on_year(year)
+    return pc.if_else(pc.greater(this_year, added), on_year(pc.subtract(year, 1)), this_year)
+
+
+def clean_columns(raw_data: list):
+    """
+    Clean scraped entries into an Arrow table whose columns match `applicants`.
+
+    Produces the same values as clean_data, except that GPA/GRE are float64
+    and dates are date32 rather than strings.
+    """
+    raw = load_columns(raw_data)
+
+    school = pc.replace_substring_regex(raw["school"], pattern=r"\d", replacement="")
+    term = _terms(raw["semester_year"])
+    added = _posting_dates(raw["date_added"])
+
+    term_parts = pc.extract_regex(term, pattern=RE_TERM_FULL)
+    decision_parts = pc.extract_regex(raw["status"], pattern=RE_DECISION)
+
+    return pa.table({
+        "program": pc.binary_join_element_wise(raw["program"], school, ", "),
+        "comments": pc.replace_substring_regex(raw["comments"], pattern=r"<[^>]+>",
+                                               replacement=""),
+        "date_added": added,
+        "url": raw["link"],
+        "status": raw["status"],
+        "term": term,
+        "us_or_international": raw["citizenship"],
+        "degree": raw["degree"],
+        "gre": _numbers(raw["GRE"]),
+        "gre_v": _numbers(raw["GRE_V"]),
+        "gpa": _numbers(raw["GPA"]),
+        "gre_aw": _numbers(raw["GRE_AW"]),
+        "term_season": pc.utf8_capitalize(pc.struct_field(term_parts, "season")),
+        "term_year": pc.cast(pc.struct_field(term_parts, "year"), pa.int16()),
+        "decision": pc.utf8_capitalize(pc.struct_field(decision_parts, "decision")),
+        "decision_date": _decision_dates(pc.struct_field(decision_parts, "day"),
+                                         pc.struct_field(decision_parts, "month"), added),
+    })
+
+
+def to_dicts(table):
+    """Convert a cleaned batch into clean_data's dicts (dates as ISO strings, numbers as floats)."""
+    renamed = {}
+    for column, key in zip(COLUMNS, RECORD_KEYS):
+        values = table.column(column)
+        if pa.types.is_date(values.type):
+            values = pc.cast(values, pa.string())
+        renamed[key] = values
+    return pa.table(renamed).to_pylist()
+
+
+def copy_table(cur, table):
+    """
+    COPY a cleaned batch into `applicants` as CSV written by Arrow.
+    Arrow quotes every string, so empty strings stay distinct from NULLs.
+    """
+    sink = pa.BufferOutputStream()
+    pacsv.write_csv(table, sink, write_options=pacsv.WriteOptions(include_header=False))
+
+    copy_query = psycopg.sql.SQL("COPY {table} ({fields}) FROM STDIN WITH (FORMAT csv)").format(
+        table=psycopg.sql.Identifier("applicants"),
+        fields=psycopg.sql.SQL(", ").join(
+            psycopg.sql.Identifier(col) for col in table.column_names))
+    with cur.copy(copy_query) as copy:
+        copy.write(sink.getvalue().to_pybytes())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Clean a scraped JSON dump with the columnar cleaner.")
+    parser.add_argument("file", help="scraped entries (JSON list or .jsonl.gz snapshot)")
+    parser.add_argument("--out", help="write clean_data-style dicts to this JSON or "
+                                      ".jsonl.gz snapshot file")
+    parser.add_argument("--copy", action="store_true",
+                        help="COPY the cleaned rows into applicants and rebuild the rollup "
+                             "and name dictionary")
+    args = parser.parse_args()
+
+    cleaned = clean_columns(load_records(args.file))
+    print(f"Cleaned {cleaned.num_rows} entries ({cleaned.nbytes} bytes of columns).")
+
+    if args.out:
+        save_records(args.out, to_dicts(cleaned), RECORD_KEYS)
+
+    if args.copy:
+        from etl import names  # pylint: disable=C0415,E0401
+        from etl.aggregates import rebuild  # pylint: disable=C0415,E0401
+        from etl.partitions import ensure_partitions  # pylint: disable=C0415,E0401
+
+        with get_db_connection() as connection, connection.transaction():
+            with connection.cursor() as cursor:
+                ensure_partitions(cursor, pc.unique(cleaned.column("term_year")).to_pylist())
+                copy_table(cursor, cleaned)
+                rebuild(cursor)
+                names.rebuild(cursor)
+        print("Copied into applicants and rebuilt the rollup and name dictionary.")
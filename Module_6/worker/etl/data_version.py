@@ -0,0 +1,48 @@
+"""
+This module maintains the data version: a single-row counter that the worker
+bumps in the same transaction as every ingest that writes rows. Caches of data
+derived from `applicants` (the web app's rendered homepage, see web/page_cache.py)
+compare their version with it to tell when they are stale, so they are
+invalidated exactly when an ingest commits.
+
+Functions:
+    create_data_version(cur) -> None
+        Create the `data_version` table and its row if they are missing.
+    bump_data_version(cur) -> int
+        Increment the version in the caller's transaction; returns the new version.
+    current_data_version(cur) -> int
+        Return the current version.
+"""
+
+
+def create_data_version(cur):
+    """Create the single-row `data_version` table (as in db/init.sql) if it is missing."""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS data_version (
+            id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+            version BIGINT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+    """)
+    cur.execute("INSERT INTO data_version DEFAULT VALUES ON CONFLICT DO NOTHING")
+
+
+def bump_data_version(cur):
+    """
+    Increment the data version and stamp its update time. Runs in the caller's
+    transaction, so readers only see the new version once the ingest commits.
+    """
+    cur.execute("""
+        INSERT INTO data_version (version) VALUES (1)
+        ON CONFLICT (id) DO UPDATE
+        SET version = data_version.version + 1, updated_at = now()
+        RETURNING version
+    """)
+    return cur.fetchone()[0]
+
+
+def current_data_version(cur):
+    """Return the current data version (0 before the first ingest)."""
+    cur.execute("SELECT version FROM data_version")
+    row = cur.fetchone()
+    return row[0] if row else 0
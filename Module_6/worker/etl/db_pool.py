@@ -0,0 +1,114 @@
+"""
+This module owns the process-wide PostgreSQL connection pool shared by the
+consumer and the ETL helpers, so one task reuses open connections instead of
+calling `psycopg.connect` in every helper.
+
+Connections are health-checked before being handed out, and every checkout is
+timed so that acquisition latency and pool saturation can be reported.
+
+Environment Variables:
+    DATABASE_URL (str): PostgreSQL connection string used to connect to the database.
+    DB_POOL_MIN_SIZE (optional): Connections kept open at all times. Defaults to 1.
+    DB_POOL_MAX_SIZE (optional): Upper bound on open connections. Defaults to 10.
+    DB_POOL_TIMEOUT (optional): Seconds to wait for a free connection. Defaults to 30.
+    DB_POOL_MAX_IDLE (optional): Seconds before an idle extra connection is closed.
+        Defaults to 300.
+
+Functions:
+    database_url() -> str
+        The connection string of the pool, for connections made outside it.
+    get_pool() -> ConnectionPool
+        Return the shared pool, opening it on first use.
+    connection() -> context manager
+        Check a connection out for the duration of a ``with`` block.
+    pool_stats() -> dict
+        Pool size, saturation and acquisition latency figures.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from psycopg_pool import ConnectionPool
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+# Running totals for connection acquisition latency, guarded by _STATS_LOCK.
+_STATS_LOCK = threading.Lock()
+_ACQUIRE_STATS = {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+
+
+def database_url():
+    """Resolve the connection string, falling back to the compose database service."""
+    return os.getenv("DATABASE_URL", "postgres://postgres:Potassiumtree43!@db:5432/gradcafe_db")
+
+
+def get_pool():
+    """Return the shared connection pool, creating and opening it on first use."""
+    global _POOL  # pylint: disable=W0603
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = ConnectionPool(
+                    conninfo=database_url(),
+                    min_size=int(os.environ.get("DB_POOL_MIN_SIZE", 1)),
+                    max_size=int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+                    timeout=float(os.environ.get("DB_POOL_TIMEOUT", 30)),
+                    max_idle=float(os.environ.get("DB_POOL_MAX_IDLE", 300)),
+                    check=ConnectionPool.check_connection,
+                    name="worker",
+                    open=True)
+    return _POOL
+
+
+def _record_acquire(started):
+    """Add one checkout, started at perf_counter() value `started`, to the latency totals."""
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    with _STATS_LOCK:
+        _ACQUIRE_STATS["count"] += 1
+        _ACQUIRE_STATS["total_ms"] += elapsed_ms
+        _ACQUIRE_STATS["max_ms"] = max(_ACQUIRE_STATS["max_ms"], elapsed_ms)
+
+
+@contextmanager
+def connection():
+    """
+    Check a connection out of the pool for the duration of a ``with`` block.
+    The transaction is committed on success, rolled back on error, and the
+    connection is returned to the pool either way.
+    """
+    started = time.perf_counter()
+    with get_pool().connection() as conn:
+        _record_acquire(started)
+        yield conn
+
+
+def pool_stats():
+    """Report pool size, saturation and connection acquisition latency."""
+    stats = get_pool().get_stats()
+    in_use = stats["pool_size"] - stats["pool_available"]
+    with _STATS_LOCK:
+        count = _ACQUIRE_STATS["count"]
+        avg_ms = _ACQUIRE_STATS["total_ms"] / count if count else 0.0
+        max_ms = _ACQUIRE_STATS["max_ms"]
+    return {
+        "pool_min": stats["pool_min"],
+        "pool_max": stats["pool_max"],
+        "pool_size": stats["pool_size"],
+        "in_use": in_use,
+        "requests_waiting": stats["requests_waiting"],
+        "saturation": round(in_use / stats["pool_max"], 3),
+        "acquisitions": count,
+        "acquire_avg_ms": round(avg_ms, 3),
+        "acquire_max_ms": round(max_ms, 3),
+    }
+
+
+def close_pool():
+    """Close the shared pool (used on shutdown)."""
+    global _POOL  # pylint: disable=W0603
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.close()
+            _POOL = None
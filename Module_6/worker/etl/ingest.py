@@ -0,0 +1,163 @@
+"""
+This module writes LLM-extended applicant entries into the `applicants` table
+idempotently, so overlapping scrapes do not duplicate GradCafe results.
+
+Each result is keyed by its URL (which carries the GradCafe result ID) together
+with `term_year`; the partition key has to be part of any unique constraint on
+the partitioned table. Every row also stores `row_hash`, a digest of its scraped
+content (see etl.records). Entries are upserted in one batch: new results are
+inserted, results whose content changed are updated in place, and results seen
+before with the same content are skipped without writing anything. A result
+scraped without a link has no URL to be recognised by, so it is keyed by its
+`row_hash` instead: the same content is stored once, and changed content is a
+new row. Updated rows are retracted from `applicant_rollup` and the
+`applicant_names` dictionary before the upsert and folded back in afterwards,
+so the aggregates and name counts stay exact.
+
+Functions:
+    row_values(entry) -> tuple
+        Database values of an entry, in UPSERT_COLUMNS order.
+    upsert_applicants(cur, entries) -> dict
+        Upsert entries; returns the inserted/updated/skipped counts and changed ids.
+"""
+
+import psycopg
+from etl import names  # pylint: disable=E0401
+from etl.aggregates import apply_delta, retract  # pylint: disable=E0401
+from etl.records import UPSERT_COLUMNS, row_hash  # pylint: disable=E0401
+
+# Unique key of a result, and of a result without a url (shared with db/init.sql
+# and etl.partitions.create_result_keys, which define them as partial indexes).
+CONFLICT_KEY = ["url", "term_year"]
+UNLINKED_KEY = ["row_hash", "term_year"]
+
+
+def _number(value):
+    """Float of a scraped numeric string, or None when it is empty."""
+    return float(value) if value else None
+
+
+def row_values(entry):
+    """Database values of an LLM-extended entry, in UPSERT_COLUMNS order."""
+    return (
+        entry["program"] or None,
+        entry["comments"] or None,
+        entry["date_added"] or None,
+        entry["url"] or None,
+        entry["status"] or None,
+        entry["term"] or None,
+        entry["US/International"] or None,
+        _number(entry["GPA"]),
+        _number(entry["GRE"]),
+        _number(entry["GRE_V"]),
+        _number(entry["GRE_AW"]),
+        entry["Degree"] or None,
+        entry["llm-generated-program"] or None,
+        entry["llm-generated-university"] or None,
+        entry.get("term_season"),
+        entry.get("term_year"),
+        entry.get("decision"),
+        entry.get("decision_date"),
+    )
+
+
+def _identifiers(columns, prefix=None):
+    """Comma separated column identifiers, optionally qualified with `prefix`."""
+    return psycopg.sql.SQL(", ").join(
+        psycopg.sql.Identifier(prefix, column) if prefix else psycopg.sql.Identifier(column)
+        for column in columns)
+
+
+def _changed_ids(cur, rows):
+    """Ids of stored rows that share a key with `rows` but hold different content."""
+    url_at, year_at = UPSERT_COLUMNS.index("url"), UPSERT_COLUMNS.index("term_year")
+    cur.execute("""
+        SELECT applicants.id
+        FROM applicants
+        JOIN unnest(%s::text[], %s::smallint[], %s::bytea[]) AS batch(url, term_year, row_hash)
+          ON applicants.url = batch.url
+         AND applicants.term_year IS NOT DISTINCT FROM batch.term_year
+        WHERE applicants.row_hash IS DISTINCT FROM batch.row_hash
+    """, ([row[url_at] for row in rows], [row[year_at] for row in rows],
+          [row[-1] for row in rows]))
+    return [row[0] for row in cur.fetchall()]
+
+
+def _write(cur, query, rows, existing, stats):
+    """
+    Run `query` for every row and count the ids it returns into `stats`, as
+    updated when they are in `existing` (the ids of changed rows) and as
+    inserted otherwise.
+    """
+    if not rows:
+        return
+    cur.executemany(query, rows, returning=True)
+    while True:
+        # Skipped rows (unchanged content) return nothing. A result repeated
+        # within the batch updates the row its first occurrence wrote.
+        for (row_id, ) in cur.fetchall():
+            stats["updated" if row_id in existing else "inserted"] += 1
+            existing.add(row_id)
+            stats["ids"].append(row_id)
+        if not cur.nextset():
+            break
+
+
+def upsert_applicants(cur, entries):
+    """
+    Upsert LLM-extended entries into `applicants` and keep the rollup and the
+    name dictionary in step.
+
+    Must run inside the caller's transaction. Returns a dict with the number of
+    entries inserted, updated and skipped, and the ids of the inserted and
+    updated rows.
+    """
+    stats = {"inserted": 0, "updated": 0, "skipped": 0, "ids": []}
+    if not entries:
+        return stats
+
+    rows, unlinked = [], []
+    url_at = UPSERT_COLUMNS.index("url")
+    for entry in entries:
+        values = row_values(entry)
+        (rows if values[url_at] is not None else unlinked).append(
+            values + (row_hash(values), ))
+
+    # Take the old content of changed rows out of the aggregates first.
+    existing = set(_changed_ids(cur, rows))
+    retract(cur, sorted(existing))
+    names.retract(cur, sorted(existing))
+
+    columns = UPSERT_COLUMNS + ["row_hash"]
+    # The key columns are left alone so an update never moves a row's partition.
+    updated = [col for col in columns if col not in CONFLICT_KEY]
+    insert = psycopg.sql.SQL("""
+        INSERT INTO {table} ({fields})
+        VALUES ({placeholders})
+    """).format(table=psycopg.sql.Identifier("applicants"),
+                fields=_identifiers(columns),
+                placeholders=psycopg.sql.SQL(", ").join(
+                    psycopg.sql.Placeholder() for _ in columns))
+    upsert_query = psycopg.sql.SQL("""
+        {insert}
+        ON CONFLICT ({key}) WHERE url IS NOT NULL DO UPDATE SET ({updated}) = ({excluded})
+        WHERE {table}.row_hash IS DISTINCT FROM EXCLUDED.row_hash
+        RETURNING id
+    """).format(insert=insert,
+                table=psycopg.sql.Identifier("applicants"),
+                key=_identifiers(CONFLICT_KEY),
+                updated=_identifiers(updated),
+                excluded=_identifiers(updated, "excluded"))
+    unlinked_query = psycopg.sql.SQL("""
+        {insert}
+        ON CONFLICT ({key}) WHERE url IS NULL AND row_hash IS NOT NULL DO NOTHING
+        RETURNING id
+    """).format(insert=insert, key=_identifiers(UNLINKED_KEY))
+
+    _write(cur, upsert_query, rows, existing, stats)
+    _write(cur, unlinked_query, unlinked, existing, stats)
+    stats["skipped"] = len(rows) + len(unlinked) - stats["inserted"] - stats["updated"]
+
+    apply_delta(cur, stats["ids"])
+    names.apply_delta(cur, stats["ids"])
+    return stats
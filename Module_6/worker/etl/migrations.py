@@ -0,0 +1,313 @@
+"""
+This module migrates an existing `applicants` table to the parsed, typed term and
+decision columns, the DATE `date_added` column, the unique result key used by the
+upserting ingest path and the term-year partitioned layout introduced alongside
+db/init.sql.
+
+Databases created before the change only hold the free-text `term` ("Fall 2025")
+and `status` ("Accepted on 1 Mar") columns, and may hold the same result several
+times from overlapping scrapes. The migration adds the enum types and columns,
+moves duplicate results to `applicants_duplicates` and adds the result keys,
+backfills the typed columns in batches with the same parsers the cleaning stage
+uses, rebuilds the table partitioned by term year (see etl.partitions) with a
+unique (id, term_year) key in place of the plain id index, swaps the
+string-matching indexes for ones on the typed columns, adds the generated
+`comments_tsv` search column and its GIN index, recreates the `applicant_rollup`
+aggregates grouped by season and year (and no longer by university and program),
+builds the `applicant_names` dictionary for the name autocomplete, and adds the
+data-version counter and page-cache table used to invalidate the web app's cached
+pages, and the task registry.
+Every step is idempotent, so re-running it on a migrated database only backfills
+rows that are still NULL.
+
+Functions:
+    add_typed_columns(cur) -> None
+        Create the enum types and add the typed columns if they are missing.
+    convert_date_added(cur) -> None
+        Store date_added as a DATE (older databases use a TIMESTAMP).
+    add_result_key(cur) -> int
+        Add row_hash and the result keys; returns the duplicates moved aside.
+    backfill_typed_columns(conn, batch_size) -> int
+        Parse term/status for rows that have not been parsed yet; returns the row count.
+    add_id_key(cur) -> None
+        Replace the non-unique id index of a partitioned table with the (id, term_year) key.
+    replace_indexes(cur) -> None
+        Drop the string-matching indexes and build the typed-column index set.
+    add_comment_search(cur) -> None
+        Add the generated comments_tsv column and its GIN index.
+    recreate_rollup(cur) -> None
+        Recreate `applicant_rollup` with the season/year dimensions and rebuild it.
+    add_name_dictionary(cur) -> None
+        Create the `applicant_names` dictionary and fill it (see etl.names).
+    add_cache_tables(cur) -> None
+        Create the `data_version` counter and the shared `page_cache` table.
+    create_task_table(cur) -> None
+        Create the `tasks` registry (see etl.task_registry).
+    migrate(conn, batch_size) -> None
+        Run every step above in order.
+
+Usage:
+    $ python -m etl.migrations --batch-size 5000
+"""
+
+import argparse
+import psycopg
+from etl.update_database import get_db_connection, parse_term, parse_decision  # pylint: disable=E0401
+from etl import names  # pylint: disable=E0401
+from etl.aggregates import create_rollup_table, rebuild  # pylint: disable=E0401
+from etl.partitions import create_result_keys, partition_applicants  # pylint: disable=E0401
+from etl.data_version import create_data_version  # pylint: disable=E0401
+from etl.task_registry import create_task_table  # pylint: disable=E0401
+
+# Indexes built on the free-text columns before the typed columns existed.
+LEGACY_INDEXES = [
+    "applicants_term_status_idx", "applicants_accepted_idx", "applicants_fall_2025_idx"
+]
+
+
+def add_typed_columns(cur):
+    """Create the term_season/decision_kind enums and add the typed columns."""
+    cur.execute("""
+        DO $$ BEGIN
+            CREATE TYPE term_season AS ENUM ('Winter', 'Spring', 'Summer', 'Fall');
+        EXCEPTION WHEN duplicate_object THEN NULL;
+        END $$
+    """)
+    cur.execute("""
+        DO $$ BEGIN
+            CREATE TYPE decision_kind AS ENUM (
+                'Accepted', 'Rejected', 'Wait listed', 'Interview', 'Other');
+        EXCEPTION WHEN duplicate_object THEN NULL;
+        END $$
+    """)
+    cur.execute("""
+        ALTER TABLE applicants
+            ADD COLUMN IF NOT EXISTS term_season term_season,
+            ADD COLUMN IF NOT EXISTS term_year SMALLINT,
+            ADD COLUMN IF NOT EXISTS decision decision_kind,
+            ADD COLUMN IF NOT EXISTS decision_date DATE
+    """)
+
+
+def convert_date_added(cur):
+    """Change a TIMESTAMP date_added column to DATE; no-op when it already is one."""
+    cur.execute("""
+        SELECT data_type FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'applicants'
+          AND column_name = 'date_added'
+    """)
+    row = cur.fetchone()
+    if row is None or row[0] == "date":
+        return
+    cur.execute("""
+        ALTER TABLE applicants
+            ALTER COLUMN date_added TYPE DATE USING date_added::date,
+            ALTER COLUMN date_added SET DEFAULT CURRENT_DATE
+    """)
+
+
+def add_result_key(cur):
+    """
+    Add the row_hash column and the unique result keys the worker upserts on (see
+    etl.partitions.create_result_keys). Before the first key is added, duplicate
+    results with a url are moved to `applicants_duplicates`, keeping the earliest
+    row of each in `applicants`; rows without a url are all kept. A key added by
+    an earlier version, which treated every url-less result in a term as the same
+    one, is replaced. Existing rows keep a NULL row_hash, so the next scrape that
+    sees them rewrites them once. Returns the number of rows moved.
+    """
+    cur.execute("ALTER TABLE applicants ADD COLUMN IF NOT EXISTS row_hash BYTEA")
+    cur.execute("SELECT to_regclass('applicants_url_term_year_key') IS NOT NULL")
+    keyed = cur.fetchone()[0]
+    cur.execute("ALTER TABLE applicants DROP CONSTRAINT IF EXISTS applicants_url_term_year_key")
+
+    moved = 0
+    if not keyed:
+        cur.execute("CREATE TABLE IF NOT EXISTS applicants_duplicates (LIKE applicants)")
+        cur.execute("""
+            WITH removed AS (
+                DELETE FROM applicants AS later USING applicants AS earlier
+                WHERE later.url = earlier.url
+                  AND later.term_year IS NOT DISTINCT FROM earlier.term_year
+                  AND later.id > earlier.id
+                RETURNING later.*
+            )
+            INSERT INTO applicants_duplicates SELECT * FROM removed
+        """)
+        moved = cur.rowcount
+    create_result_keys(cur)
+    return moved
+
+
+def backfill_typed_columns(conn, batch_size=5000):
+    """
+    Parse term and status into the typed columns for rows that still lack them.
+    Rows are walked in id order and each batch is committed on its own, so a large
+    table is never locked for the whole backfill. Returns the number of rows visited.
+    """
+    last_id = 0
+    visited = 0
+    while True:
+        with conn.transaction(), conn.cursor() as cur:
+            cur.execute("""
+                SELECT id, term, status, date_added::text FROM applicants
+                WHERE id > %s
+                  AND ((term IS NOT NULL AND term_year IS NULL)
+                       OR (status IS NOT NULL AND decision IS NULL))
+                ORDER BY id
+                LIMIT %s
+            """, (last_id, batch_size))
+            rows = cur.fetchall()
+            if not rows:
+                return visited
+
+            updates = []
+            for row_id, term, status, date_added in rows:
+                season, year = parse_term(term)
+                decision, decision_date = parse_decision(status, date_added)
+                updates.append((season, year, decision, decision_date, row_id))
+            cur.executemany("""
+                UPDATE applicants
+                SET term_season = %s, term_year = %s, decision = %s, decision_date = %s
+                WHERE id = %s
+            """, updates)
+
+        last_id = rows[-1][0]
+        visited += len(rows)
+        print(f"Backfilled {visited} rows (up to id {last_id})")
+
+
+def add_id_key(cur):
+    """
+    Add the unique (id, term_year) key to a table partitioned before it existed,
+    and drop the plain id index it replaces. A primary key cannot be used, since
+    term_year may be NULL. No-op when the key is already there.
+    """
+    cur.execute("""
+        SELECT 1 FROM pg_constraint
+        WHERE conrelid = to_regclass('applicants') AND contype = 'u'
+          AND conname = 'applicants_id_term_year_key'
+    """)
+    if cur.fetchone():
+        return
+    cur.execute("""
+        ALTER TABLE applicants ADD CONSTRAINT applicants_id_term_year_key
+            UNIQUE NULLS NOT DISTINCT (id, term_year)
+    """)
+    cur.execute("DROP INDEX IF EXISTS applicants_id_idx")
+
+
+def replace_indexes(cur):
+    """
+    Drop the string-matching and BRIN indexes and build the typed-column and
+    keyset-pagination index set.
+    """
+    for index in LEGACY_INDEXES:
+        cur.execute(psycopg.sql.SQL("DROP INDEX IF EXISTS {}").format(
+            psycopg.sql.Identifier(index)))
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS applicants_term_decision_idx
+            ON applicants (term_year, term_season, decision)
+    """)
+    cur.execute("""
+        DROP INDEX IF EXISTS applicants_university_program_degree_idx
+    """)
+    cur.execute("""
+        CREATE INDEX applicants_university_program_degree_idx
+            ON applicants (llm_generated_university, llm_generated_program, degree)
+            INCLUDE (decision)
+    """)
+    # Superseded by the (date_added, id) btree below.
+    cur.execute("DROP INDEX IF EXISTS applicants_date_added_brin")
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS applicants_date_added_id_idx
+            ON applicants (date_added DESC NULLS LAST, id DESC)
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS applicants_university_date_added_idx
+            ON applicants (llm_generated_university, date_added DESC NULLS LAST, id DESC)
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS applicants_accepted_idx
+            ON applicants (term_year, term_season, llm_generated_university) INCLUDE (gpa)
+            WHERE decision = 'Accepted'
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS applicants_fall_2025_idx
+            ON applicants (llm_generated_university) INCLUDE (decision, gpa)
+            WHERE term_season = 'Fall' AND term_year = 2025
+    """)
+    cur.execute("ANALYZE applicants")
+
+
+def add_comment_search(cur):
+    """
+    Add the full-text search column over comments (as in db/init.sql) and its GIN
+    index. Adding a stored generated column rewrites the table once.
+    """
+    cur.execute("""
+        ALTER TABLE applicants ADD COLUMN IF NOT EXISTS comments_tsv TSVECTOR
+            GENERATED ALWAYS AS (to_tsvector('english', coalesce(comments, ''))) STORED
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS applicants_comments_tsv_idx
+            ON applicants USING gin (comments_tsv)
+    """)
+
+
+def recreate_rollup(cur):
+    """Recreate `applicant_rollup` grouped by term season and year, then rebuild it."""
+    cur.execute("DROP TABLE IF EXISTS applicant_rollup")
+    create_rollup_table(cur)
+    rebuild(cur)
+
+
+def add_name_dictionary(cur):
+    """Create the `applicant_names` dictionary (and its trigram index) and fill it."""
+    names.create_name_table(cur)
+    names.rebuild(cur)
+
+
+def add_cache_tables(cur):
+    """Create the data-version counter and the shared page-cache table (as in db/init.sql)."""
+    create_data_version(cur)
+    cur.execute("""
+        CREATE UNLOGGED TABLE IF NOT EXISTS page_cache (
+            key TEXT PRIMARY KEY,
+            version BIGINT NOT NULL,
+            etag TEXT NOT NULL,
+            last_modified TIMESTAMPTZ NOT NULL,
+            body BYTEA NOT NULL
+        )
+    """)
+
+
+def migrate(conn, batch_size=5000):
+    """Run every migration step, committing the backfill batches on their own."""
+    with conn.transaction(), conn.cursor() as cur:
+        add_typed_columns(cur)
+        convert_date_added(cur)
+        print(f"Moved {add_result_key(cur)} duplicate results to applicants_duplicates.")
+    backfill_typed_columns(conn, batch_size)
+    with conn.transaction(), conn.cursor() as cur:
+        # Partition once the years are parsed, so rows land in their year directly.
+        partition_applicants(cur)
+        add_id_key(cur)
+        replace_indexes(cur)
+        add_comment_search(cur)
+        recreate_rollup(cur)
+        add_name_dictionary(cur)
+        add_cache_tables(cur)
+        create_task_table(cur)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Migrate applicants to the typed term and decision columns.")
+    parser.add_argument("--batch-size", type=int, default=5000,
+                        help="rows parsed and committed per backfill batch")
+    args = parser.parse_args()
+
+    with get_db_connection() as connection:
+        migrate(connection, args.batch_size)
+    print("Migration complete.")
@@ -0,0 +1,152 @@
+"""
+This module maintains `applicant_names`, the dictionary of distinct standardized
+university and program names that the web app's autocomplete searches (see
+web/name_search.py).
+
+The table holds one row per (kind, name), kind being "university" or "program",
+with the number of applicants carrying that name, so popular names can be offered
+first. Like the rollup (etl.aggregates), it is kept exact by ingest: the rows an
+upsert is about to change are retracted first and every inserted or updated row
+is folded in afterwards, in the same transaction. Names no applicant carries any
+more are dropped. The dictionary has a few thousand rows where `applicants` has
+hundreds of thousands, so the trigram index over it stays small and a lookup
+never touches the applicants.
+
+Each name also has a generated `acronym`, the initials of its words without
+"of", "the", "and", "at", "in", "for" and "de" ("Johns Hopkins University" ->
+"JHU"), since trigram similarity cannot match an abbreviation to its expansion.
+The trigram index needs the pg_trgm extension, which db/init.sql creates when the
+server ships it.
+
+Functions:
+    create_name_table(cur) -> None
+        Create the `applicant_names` table and its indexes if they are missing.
+    apply_delta(cur, ids) -> None
+        Add the names of freshly inserted or updated applicant rows.
+    retract(cur, ids) -> None
+        Take the names of applicant rows about to change out of the dictionary.
+    rebuild(cur) -> None
+        Recompute the dictionary from the `applicants` table.
+
+Usage:
+    $ python -m etl.names  # rebuild
+"""
+
+import psycopg
+from etl.update_database import get_db_connection  # pylint: disable=E0401
+
+NAMES_TABLE = "applicant_names"
+
+# Dictionary kind -> applicants column it is drawn from.
+KINDS = {
+    "university": "llm_generated_university",
+    "program": "llm_generated_program",
+}
+
+# Names of the applicants selected by {where}, counted per kind.
+NAME_COUNTS = """
+    SELECT names.kind, names.name, COUNT(*) AS n
+    FROM applicants
+    CROSS JOIN LATERAL (VALUES {kinds}) AS names(kind, name)
+    {where}
+    GROUP BY 1, 2
+"""
+
+
+def _name_counts(where):
+    """NAME_COUNTS over every kind, for the rows selected by `where` (a WHERE clause or empty)."""
+    kinds = psycopg.sql.SQL(", ").join(
+        psycopg.sql.SQL("({kind}, {column})").format(kind=psycopg.sql.Literal(kind),
+                                                     column=psycopg.sql.Identifier(column))
+        for kind, column in KINDS.items())
+    named = psycopg.sql.SQL("names.name IS NOT NULL AND names.name <> ''")
+    where = (psycopg.sql.SQL("{} AND {}").format(where, named) if where
+             else psycopg.sql.SQL("WHERE {}").format(named))
+    return psycopg.sql.SQL(NAME_COUNTS).format(kinds=kinds, where=where)
+
+
+def create_name_table(cur):
+    """
+    Create the `applicant_names` table and its acronym index (as in db/init.sql)
+    if they are missing, and the pg_trgm extension and trigram index when the
+    server ships pg_trgm.
+    """
+    cur.execute(r"""
+        CREATE TABLE IF NOT EXISTS applicant_names (
+            kind TEXT NOT NULL CHECK (kind IN ('university', 'program')),
+            name TEXT NOT NULL,
+            n BIGINT NOT NULL DEFAULT 0,
+            acronym TEXT GENERATED ALWAYS AS (upper(regexp_replace(regexp_replace(
+                regexp_replace(name, '\m(of|the|and|at|in|for|de)\M', '', 'gi'),
+                '(\w)\w*', '\1', 'g'), '\W', '', 'g'))) STORED,
+            PRIMARY KEY (kind, name)
+        )
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS applicant_names_acronym_idx
+            ON applicant_names (kind, acronym text_pattern_ops)
+    """)
+    cur.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    if cur.fetchone():
+        cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS applicant_names_name_trgm_idx
+                ON applicant_names USING gin (name gin_trgm_ops)
+        """)
+
+
+def _fold(cur, ids, sign):
+    """Add (sign 1) or subtract (sign -1) the names of the given applicant rows."""
+    cur.execute(psycopg.sql.SQL("""
+        INSERT INTO {table} (kind, name, n)
+        SELECT kind, name, {sign} * n FROM ({counts}) AS delta
+        ON CONFLICT (kind, name) DO UPDATE SET n = {table}.n + EXCLUDED.n
+    """).format(table=psycopg.sql.Identifier(NAMES_TABLE),
+                sign=psycopg.sql.Literal(sign),
+                counts=_name_counts(psycopg.sql.SQL("WHERE id = ANY(%s)"))),
+                (list(ids), ))
+
+
+def apply_delta(cur, ids):
+    """
+    Add the names of the applicant rows with the given ids to the dictionary.
+
+    Must be called with the cursor of the transaction that wrote the rows, so the
+    dictionary and the `applicants` table commit (or roll back) together.
+    """
+    if not ids:
+        return
+    _fold(cur, ids, 1)
+
+
+def retract(cur, ids):
+    """
+    Take the names of the applicant rows with the given ids out of the dictionary
+    before they are updated or deleted, dropping names left with no applicants.
+    Like apply_delta, it must run in the transaction that changes the rows.
+    """
+    if not ids:
+        return
+    _fold(cur, ids, -1)
+    cur.execute(psycopg.sql.SQL("DELETE FROM {table} WHERE n <= 0").format(
+        table=psycopg.sql.Identifier(NAMES_TABLE)))
+
+
+def rebuild(cur):
+    """Recompute the dictionary from scratch out of the `applicants` table."""
+    table = psycopg.sql.Identifier(NAMES_TABLE)
+    cur.execute(psycopg.sql.SQL("TRUNCATE {table}").format(table=table))
+    cur.execute(psycopg.sql.SQL("INSERT INTO {table} (kind, name, n) {counts}").format(
+        table=table, counts=_name_counts(None)))
+
+
+if __name__ == "__main__":
+    with get_db_connection() as connection:
+        with connection.transaction(), connection.cursor() as cursor:
+            create_name_table(cursor)
+            rebuild(cursor)
+            cursor.execute(psycopg.sql.SQL("SELECT kind, COUNT(*) FROM {} GROUP BY 1").format(
+                psycopg.sql.Identifier(NAMES_TABLE)))
+            counts = dict(cursor.fetchall())
+    print(f"Rebuilt the name dictionary: {counts.get('university', 0)} universities, "
+          f"{counts.get('program', 0)} programs.")
@@ -0,0 +1,199 @@
+"""
+This module manages the term-year partitions of the `applicants` table.
+
+`applicants` is range-partitioned by `term_year` (see db/init.sql), with one
+partition per year named `applicants_y<year>` and a default partition,
+`applicants_default`, that catches unparsed terms and years without a partition.
+PostgreSQL routes inserted rows itself; this module only makes sure a year has
+its own partition before rows for it are inserted, and converts a table created
+before partitioning was introduced.
+
+Functions:
+    partition_name(year) -> str
+        Name of the partition that holds `year`.
+    ensure_partitions(cur, years) -> list
+        Create partitions for any of `years` that lack one; returns the names created.
+    create_result_keys(cur) -> None
+        Create the unique indexes a scraped result is upserted on.
+    partition_applicants(cur) -> bool
+        Rebuild an unpartitioned `applicants` table as a partitioned one
+        (run as part of etl.migrations).
+"""
+
+import psycopg
+
+DEFAULT_PARTITION = "applicants_default"
+
+# Columns of `applicants`, in table order (shared with db/init.sql). The generated
+# comments_tsv column follows them; it is computed, never copied.
+COLUMNS = [
+    "id", "program", "comments", "date_added", "url", "status", "term",
+    "us_or_international", "gpa", "gre", "gre_v", "gre_aw", "degree",
+    "llm_generated_program", "llm_generated_university", "term_season", "term_year",
+    "decision", "decision_date", "row_hash"
+]
+
+
+def partition_name(year):
+    """Name of the partition holding applicants whose term falls in `year`."""
+    return f"applicants_y{int(year)}"
+
+
+def _partitions(cur):
+    """Names of the partitions currently attached to `applicants`."""
+    cur.execute("""
+        SELECT child.relname FROM pg_inherits
+        JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = to_regclass('applicants')
+    """)
+    return {row[0] for row in cur.fetchall()}
+
+
+def ensure_partitions(cur, years):
+    """
+    Give each of `years` (None entries are ignored) its own partition.
+
+    Rows for a year without a partition are stored in the default partition, and
+    PostgreSQL refuses to add a partition while the default holds matching rows.
+    A new year is therefore created as a standalone table, its rows are moved out
+    of the default partition, and the table is then attached. The parent table is
+    locked first so concurrent loaders cannot create the same partition twice.
+    Returns the names of the partitions created.
+    """
+    wanted = sorted({int(year) for year in years if year is not None})
+    if not wanted:
+        return []
+
+    missing = [year for year in wanted if partition_name(year) not in _partitions(cur)]
+    if not missing:
+        return []
+
+    cur.execute("LOCK TABLE applicants IN SHARE ROW EXCLUSIVE MODE")
+    existing = _partitions(cur)
+    created = []
+    for year in missing:
+        name = partition_name(year)
+        if name in existing:
+            continue
+        partition = psycopg.sql.Identifier(name)
+        cur.execute(psycopg.sql.SQL("""
+            CREATE TABLE {partition}
+                (LIKE applicants INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+                 INCLUDING GENERATED)
+        """).format(partition=partition))
+        cur.execute(psycopg.sql.SQL("""
+            WITH moved AS (
+                DELETE FROM {default} WHERE term_year = %s RETURNING {columns}
+            )
+            INSERT INTO {partition} ({columns}) SELECT {columns} FROM moved
+        """).format(default=psycopg.sql.Identifier(DEFAULT_PARTITION),
+                    partition=partition,
+                    columns=psycopg.sql.SQL(", ").join(
+                        psycopg.sql.Identifier(col) for col in COLUMNS)),
+                    (year, ))
+        cur.execute(psycopg.sql.SQL("""
+            ALTER TABLE applicants ATTACH PARTITION {partition}
+                FOR VALUES FROM ({start}) TO ({end})
+        """).format(partition=partition,
+                    start=psycopg.sql.Literal(year),
+                    end=psycopg.sql.Literal(year + 1)))
+        created.append(name)
+    return created
+
+
+def create_result_keys(cur):
+    """
+    Create the unique indexes a scraped result is upserted on (as in db/init.sql),
+    if they are missing. A result with a url is keyed by (url, term_year). The
+    scraper stores a result without a link with a NULL url; those are keyed by
+    (row_hash, term_year) instead, so two different url-less results are never
+    taken for one another while the same one scraped twice is stored once. Both
+    keys include term_year, with NULLs equal, because a unique index on the
+    partitioned table must include the partition key.
+    """
+    cur.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS applicants_url_term_year_key
+            ON applicants (url, term_year) NULLS NOT DISTINCT
+            WHERE url IS NOT NULL
+    """)
+    cur.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS applicants_unlinked_key
+            ON applicants (row_hash, term_year) NULLS NOT DISTINCT
+            WHERE url IS NULL AND row_hash IS NOT NULL
+    """)
+
+
+def partition_applicants(cur):
+    """
+    Convert an unpartitioned `applicants` table into the partitioned layout.
+
+    The old table is renamed aside, a partitioned table with the same columns is
+    created, every year found in the data gets a partition, the rows are copied
+    across (keeping their ids) and the old table is dropped. Only the (id,
+    term_year) key and the result keys (create_result_keys) are created here, so
+    the old table must already be free of duplicate results (see
+    etl.migrations.add_result_key); the caller builds the rest of the index set
+    afterwards.
+    Returns False when the table is already partitioned (or does not exist).
+    """
+    cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('applicants')")
+    row = cur.fetchone()
+    if row is None or row[0] == "p":
+        return False
+
+    # Free up the index and constraint names the partitioned table will reuse.
+    cur.execute("ALTER TABLE applicants RENAME TO applicants_unpartitioned")
+    cur.execute("""
+        SELECT indexname FROM pg_indexes
+        WHERE schemaname = current_schema() AND tablename = 'applicants_unpartitioned'
+    """)
+    for (index, ) in cur.fetchall():
+        cur.execute(psycopg.sql.SQL("ALTER INDEX {} RENAME TO {}").format(
+            psycopg.sql.Identifier(index), psycopg.sql.Identifier(f"{index}_old")))
+
+    cur.execute("""
+        CREATE TABLE applicants (
+            id SERIAL,
+            program VARCHAR(255) NOT NULL,
+            comments TEXT,
+            date_added DATE DEFAULT CURRENT_DATE,
+            url VARCHAR(255),
+            status VARCHAR(255),
+            term VARCHAR(255),
+            us_or_international VARCHAR(20),
+            gpa FLOAT CHECK (gpa >= 0 AND gpa <= 4),
+            gre FLOAT CHECK (gre >= 0),
+            gre_v FLOAT CHECK (gre_v >= 0),
+            gre_aw FLOAT CHECK (gre_aw >= 0),
+            degree VARCHAR(100),
+            llm_generated_program VARCHAR(255),
+            llm_generated_university VARCHAR(255),
+            term_season term_season,
+            term_year SMALLINT,
+            decision decision_kind,
+            decision_date DATE,
+            row_hash BYTEA,
+            comments_tsv TSVECTOR GENERATED ALWAYS AS
+                (to_tsvector('english', coalesce(comments, ''))) STORED,
+            UNIQUE NULLS NOT DISTINCT (id, term_year)
+        ) PARTITION BY RANGE (term_year)
+    """)
+    create_result_keys(cur)
+    cur.execute(psycopg.sql.SQL("CREATE TABLE {} PARTITION OF applicants DEFAULT").format(
+        psycopg.sql.Identifier(DEFAULT_PARTITION)))
+    cur.execute("SELECT DISTINCT term_year FROM applicants_unpartitioned")
+    ensure_partitions(cur, [row[0] for row in cur.fetchall()])
+
+    columns = psycopg.sql.SQL(", ").join(psycopg.sql.Identifier(col) for col in COLUMNS)
+    cur.execute(psycopg.sql.SQL("""
+        INSERT INTO applicants ({columns})
+        SELECT {columns} FROM applicants_unpartitioned
+    """).format(columns=columns))
+    cur.execute("""
+        SELECT setval(pg_get_serial_sequence('applicants', 'id'),
+                      COALESCE(MAX(id), 0) + 1, false)
+        FROM applicants
+    """)
+    cur.execute("DROP TABLE applicants_unpartitioned")
+    return True
+
@@ -4,14 +4,22 @@ and defines a set of queries that return insights into applicant data, such as
 application volume, acceptance rates, GPA statistics, and other trends.
 
 The `run_queries()` function is used to extract a dictionary of human-readable
-questions and corresponding answers based on current data.
+questions and corresponding answers based on current data. Answers are read from
+the running aggregates in `applicant_rollup` (kept current by the worker on every
+ingest) and, for the university and program questions, from index scans of
+`applicants`, or recomputed from the `applicants` table with ``source="applicants"``.
+``source="arrow"`` answers from a memory-mapped Arrow snapshot of `applicants`
+instead, without a database (see `arrow_snapshot`).
 
 Environment Variables:
     DATABASE_URL (str): PostgreSQL connection string used to connect to the database.
+        Connections are drawn from the shared pool in `etl.db_pool`.
 
 Functions:
-    run_queries() -> dict
+    run_queries(source="rollup", conn=None, path=None) -> dict
         Executes predefined SQL queries and returns answers with associated questions.
+    format_results(stats) -> dict
+        Formats raw analysis values as questions and answers (shared with `async_queries`).
 
 Usage:
     >>> from query_data import run_queries
@@ -20,367 +28,377 @@ Usage:
 
 Example CLI Execution:
     $ python query_data.py
+    $ python query_data.py --export-arrow applicants.arrow   # snapshot applicants
+    $ python query_data.py --source arrow --arrow applicants.arrow
 """
 
-import os
+import argparse
+from contextlib import nullcontext
 import psycopg
+from etl.db_pool import connection  # pylint: disable=E0401
+
+
+# Default Arrow snapshot of applicants for source="arrow" (see arrow_snapshot).
+ARROW_PATH = "applicants.arrow"
 
 
 def get_db_connection():
-    """Create and return a database connection."""
-    return psycopg.connect(os.environ["DATABASE_URL"])
-
-
-def run_queries():  # pylint: disable=R0915, R0914
-    """Defines SQL queries and interrogates database, storing answers in a dictionary"""
-    conn = get_db_connection()
-    try:
-        # Questions the queries seek to answer in longform strings
-        q_1 = "How many entries do you have in your database who have applied for Fall 2025?"
-        q_2 = ("What percentage of entries are from international students "
-               "(not American or Other) (to two decimal places)?")
-        q_3 = "What is the average GPA, GRE, GRE V, GRE AW of applicants who provide these metrics?"
-        q_4 = "What is their average GPA of American students in Fall 2025?"
-        q_5 = "What percent of entries for Fall 2025 are Acceptances (to two decimal places)?"
-        q_6 = "What is the average GPA of applicants who applied for Fall 2025 who are Acceptances?"
-        q_7 = (
-            "How many entries are from applicants who applied to JHU for a masters degrees "
-            "in Computer Science?")
-        q_8 = (
-            "How many entries from 2025 are acceptances from applicants who applied to "
-            "Georgetown University for a PhD in Computer Science?")
-        q_9 = "Which school had the most applicants for Fall 2025?"
-        q_10 = (
-            "Did the University of Virginia or Virginia Tech have a higher average GPA "
-            "for applicants accepted Fall 2025?")
-
-        # Create a cursor object.
-        with conn.cursor() as cur:  # pylint: disable=E1101
-
-            # Dictionary to hold query results with key being question
-            # and value being a tuple of (longform question, answer).
-            query_results = {}
-
-            # Determine total number of rows in db for limit setting
-            count_query = psycopg.sql.SQL(
-                "SELECT COUNT(*) FROM {table}").format(
-                    table=psycopg.sql.Identifier("applicants"))
-            cur.execute(count_query)
-            row = cur.fetchone()
-            total_rows = row[0] if row else 0
-            row_limit = total_rows + 100
-
-            # 1. Query to count entries with "Fall 2025" in the term field.
-            select_query = psycopg.sql.SQL("""
-                SELECT COUNT(*) FROM {table} WHERE {column} = {value} LIMIT {limit}
-            """).format(table=psycopg.sql.Identifier("applicants"),
-                        column=psycopg.sql.Identifier("term"),
-                        value=psycopg.sql.Literal("Fall 2025"),
-                        limit=psycopg.sql.Literal(row_limit))
-
-            cur.execute(select_query)
-            result = cur.fetchone()
-            count_f_2025 = result[0] if result else 0
-            query_results["1"] = (q_1, count_f_2025)
-
-            # 2. Query to find percentage international students.
-            percentage_query = psycopg.sql.SQL("""
-                SELECT
-                    (COUNT(*) FILTER (WHERE {column} = {value}) * 100.0 / COUNT(*)) AS percentage_international
-                FROM {table}
-                LIMIT {limit}
-            """).format(table=psycopg.sql.Identifier("applicants"),
-                        column=psycopg.sql.Identifier("us_or_international"),
-                        value=psycopg.sql.Literal("International"),
-                        limit=psycopg.sql.Literal(row_limit))
-
-            cur.execute(percentage_query)
-            result = cur.fetchone()
-            percentage_international = result[0] if result else None
-            query_results["2"] = (q_2, round(percentage_international, 2)
-                                  if percentage_international else None)
-
-            # 3a. Query to find average GPA score.
-            avg_gpa_query = psycopg.sql.SQL("""
-                SELECT AVG({column})
-                FROM {table}
-                WHERE {column} < {threshold}
-                LIMIT {limit}
-            """).format(column=psycopg.sql.Identifier("gpa"),
-                        table=psycopg.sql.Identifier("applicants"),
-                        threshold=psycopg.sql.Literal(5),
-                        limit=psycopg.sql.Literal(row_limit))
-
-            cur.execute(avg_gpa_query)
-            result = cur.fetchone()
-            average_gpa = result[0] if result else None
-
-            # 3b. Query to find average GRE score.
-            avg_gre_query = psycopg.sql.SQL("""
-                SELECT AVG({column}) FROM (
-                    SELECT {column}
-                    FROM {table}
-                    WHERE {column} < {threshold}
-                    LIMIT {limit}
-                ) AS limited_subquery
-            """).format(column=psycopg.sql.Identifier("gre"),
-                        table=psycopg.sql.Identifier("applicants"),
-                        threshold=psycopg.sql.Literal(170),
-                        limit=psycopg.sql.Literal(row_limit))
-
-            cur.execute(avg_gre_query)
-            result = cur.fetchone()
-            average_gre = result[0] if result else None
-
-            # 3c. Query to find GRE V score.
-            avg_gre_v_query = psycopg.sql.SQL("""
-                SELECT AVG({column}) FROM (
-                    SELECT {column}
-                    FROM {table}
-                    WHERE {column} < {threshold}
-                    LIMIT {limit}
-                ) AS limited_subquery
-            """).format(column=psycopg.sql.Identifier("gre_v"),
-                        table=psycopg.sql.Identifier("applicants"),
-                        threshold=psycopg.sql.Literal(170),
-                        limit=psycopg.sql.Literal(row_limit))
-
-            cur.execute(avg_gre_v_query)
-            result = cur.fetchone()
-            average_gre_v = result[0] if result else None
-
-            # 3d. Query to find GRE AW score.
-            avg_gre_aw_query = psycopg.sql.SQL("""
-                SELECT AVG({column}) FROM (
-                    SELECT {column}
-                    FROM {table}
-                    WHERE {column} < {threshold}
-                    LIMIT {limit}
-                ) AS limited_subquery
-            """).format(column=psycopg.sql.Identifier("gre_aw"),
-                        table=psycopg.sql.Identifier("applicants"),
-                        threshold=psycopg.sql.Literal(6),
-                        limit=psycopg.sql.Literal(row_limit))
-
-            cur.execute(avg_gre_aw_query)
-            result = cur.fetchone()
-            average_gre_aw = result[0] if result else None
-
-            query_results["3"] = (q_3, (
-                f"Average GPA: {round(average_gpa, 2) if average_gpa else 'N/A'}, "
-                f"Average GRE: {round(average_gre, 2) if average_gre else 'N/A'}, "
-                f"Average GRE V: {round(average_gre_v, 2) if average_gre_v else 'N/A'}, "
-                f"Average GRE AW: {round(average_gre_aw, 2) if average_gre_aw else 'N/A'}"
-            ))
-
-            # 4. Query to find average GPA of American applicants.
-            avg_gpa_american_query = psycopg.sql.SQL("""
-                SELECT AVG({gpa_col}) AS average_gpa_american FROM (
-                    SELECT {gpa_col}
-                    FROM {table}
-                    WHERE {country_col} = {country_val}
-                    LIMIT {limit}
-                ) AS limited_subquery
-            """).format(
-                gpa_col=psycopg.sql.Identifier("gpa"),
-                table=psycopg.sql.Identifier("applicants"),
+    """Check a connection out of the shared pool (use as a context manager)."""
+    return connection()
+
+
+def applicant_statements():
+    """
+    Build the analysis statements that scan the applicants table.
+    Returns a dict of statement name -> composed SQL, in question order; each
+    statement returns a single row, whose values are named in STATEMENT_VALUES
+    when it answers more than one question.
+    """
+    table = psycopg.sql.Identifier("applicants")
+    # Fall 2025 and acceptance, as comparisons on the parsed typed columns.
+    fall_2025 = psycopg.sql.SQL("{season_col} = {season} AND {year_col} = {year}").format(
+        season_col=psycopg.sql.Identifier("term_season"),
+        season=psycopg.sql.Literal("Fall"),
+        year_col=psycopg.sql.Identifier("term_year"),
+        year=psycopg.sql.Literal(2025))
+    accepted = psycopg.sql.SQL("{decision_col} = {decision}").format(
+        decision_col=psycopg.sql.Identifier("decision"),
+        decision=psycopg.sql.Literal("Accepted"))
+
+    statements = {}
+
+    # 1. Query to count entries for the Fall 2025 term.
+    statements["count_f_2025"] = psycopg.sql.SQL("""
+        SELECT COUNT(*) FROM {table} WHERE {fall_2025}
+    """).format(table=table, fall_2025=fall_2025)
+
+    # 2-4. Questions over every applicant, answered in a single scan: percentage
+    # international, average GPA / GRE / GRE V / GRE AW, average GPA of Americans.
+    statements["applicant_totals"] = psycopg.sql.SQL("""
+        SELECT
+            COUNT(*) FILTER (WHERE {country_col} = {international}) * 100.0
+                / NULLIF(COUNT(*), 0) AS percentage_international,
+            AVG({gpa_col}) FILTER (WHERE {gpa_col} < {gpa_threshold}) AS average_gpa,
+            AVG({gre_col}) FILTER (WHERE {gre_col} < {gre_threshold}) AS average_gre,
+            AVG({gre_v_col}) FILTER (WHERE {gre_v_col} < {gre_threshold}) AS average_gre_v,
+            AVG({gre_aw_col}) FILTER (WHERE {gre_aw_col} < {gre_aw_threshold}) AS average_gre_aw,
+            AVG({gpa_col}) FILTER (WHERE {country_col} = {american}) AS average_gpa_american
+        FROM {table}
+    """).format(table=table,
                 country_col=psycopg.sql.Identifier("us_or_international"),
-                country_val=psycopg.sql.Literal("American"),
-                limit=psycopg.sql.Literal(row_limit))
-
-            cur.execute(avg_gpa_american_query)
-            result = cur.fetchone()
-            average_gpa_american = result[0] if result else None
-            query_results["4"] = (q_4, round(average_gpa_american, 2)
-                                  if average_gpa_american else None)
-
-            # 5. Query to find percent Accepted for Fall 2025.
-            percentage_accepted_query = psycopg.sql.SQL("""
-                SELECT
-                    CASE 
-                        WHEN COUNT(*) = 0 THEN NULL
-                        ELSE (COUNT(*) FILTER (WHERE {status_col} LIKE {status_pattern}) * 100.0 / COUNT(*))
-                    END AS percentage_accepted
-                FROM (
-                    SELECT *
-                    FROM {table}
-                    WHERE {term_col} = {term_val}
-                    LIMIT {limit}
-                ) AS limited_subquery
-            """).format(status_col=psycopg.sql.Identifier("status"),
-                        status_pattern=psycopg.sql.Literal("Accepted%"),
-                        table=psycopg.sql.Identifier("applicants"),
-                        term_col=psycopg.sql.Identifier("term"),
-                        term_val=psycopg.sql.Literal("Fall 2025"),
-                        limit=psycopg.sql.Literal(row_limit))
-
-            cur.execute(percentage_accepted_query)
-            result = cur.fetchone()
-            percentage_accepted_f25 = result[0] if result else None
-            query_results["5"] = (q_5, round(percentage_accepted_f25, 2)
-                                  if percentage_accepted_f25 else None)
-
-            # 6. Query to find average GPA for Fall 2025 Accepted.
-            avg_gpa_accepted_f25_query = psycopg.sql.SQL("""
-                SELECT AVG({gpa_col}) AS average_gpa_accepted_f25 FROM (
-                    SELECT {gpa_col}
-                    FROM {table}
-                    WHERE {term_col} = {term_val}
-                      AND {gpa_col} < {gpa_threshold}
-                      AND {status_col} LIKE {status_pattern}
-                    LIMIT {limit}
-                ) AS limited_subquery
-            """).format(gpa_col=psycopg.sql.Identifier("gpa"),
-                        table=psycopg.sql.Identifier("applicants"),
-                        term_col=psycopg.sql.Identifier("term"),
-                        term_val=psycopg.sql.Literal("Fall 2025"),
-                        gpa_threshold=psycopg.sql.Literal(5),
-                        status_col=psycopg.sql.Identifier("status"),
-                        status_pattern=psycopg.sql.Literal("Accepted%"),
-                        limit=psycopg.sql.Literal(row_limit))
-
-            cur.execute(avg_gpa_accepted_f25_query)
-            result = cur.fetchone()
-            average_gpa_accepted_f25 = result[0] if result else None
-            query_results["6"] = (q_6, round(average_gpa_accepted_f25, 2)
-                                  if average_gpa_accepted_f25 else None)
-
-            # 7. Query to count applicants to JHU for Masters in Computer Science.
-            jhu_cs_masters_count_query = psycopg.sql.SQL("""
-                SELECT COUNT(*) AS jhu_cs_masters_count FROM (
-                    SELECT *
-                    FROM {table}
-                    WHERE {university_col} = {university_val}
-                      AND {degree_col} = {degree_val}
-                      AND {program_col} = {program_val}
-                    LIMIT {limit}
-                ) AS limited_subquery
-            """).format(
-                table=psycopg.sql.Identifier("applicants"),
-                university_col=psycopg.sql.Identifier(
-                    "llm_generated_university"),
-                university_val=psycopg.sql.Literal("Johns Hopkins University"),
-                degree_col=psycopg.sql.Identifier("degree"),
-                degree_val=psycopg.sql.Literal("Masters"),
-                program_col=psycopg.sql.Identifier("llm_generated_program"),
-                program_val=psycopg.sql.Literal("Computer Science"),
-                limit=psycopg.sql.Literal(row_limit))
-
-            cur.execute(jhu_cs_masters_count_query)
-            result = cur.fetchone()
-            count_jhu_cs_masters = result[0] if result else 0
-            query_results["7"] = (q_7, count_jhu_cs_masters)
-
-            # 8. Query to count applicants to Georgetown for PhD in CS who were accepted.
-            hoya_cs_phd_2025_query = psycopg.sql.SQL("""
-                SELECT COUNT(*) AS hoya_cs_phd_2025 FROM (
-                    SELECT *
-                    FROM {table}
-                    WHERE {university_col} = {university_val}
-                      AND {degree_col} = {degree_val}
-                      AND {program_col} = {program_val}
-                      AND {status_col} LIKE {status_pattern}
-                    LIMIT {limit}
-                ) AS limited_subquery
-            """).format(
-                table=psycopg.sql.Identifier("applicants"),
-                university_col=psycopg.sql.Identifier(
-                    "llm_generated_university"),
-                university_val=psycopg.sql.Literal("Georgetown University"),
-                degree_col=psycopg.sql.Identifier("degree"),
-                degree_val=psycopg.sql.Literal("PhD"),
-                program_col=psycopg.sql.Identifier("llm_generated_program"),
-                program_val=psycopg.sql.Literal("Computer Science"),
-                status_col=psycopg.sql.Identifier("status"),
-                status_pattern=psycopg.sql.Literal("Accepted%"),
-                limit=psycopg.sql.Literal(row_limit))
-
-            cur.execute(hoya_cs_phd_2025_query)
-            result = cur.fetchone()
-            count_hoya_cs_phd_2025 = result[0] if result else 0
-            query_results["8"] = (q_8, count_hoya_cs_phd_2025)
-
-            # 9. Query to find most common university for Fall 2025 applicants.
-            top_university_query = psycopg.sql.SQL("""
-                SELECT {university_col}, COUNT(*) AS count FROM {table}
-                WHERE {term_col} = {term_val}
-                GROUP BY {university_col}
-                ORDER BY count DESC
-                LIMIT {limit};
-            """).format(university_col=psycopg.sql.Identifier(
-                "llm_generated_university"),
-                        table=psycopg.sql.Identifier("applicants"),
-                        term_col=psycopg.sql.Identifier("term"),
-                        term_val=psycopg.sql.Literal("Fall 2025"),
-                        limit=psycopg.sql.Literal(row_limit))
-
-            cur.execute(top_university_query)
-            result = cur.fetchone()
-            popular_u_f25 = result[0] if result else 'No data'
-            query_results["9"] = (q_9, popular_u_f25)
-
-            # 10. Query to compare UVA and VT accepted GPAs for Fall 2025.
-            avg_gpa_uva_vt_query = psycopg.sql.SQL("""
-                SELECT
-                    AVG({gpa_col}) FILTER (
-                        WHERE {university_col} = {uva_val} AND {gpa_col} < {gpa_threshold}
-                    ) AS uva_gpa,
-                    AVG({gpa_col}) FILTER (
-                        WHERE {university_col} = {vt_val} AND {gpa_col} < {gpa_threshold}
-                    ) AS vt_gpa
-                FROM (
-                    SELECT *
-                    FROM {table}
-                    WHERE {term_col} = {term_val}
-                      AND {status_col} LIKE {status_pattern}
-                    LIMIT {limit}
-                ) AS limited_subquery
-            """).format(gpa_col=psycopg.sql.Identifier("gpa"),
-                        university_col=psycopg.sql.Identifier(
-                            "llm_generated_university"),
-                        uva_val=psycopg.sql.Literal("University of Virginia"),
-                        vt_val=psycopg.sql.Literal("Virginia Tech"),
-                        gpa_threshold=psycopg.sql.Literal(5),
-                        table=psycopg.sql.Identifier("applicants"),
-                        term_col=psycopg.sql.Identifier("term"),
-                        term_val=psycopg.sql.Literal("Fall 2025"),
-                        status_col=psycopg.sql.Identifier("status"),
-                        status_pattern=psycopg.sql.Literal("Accepted%"),
-                        limit=psycopg.sql.Literal(row_limit))
-
-            cur.execute(avg_gpa_uva_vt_query)
-            result = cur.fetchone()
-            uva_gpa, vt_gpa = result if result else (None, None)
-            if uva_gpa is not None and vt_gpa is not None:
-                if uva_gpa > vt_gpa:
-                    statement = (
-                        f"The University of Virginia (gpa = {round(uva_gpa, 2)}) "
-                        f"had a higher average GPA than Virginia Tech "
-                        f"(gpa = {round(vt_gpa, 2)}) for Fall 2025 Accepted")
-                else:
-                    statement = (
-                        f"Virginia Tech (gpa = {round(vt_gpa, 2)}"
-                        f"had a higher average GPA than the University of Virginia "
-                        f"(gpa = {round(uva_gpa, 2)}) for Fall 2025 Accepted")
-            elif uva_gpa is not None:
-                statement = (
-                    f"Only University of Virginia has data "
-                    f"(gpa = {round(uva_gpa, 2)}) for Fall 2025 Accepted")
-            elif vt_gpa is not None:
-                statement = (
-                    f"Only Virginia Tech has data "
-                    f"(gpa = {round(vt_gpa, 2)}) for Fall 2025 Accepted")
-            else:
-                statement = "No GPA data available for either university for Fall 2025 Accepted"
-            query_results["10"] = (q_10, statement)
-
-            return query_results
-    finally:
-        conn.close()  # pylint: disable=E1101
+                international=psycopg.sql.Literal("International"),
+                american=psycopg.sql.Literal("American"),
+                gpa_col=psycopg.sql.Identifier("gpa"),
+                gre_col=psycopg.sql.Identifier("gre"),
+                gre_v_col=psycopg.sql.Identifier("gre_v"),
+                gre_aw_col=psycopg.sql.Identifier("gre_aw"),
+                gpa_threshold=psycopg.sql.Literal(5),
+                gre_threshold=psycopg.sql.Literal(170),
+                gre_aw_threshold=psycopg.sql.Literal(6))
+
+    # 5. Query to find percent Accepted for Fall 2025.
+    statements["percentage_accepted_f25"] = psycopg.sql.SQL("""
+        SELECT COUNT(*) FILTER (WHERE {accepted}) * 100.0 / NULLIF(COUNT(*), 0)
+        FROM {table}
+        WHERE {fall_2025}
+    """).format(accepted=accepted, table=table, fall_2025=fall_2025)
+
+    # 6. Query to find average GPA for Fall 2025 Accepted.
+    statements["average_gpa_accepted_f25"] = psycopg.sql.SQL("""
+        SELECT AVG({gpa_col})
+        FROM {table}
+        WHERE {fall_2025}
+          AND {gpa_col} < {gpa_threshold}
+          AND {accepted}
+    """).format(gpa_col=psycopg.sql.Identifier("gpa"),
+                table=table,
+                fall_2025=fall_2025,
+                gpa_threshold=psycopg.sql.Literal(5),
+                accepted=accepted)
+
+    # 7. Query to count applicants to JHU for Masters in Computer Science.
+    statements["count_jhu_cs_masters"] = psycopg.sql.SQL("""
+        SELECT COUNT(*)
+        FROM {table}
+        WHERE {university_col} = {university_val}
+          AND {degree_col} = {degree_val}
+          AND {program_col} = {program_val}
+    """).format(
+        table=table,
+        university_col=psycopg.sql.Identifier("llm_generated_university"),
+        university_val=psycopg.sql.Literal("Johns Hopkins University"),
+        degree_col=psycopg.sql.Identifier("degree"),
+        degree_val=psycopg.sql.Literal("Masters"),
+        program_col=psycopg.sql.Identifier("llm_generated_program"),
+        program_val=psycopg.sql.Literal("Computer Science"))
+
+    # 8. Query to count applicants to Georgetown for PhD in CS who were accepted.
+    statements["count_hoya_cs_phd_2025"] = psycopg.sql.SQL("""
+        SELECT COUNT(*)
+        FROM {table}
+        WHERE {university_col} = {university_val}
+          AND {degree_col} = {degree_val}
+          AND {program_col} = {program_val}
+          AND {accepted}
+    """).format(
+        table=table,
+        university_col=psycopg.sql.Identifier("llm_generated_university"),
+        university_val=psycopg.sql.Literal("Georgetown University"),
+        degree_col=psycopg.sql.Identifier("degree"),
+        degree_val=psycopg.sql.Literal("PhD"),
+        program_col=psycopg.sql.Identifier("llm_generated_program"),
+        program_val=psycopg.sql.Literal("Computer Science"),
+        accepted=accepted)
+
+    # 9. Query to find most common university for Fall 2025 applicants.
+    statements["popular_u_f25"] = psycopg.sql.SQL("""
+        SELECT {university_col}, COUNT(*) AS count FROM {table}
+        WHERE {fall_2025}
+        GROUP BY {university_col}
+        ORDER BY count DESC
+        LIMIT 1
+    """).format(university_col=psycopg.sql.Identifier("llm_generated_university"),
+                table=table,
+                fall_2025=fall_2025)
+
+    # 10. Query to compare UVA and VT accepted GPAs for Fall 2025.
+    statements["uva_vt_gpa"] = psycopg.sql.SQL("""
+        SELECT
+            AVG({gpa_col}) FILTER (
+                WHERE {university_col} = {uva_val} AND {gpa_col} < {gpa_threshold}
+            ) AS uva_gpa,
+            AVG({gpa_col}) FILTER (
+                WHERE {university_col} = {vt_val} AND {gpa_col} < {gpa_threshold}
+            ) AS vt_gpa
+        FROM {table}
+        WHERE {fall_2025}
+          AND {accepted}
+    """).format(gpa_col=psycopg.sql.Identifier("gpa"),
+                university_col=psycopg.sql.Identifier("llm_generated_university"),
+                uva_val=psycopg.sql.Literal("University of Virginia"),
+                vt_val=psycopg.sql.Literal("Virginia Tech"),
+                gpa_threshold=psycopg.sql.Literal(5),
+                table=table,
+                fall_2025=fall_2025,
+                accepted=accepted)
+
+    return statements
+
+
+# Composed once at import; the statements only contain fixed literals.
+APPLICANT_STATEMENTS = applicant_statements()
+
+# Raw value names of the statements that answer more than one question.
+STATEMENT_VALUES = {
+    "applicant_totals": ("percentage_international", "average_gpa", "average_gre",
+                         "average_gre_v", "average_gre_aw", "average_gpa_american"),
+    "uva_vt_gpa": ("uva_gpa", "vt_gpa"),
+    "rollup_totals": ("count_f_2025", "percentage_international", "average_gpa",
+                      "average_gre", "average_gre_v", "average_gre_aw",
+                      "average_gpa_american", "percentage_accepted_f25",
+                      "average_gpa_accepted_f25"),
+}
+
+
+def _collect(stats, name, row):
+    """Store the raw value(s) of statement `name`, given its result `row`, in `stats`."""
+    if name in STATEMENT_VALUES:
+        stats.update(zip(STATEMENT_VALUES[name], row))
+    elif name == "popular_u_f25":
+        # GROUP BY returns no row at all when no one applied for the term.
+        stats[name] = row[0] if row else 'No data'
+    else:
+        stats[name] = row[0]
+
+
+def _statement_stats(cur, statements):
+    """Run `statements` one after another on `cur` and collect their raw values."""
+    stats = {}
+    for name, statement in statements.items():
+        cur.execute(statement)
+        _collect(stats, name, cur.fetchone())
+    return stats
+
+
+def _applicant_stats(cur):
+    """Compute the raw analysis values with a full scan of the applicants table."""
+    return _statement_stats(cur, APPLICANT_STATEMENTS)
+
+
+def rollup_statements():
+    """
+    Build the analysis statements over the running aggregates in applicant_rollup.
+    Returns a dict of statement name -> composed SQL, like applicant_statements.
+    The rollup is only grouped by term, citizenship, decision and degree, so the
+    questions about a university or program reuse the applicants statements,
+    which read the narrow indexes on those columns.
+    """
+    statements = {}
+
+    # Questions 1-6 are additive, so they all fold into one pass over the rollup.
+    statements["rollup_totals"] = psycopg.sql.SQL("""
+        SELECT
+            COALESCE(SUM(n) FILTER (WHERE {f25}), 0)::bigint,
+            SUM(n) FILTER (WHERE us_or_international = {intl}) * 100.0
+                / NULLIF(SUM(n), 0),
+            SUM(gpa_sum) / NULLIF(SUM(gpa_n), 0),
+            SUM(gre_sum) / NULLIF(SUM(gre_n), 0),
+            SUM(gre_v_sum) / NULLIF(SUM(gre_v_n), 0),
+            SUM(gre_aw_sum) / NULLIF(SUM(gre_aw_n), 0),
+            SUM(gpa_all_sum) FILTER (WHERE us_or_international = {american})
+                / NULLIF(SUM(gpa_all_n) FILTER (WHERE us_or_international = {american}), 0),
+            SUM(n) FILTER (WHERE {f25} AND is_accepted) * 100.0
+                / NULLIF(SUM(n) FILTER (WHERE {f25}), 0),
+            SUM(gpa_sum) FILTER (WHERE {f25} AND is_accepted)
+                / NULLIF(SUM(gpa_n) FILTER (WHERE {f25} AND is_accepted), 0)
+        FROM {table}
+    """).format(table=psycopg.sql.Identifier("applicant_rollup"),
+                f25=psycopg.sql.SQL("term_season = 'Fall' AND term_year = 2025"),
+                intl=psycopg.sql.Literal("International"),
+                american=psycopg.sql.Literal("American"))
+
+    # 7-10. University and program questions: index scans of the applicants table
+    # (applicants_university_program_degree_idx, applicants_fall_2025_idx and
+    # applicants_accepted_idx in db/init.sql).
+    for name in ("count_jhu_cs_masters", "count_hoya_cs_phd_2025", "popular_u_f25",
+                 "uva_vt_gpa"):
+        statements[name] = APPLICANT_STATEMENTS[name]
+
+    return statements
+
+
+ROLLUP_STATEMENTS = rollup_statements()
+
+# Statements answering the questions from each database source.
+SOURCE_STATEMENTS = {"rollup": ROLLUP_STATEMENTS, "applicants": APPLICANT_STATEMENTS}
+
+
+def run_queries(source="rollup", conn=None, path=None):
+    """
+    Defines SQL queries and interrogates database, storing answers in a dictionary.
+
+    By default the answers are read from the running aggregates in `applicant_rollup`,
+    which the worker keeps up to date on every ingest, and from the university and
+    program indexes on `applicants`. Pass ``source="applicants"``
+    to recompute every answer with a full scan of the `applicants` table instead.
+    An open connection may be passed in; otherwise one is checked out of the pool.
+    ``source="arrow"`` answers from the memory-mapped Arrow snapshot at `path`
+    (default ARROW_PATH, written by arrow_snapshot.export_arrow) without a database.
+    """
+    if source == "arrow":
+        # Imported here so pyarrow is only needed by snapshot runs.
+        from etl.arrow_snapshot import open_arrow, arrow_stats  # pylint: disable=C0415,E0401
+        stats = arrow_stats(open_arrow(path or ARROW_PATH))
+    else:
+        checkout = nullcontext(conn) if conn is not None else get_db_connection()
+        with checkout as conn:
+            if source not in SOURCE_STATEMENTS:
+                raise ValueError(f"Unknown query source: {source}")
+            # Create a cursor object.
+            with conn.cursor() as cur:  # pylint: disable=E1101
+                stats = _statement_stats(cur, SOURCE_STATEMENTS[source])
+
+    return format_results(stats)
+
+
+def format_results(stats):  # pylint: disable=R0912,R0914,R0915
+    """
+    Turn the raw analysis values into `query_results`: a dict of question number ->
+    (longform question, formatted answer).
+    """
+    # Questions the queries seek to answer in longform strings
+    q_1 = "How many entries do you have in your database who have applied for Fall 2025?"
+    q_2 = ("What percentage of entries are from international students "
+           "(not American or Other) (to two decimal places)?")
+    q_3 = "What is the average GPA, GRE, GRE V, GRE AW of applicants who provide these metrics?"
+    q_4 = "What is their average GPA of American students in Fall 2025?"
+    q_5 = "What percent of entries for Fall 2025 are Acceptances (to two decimal places)?"
+    q_6 = "What is the average GPA of applicants who applied for Fall 2025 who are Acceptances?"
+    q_7 = (
+        "How many entries are from applicants who applied to JHU for a masters degrees "
+        "in Computer Science?")
+    q_8 = (
+        "How many entries from 2025 are acceptances from applicants who applied to "
+        "Georgetown University for a PhD in Computer Science?")
+    q_9 = "Which school had the most applicants for Fall 2025?"
+    q_10 = (
+        "Did the University of Virginia or Virginia Tech have a higher average GPA "
+        "for applicants accepted Fall 2025?")
+
+    percentage_international = stats["percentage_international"]
+    average_gpa = stats["average_gpa"]
+    average_gre = stats["average_gre"]
+    average_gre_v = stats["average_gre_v"]
+    average_gre_aw = stats["average_gre_aw"]
+    average_gpa_american = stats["average_gpa_american"]
+    percentage_accepted_f25 = stats["percentage_accepted_f25"]
+    average_gpa_accepted_f25 = stats["average_gpa_accepted_f25"]
+    uva_gpa, vt_gpa = stats["uva_gpa"], stats["vt_gpa"]
+
+    # Dictionary to hold query results with key being question
+    # and value being a tuple of (longform question, answer).
+    query_results = {}
+    query_results["1"] = (q_1, stats["count_f_2025"])
+    query_results["2"] = (q_2, round(percentage_international, 2)
+                          if percentage_international else None)
+    query_results["3"] = (q_3, (
+        f"Average GPA: {round(average_gpa, 2) if average_gpa else 'N/A'}, "
+        f"Average GRE: {round(average_gre, 2) if average_gre else 'N/A'}, "
+        f"Average GRE V: {round(average_gre_v, 2) if average_gre_v else 'N/A'}, "
+        f"Average GRE AW: {round(average_gre_aw, 2) if average_gre_aw else 'N/A'}"
+    ))
+    query_results["4"] = (q_4, round(average_gpa_american, 2)
+                          if average_gpa_american else None)
+    query_results["5"] = (q_5, round(percentage_accepted_f25, 2)
+                          if percentage_accepted_f25 else None)
+    query_results["6"] = (q_6, round(average_gpa_accepted_f25, 2)
+                          if average_gpa_accepted_f25 else None)
+    query_results["7"] = (q_7, stats["count_jhu_cs_masters"])
+    query_results["8"] = (q_8, stats["count_hoya_cs_phd_2025"])
+    query_results["9"] = (q_9, stats["popular_u_f25"])
+
+    if uva_gpa is not None and vt_gpa is not None:
+        if uva_gpa > vt_gpa:
+            statement = (
+                f"The University of Virginia (gpa = {round(uva_gpa, 2)}) "
+                f"had a higher average GPA than Virginia Tech "
+                f"(gpa = {round(vt_gpa, 2)}) for Fall 2025 Accepted")
+        else:
+            statement = (
+                f"Virginia Tech (gpa = {round(vt_gpa, 2)}"
+                f"had a higher average GPA than the University of Virginia "
+                f"(gpa = {round(uva_gpa, 2)}) for Fall 2025 Accepted")
+    elif uva_gpa is not None:
+        statement = (
+            f"Only University of Virginia has data "
+            f"(gpa = {round(uva_gpa, 2)}) for Fall 2025 Accepted")
+    elif vt_gpa is not None:
+        statement = (
+            f"Only Virginia Tech has data "
+            f"(gpa = {round(vt_gpa, 2)}) for Fall 2025 Accepted")
+    else:
+        statement = "No GPA data available for either university for Fall 2025 Accepted"
+    query_results["10"] = (q_10, statement)
+
+    return query_results
 
 
 if __name__ == "__main__":
-    results = run_queries()
+    parser = argparse.ArgumentParser(description="Answer the analysis questions.")
+    parser.add_argument("--source", choices=["rollup", "applicants", "arrow"],
+                        default="rollup", help="where the answers are computed from")
+    parser.add_argument("--arrow", default=ARROW_PATH, help="Arrow snapshot path")
+    parser.add_argument("--export-arrow", metavar="PATH",
+                        help="write an Arrow snapshot of applicants to PATH first")
+    args = parser.parse_args()
+
+    if args.export_arrow:
+        from etl.arrow_snapshot import export_arrow  # pylint: disable=C0415,E0401
+        with get_db_connection() as connection:
+            print(f"Exported {export_arrow(connection, args.export_arrow)} rows "
+                  f"to {args.export_arrow}.")
+
+    results = run_queries(source=args.source, path=args.arrow)
     print("Database queries completed.")
     print("Query Results:")
     for key, value in results.items():
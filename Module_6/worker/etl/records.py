@@ -0,0 +1,129 @@
+"""
+This module turns the raw fields of a scraped GradCafe result into the values
+stored in `applicants`. It parses the typed columns (date_added into an ISO date,
+term into season and year, status into decision and decision date) and computes
+`row_hash`, the digest of a row's scraped content that tells ingest whether a
+result seen before has changed.
+
+It is shared by the worker (the cleaning stage in etl.update_database, ingest
+and migrations) and the seed loader db/load_data.py, so a seeded row and the same
+result scraped later get identical values and hash. It needs only the standard
+library, since the loader's image does not install the worker's dependencies.
+
+Functions:
+    parse_date_added(date_added) -> str | None
+        ISO date of a date_added such as "Added on March 31, 2024".
+    parse_term(term) -> tuple
+        (season, year) of a normalised term such as "Fall 2025".
+    parse_decision(status, date_added=None) -> tuple
+        (decision, ISO decision date) of a status such as "Accepted on 1 Mar".
+    row_hash(values) -> bytes
+        Digest of the scraped content among `values`, in UPSERT_COLUMNS order.
+"""
+
+import hashlib
+import json
+import re
+from datetime import date
+from functools import lru_cache
+
+# Canonical labels, matching the term_season and decision_kind enums in db/init.sql.
+SEASONS = ("Winter", "Spring", "Summer", "Fall")
+DECISIONS = ("Accepted", "Rejected", "Wait listed", "Interview", "Other")
+DECISION_LABELS = {decision.lower(): decision for decision in DECISIONS}
+
+RE_TERM_FULL = re.compile(r"^\s*(Winter|Spring|Summer|Fall)\s+(\d{4})\s*$",
+                          re.IGNORECASE)
+RE_DECISION = re.compile(
+    r"^\s*(Accepted|Rejected|Wait listed|Interview|Other)"
+    r"(?:\s+on\s+(\d{1,2})\s+([A-Za-z]{3}))?", re.IGNORECASE)
+RE_ADDED = re.compile(
+    r"^\s*(?:Added on\s+)?([A-Za-z]{3})[A-Za-z]*\.?\s+(\d{1,2}),\s*(\d{4})\s*$",
+    re.IGNORECASE)
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12
+}
+
+
+@lru_cache(maxsize=8192)
+def _added_on(date_added):
+    """
+    Parse "Added on March 31, 2024" (or an ISO date) into a date, else None.
+    Memoised by string, since a scrape holds many entries per posting day.
+    """
+    if not date_added:
+        return None
+    match = RE_ADDED.match(date_added)
+    try:
+        if match is not None:
+            month = MONTHS.get(match.group(1).lower())
+            return date(int(match.group(3)), month, int(match.group(2))) if month else None
+        return date.fromisoformat(date_added.strip()[:10])
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=8192)
+def parse_date_added(date_added):
+    """Convert a scraped date_added such as "Added on March 31, 2024" to an ISO date, or None."""
+    added = _added_on(date_added)
+    return added.isoformat() if added is not None else None
+
+
+@lru_cache(maxsize=1024)
+def parse_term(term):
+    """Split a normalised term such as "Fall 2025" into (season, year), or (None, None)."""
+    match = RE_TERM_FULL.match(term) if term else None
+    if match is None:
+        return None, None
+    return match.group(1).capitalize(), int(match.group(2))
+
+
+@lru_cache(maxsize=8192)
+def parse_decision(status, date_added=None):
+    """
+    Split a status such as "Accepted on 1 Mar" into (decision, ISO decision date).
+    The status carries no year, so it is taken from date_added: a decision is
+    posted on or before the entry, so a date after it belongs to the prior year.
+    """
+    match = RE_DECISION.match(status) if status else None
+    if match is None:
+        return None, None
+    decision = DECISION_LABELS[match.group(1).lower()]
+
+    added = _added_on(date_added)
+    month = MONTHS.get((match.group(3) or "").lower())
+    if added is None or month is None:
+        return decision, None
+    try:
+        decided = date(added.year, month, int(match.group(2)))
+        if decided > added:
+            decided = date(added.year - 1, month, int(match.group(2)))
+    except ValueError:
+        return decision, None
+    return decision, decided.isoformat()
+
+
+# Columns written for each result, in the order etl.ingest.row_values returns them.
+UPSERT_COLUMNS = [
+    "program", "comments", "date_added", "url", "status", "term",
+    "us_or_international", "gpa", "gre", "gre_v", "gre_aw", "degree",
+    "llm_generated_program", "llm_generated_university", "term_season", "term_year",
+    "decision", "decision_date"
+]
+
+# Scraped content covered by row_hash. The url is the key, the typed columns are
+# parsed from term/status/date_added, and the LLM columns are left out so
+# re-standardising an unchanged result is not a change.
+HASHED_COLUMNS = [
+    "program", "comments", "date_added", "status", "term", "us_or_international",
+    "gpa", "gre", "gre_v", "gre_aw", "degree"
+]
+
+
+def row_hash(values):
+    """128-bit digest of the HASHED_COLUMNS among `values` (UPSERT_COLUMNS order)."""
+    content = [values[UPSERT_COLUMNS.index(col)] for col in HASHED_COLUMNS]
+    encoded = json.dumps(content, default=str, separators=(",", ":")).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=16).digest()
@@ -0,0 +1,161 @@
+"""
+This module records the status and progress of queued tasks in the `tasks`
+table, so the web app can report on a scrape it has queued (see
+web/task_registry.py, which registers each task and serves its status).
+
+The web app puts the task's ID in the message headers. While the worker runs
+the task it marks it running, merges progress counts (pages fetched, rows
+cleaned, rows standardised, rows inserted) into the row, and finally marks it
+succeeded or failed. Each update is committed on its own, outside the ingest
+transaction, so progress is visible while the task runs. Every function does
+nothing when the task ID is None (a message published without one).
+
+A task runs single-flight: the worker holds a PostgreSQL advisory lock on the
+task kind for the whole ETL, on a dedicated connection. A duplicate message
+that arrives while another worker holds the lock is marked "coalesced" into the
+running task instead of running again. The lock goes with the connection, so a
+worker that dies releases it, and the web app can see from `pg_locks` that its
+task is no longer running (see web/task_registry.py).
+
+Functions:
+    create_task_table(cur) -> None
+        Create the `tasks` table if it is missing.
+    single_flight(kind, conn=None) -> context manager
+        Hold the kind's lock for the block; yields False if another worker holds it.
+    running_task(kind, conn=None) -> str | None
+        The ID of the running task of `kind`, if any.
+    start_task(task_id, kind, conn=None) -> None
+        Mark a task running.
+    report_progress(task_id, conn=None, **counts) -> None
+        Merge progress counts into a task.
+    finish_task(task_id, status, error=None, conn=None, coalesced_into=None, **counts)
+        Mark a task succeeded, failed or coalesced, with its final counts.
+"""
+
+from contextlib import contextmanager, nullcontext
+import json
+import psycopg
+from etl.db_pool import connection, database_url  # pylint: disable=E0401
+
+FINISHED = ("succeeded", "failed", "coalesced")
+
+# First key of the task advisory locks; the second is derived from the task kind.
+# Both are non-negative, so pg_locks shows them unchanged as classid and objid.
+LOCK_NAMESPACE = 0x7461736B  # "task"
+LOCK_KEY = "hashtext(%s) & 2147483647"
+
+
+def create_task_table(cur):
+    """Create the `tasks` table (as in db/init.sql) if it is missing."""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS tasks (
+            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+            kind TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued'
+                CHECK (status IN ('queued', 'running', 'succeeded', 'failed', 'coalesced')),
+            progress JSONB NOT NULL DEFAULT '{}',
+            error TEXT,
+            coalesced_into UUID,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            started_at TIMESTAMPTZ,
+            finished_at TIMESTAMPTZ,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+    """)
+    cur.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS tasks_single_flight ON tasks (kind)
+        WHERE status IN ('queued', 'running')
+    """)
+
+
+def _checkout(conn):
+    """Use the given connection, or check one out of the pool."""
+    return nullcontext(conn) if conn is not None else connection()
+
+
+@contextmanager
+def single_flight(kind, conn=None):
+    """
+    Hold the advisory lock for `kind` for the duration of the block, yielding
+    True. Yields False at once, without waiting, when another worker holds it.
+
+    The lock is taken on a dedicated autocommit connection, so no transaction
+    stays open for the duration. `conn`, if given, must be in autocommit mode.
+    """
+    dedicated = conn is None
+    if dedicated:
+        conn = psycopg.connect(database_url(), autocommit=True)
+    key = (LOCK_NAMESPACE, kind)
+    try:
+        locked = conn.execute(f"SELECT pg_try_advisory_lock(%s, {LOCK_KEY})", key).fetchone()[0]
+        try:
+            yield locked
+        finally:
+            if locked:
+                conn.execute(f"SELECT pg_advisory_unlock(%s, {LOCK_KEY})", key)
+    finally:
+        if dedicated:
+            conn.close()
+
+
+def running_task(kind, conn=None):
+    """Return the ID of the running task of `kind`, or None."""
+    with _checkout(conn) as conn:
+        row = conn.execute("""
+            SELECT id FROM tasks WHERE kind = %s AND status = 'running'
+            ORDER BY started_at DESC LIMIT 1
+        """, (kind, )).fetchone()
+    return str(row[0]) if row else None
+
+
+def start_task(task_id, kind, conn=None):
+    """
+    Mark task `task_id` running; call it while holding the kind's single_flight
+    lock. The row is created if the web app's insert has not been seen (for
+    example, a message published by hand).
+    """
+    if task_id is None:
+        return
+    with _checkout(conn) as conn:
+        # Called with the kind's lock held, so any other running task has lost its worker.
+        conn.execute("""
+            UPDATE tasks
+            SET status = 'failed', error = 'worker_lost', finished_at = now(), updated_at = now()
+            WHERE kind = %s AND status = 'running' AND id <> %s
+        """, (kind, task_id))
+        conn.execute("""
+            INSERT INTO tasks (id, kind, status, started_at)
+            VALUES (%s, %s, 'running', now())
+            ON CONFLICT (id) DO UPDATE
+            SET status = 'running', started_at = now(), updated_at = now()
+        """, (task_id, kind))
+
+
+def report_progress(task_id, conn=None, **counts):
+    """Merge `counts` (e.g. pages_fetched=3) into the progress of task `task_id`."""
+    if task_id is None:
+        return
+    with _checkout(conn) as conn:
+        conn.execute("""
+            UPDATE tasks SET progress = progress || %s::jsonb, updated_at = now()
+            WHERE id = %s
+        """, (json.dumps(counts), task_id))
+
+
+def finish_task(task_id, status, error=None, conn=None,  # pylint: disable=R0913
+                coalesced_into=None, **counts):
+    """
+    Mark task `task_id` succeeded, failed or coalesced (into the task
+    `coalesced_into`), merging in any final `counts`.
+    """
+    if status not in FINISHED:
+        raise ValueError(f"status must be one of {FINISHED}, not {status!r}")
+    if task_id is None:
+        return
+    with _checkout(conn) as conn:
+        conn.execute("""
+            UPDATE tasks
+            SET status = %s, error = %s, coalesced_into = %s,
+                progress = progress || %s::jsonb, finished_at = now(), updated_at = now()
+            WHERE id = %s
+        """, (status, error, coalesced_into, json.dumps(counts), task_id))
@@ -3,7 +3,9 @@ The module obtains new data for a PostgreSQL database by performing the followin
 1. Identifies the most recent entry in the database by extracting entry IDs from URLs.
 2. Scrapes new applicant data from TheGradCafe, 
 stopping once previously recorded entries are encountered.
-3. Cleans and formats the scraped data to standardize it and remove inconsistencies.
+3. Cleans and formats the scraped data to standardize it and remove inconsistencies,
+   parsing date_added into an ISO date, term into season/year and status into
+   decision/decision date.
 4. Processes the cleaned data using an LLM to enrich or standardize information.
 
 Dependencies:
@@ -18,86 +20,68 @@ Dependencies:
 
 Environment Variables:
         DATABASE_URL (str): PostgreSQL connection string used to connect to the database.
+        Connections are drawn from the shared pool (see db_pool).
 """
 
 import os
 import re
 import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import NamedTuple, Optional
 import psycopg
 from bs4 import BeautifulSoup
 import urllib3
+from etl.db_pool import connection  # pylint: disable=E0401
+from etl.snapshot import save_records  # pylint: disable=E0401
+from etl.records import parse_date_added, parse_decision, parse_term  # pylint: disable=E0401
 
 # Part 1: Determine most recent entry in database currently (based on url entry id).
 
 
 def get_db_connection():
-    """Create and return a database connection."""
-    database_url = os.getenv("DATABASE_URL", "postgres://postgres:Potassiumtree43!@db:5432/gradcafe_db")
+    """Check a connection out of the shared pool (use as a context manager)."""
+    return connection()
 
-    return psycopg.connect(database_url)
 
-def find_recent():
-    """Function to find most recent entry in database."""
-    conn = get_db_connection()
-    try:
+def find_recent(conn=None):
+    """
+    Function to find most recent entry in database.
+    Uses the given connection if one is passed, otherwise checks one out of the pool.
+    """
+    checkout = nullcontext(conn) if conn is not None else get_db_connection()
+    with checkout as conn:
         # Create a cursor object.
         with conn.cursor() as cur:  # pylint: disable=E1101
 
-            # Determine total number of rows in db for limit setting
-            count_query = psycopg.sql.SQL(
-                "SELECT COUNT(*) FROM {table}").format(
-                    table=psycopg.sql.Identifier("applicants"))
-            cur.execute(count_query)
-            row = cur.fetchone()
-            total_rows = row[0] if row else 0
-            row_limit = total_rows + 100
-
-            # Query to get all URLs from the database.
-            url_query = psycopg.sql.SQL("""
-                SELECT {url_col}
+            # Largest result ID (the number ending each URL), computed in one pass on
+            # the server rather than by fetching every URL; None when there are none.
+            recent_query = psycopg.sql.SQL("""
+                SELECT COALESCE(MAX(substring({url_col} FROM {id_pattern})::bigint), 0)
                 FROM {table}
                 WHERE {url_col} IS NOT NULL
-                LIMIT {limit}
+                HAVING COUNT(*) > 0
             """).format(url_col=psycopg.sql.Identifier("url"),
-                        table=psycopg.sql.Identifier("applicants"),
-                        limit=psycopg.sql.Literal(row_limit))
-
-            cur.execute(url_query)
-            urls = cur.fetchall()
-
-            if not urls:
-                return None
-
-            max_number = 0
-            recent_url = None  # pylint: disable=W0612
-
-            # Extract number from each URL and find the maximum.
-            for (url, ) in urls:
-                try:
-                    url_parts = url.split('/')
-                    if url_parts:
-                        number = int(url_parts[-1])
-                        if number > max_number:
-                            max_number = number
-                            recent_url = url
-                except (ValueError, IndexError):
-                    # Skip URLs that don't have a valid number at the end.
-                    continue
-
-            return int(max_number)
-    finally:
-        conn.close()  # pylint: disable=E1101
+                        id_pattern=psycopg.sql.Literal("/([0-9]+)$"),
+                        table=psycopg.sql.Identifier("applicants"))
+
+            cur.execute(recent_query)
+            row = cur.fetchone()
+            return int(row[0]) if row else None
 
 
 # Part 2: Scrape new data from TheGradCafe. "New" means data that is not already
 # contained in our database, which is determined by entry id (found at end of entry url).
 
 
-def updated_scrape(recent_id: int):  # pylint: disable=R0914, R0912, R0915
+def updated_scrape(recent_id: int, on_page=None):  # pylint: disable=R0914, R0912, R0915
     """
         Scrape new data from TheGradCafe using Beautiful Soup.
         Function ensures new data by comparing scraped entry id to previous 
         largest entry id (input to the function).
+        If given, on_page(pages_fetched, entries_found) is called after each page.
         Returns a list of grad school applicant entry data.
         """
     iter_var = 1
@@ -215,6 +199,8 @@ def updated_scrape(recent_id: int):  # pylint: disable=R0914, R0912, R0915
             print(
                 f"Page {iter_var}: Found {page_entries} new entries (total: {len(entries)})"
             )
+            if on_page is not None:
+                on_page(iter_var, len(entries))
             iter_var += 1
 
         except urllib3.exceptions.HTTPError as e:
@@ -228,72 +214,146 @@ def updated_scrape(recent_id: int):  # pylint: disable=R0914, R0912, R0915
 
 
 # Part 3: Clean data
-def clean_data(raw_data: list):
+
+# Compiled once at import; each is applied in a single pass over its field.
+RE_DIGITS = re.compile(r"\d")
+RE_TAG = re.compile(r"<[^>]+>")
+RE_TERM_SHORT = re.compile(r"^([A-Za-z])(\d{2})$")
+SHORT_SEASONS = {"F": "Fall", "S": "Spring"}
+
+# Keys of the dicts clean_data returns, in ApplicantRecord field order.
+RECORD_KEYS = (
+    "program", "comments", "date_added", "url", "status", "term", "US/International",
+    "Degree", "GRE", "GRE_V", "GPA", "GRE_AW", "term_season", "term_year", "decision",
+    "decision_date"
+)
+
+
+class ApplicantRecord(NamedTuple):
+    """One cleaned applicant; a tuple, so much smaller than the equivalent dict."""
+    program: Optional[str]
+    comments: Optional[str]
+    date_added: Optional[str]
+    url: Optional[str]
+    status: Optional[str]
+    term: Optional[str]
+    us_or_international: Optional[str]
+    degree: Optional[str]
+    gre: Optional[str]
+    gre_v: Optional[str]
+    gpa: Optional[str]
+    gre_aw: Optional[str]
+    term_season: Optional[str]
+    term_year: Optional[int]
+    decision: Optional[str]
+    decision_date: Optional[str]
+
+    def as_dict(self):
+        """The record keyed as the LLM stage and the database inserts expect."""
+        return dict(zip(RECORD_KEYS, self))
+
+
+@lru_cache(maxsize=1024)
+def normalise_term(term):
+    """Expand an old-style term such as "F18" to "Fall 2018"; other values pass through."""
+    match = RE_TERM_SHORT.match(term) if term else None
+    if match is None or match.group(1) not in SHORT_SEASONS:
+        return term
+    return f"{SHORT_SEASONS[match.group(1)]} 20{match.group(2)}"
+
+
+def clean_record(entry: dict):
+    """Clean one scraped entry into an ApplicantRecord, leaving the entry unchanged."""
+    get = entry.get
+    if "program" in entry and "school" in entry:
+        school = entry["school"]
+        program = f"{entry['program']}, {RE_DIGITS.sub('', school) if school else school}"
+    else:
+        program = None
+    comments = get("comments")
+    date_added = parse_date_added(get("date_added"))
+    status = get("status")
+    term = normalise_term(get("semester_year"))
+
+    return ApplicantRecord(
+        program,
+        RE_TAG.sub("", comments) if comments else comments,
+        date_added,
+        get("link"),
+        status,
+        term,
+        get("citizenship"),
+        get("degree"),
+        get("GRE"),
+        get("GRE_V"),
+        get("GPA"),
+        get("GRE_AW"),
+        # Typed forms of term and status for integer/enum filtering in the database.
+        *parse_term(term),
+        *parse_decision(status, date_added))
+
+
+# Below this many entries a process pool costs more than it saves, so cleaning stays serial.
+PARALLEL_MIN_ROWS = 20000
+# Entries handed to a pool worker per task.
+PARALLEL_CHUNK_ROWS = 5000
+
+# Input shared with forked pool workers, which inherit it instead of receiving a copy.
+_FORK_INPUT = None
+
+
+def _clean_range(bounds):
+    """Pool task: clean the slice [start, stop) of the input shared at fork time."""
+    start, stop = bounds
+    return [clean_record(entry) for entry in _FORK_INPUT[start:stop]]
+
+
+def _clean_parallel(raw_data, workers):
+    """
+    Clean entries across a process pool, in chunks, keeping the input order.
+
+    Where the fork start method exists, workers inherit the input list and each
+    task only carries a (start, stop) range; elsewhere the chunks are pickled to
+    the workers. Either way only the compact records are sent back.
+    """
+    global _FORK_INPUT  # pylint: disable=W0603
+    bounds = [(start, min(start + PARALLEL_CHUNK_ROWS, len(raw_data)))
+              for start in range(0, len(raw_data), PARALLEL_CHUNK_ROWS)]
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        _FORK_INPUT = raw_data
+        try:
+            with ProcessPoolExecutor(workers,
+                                     mp_context=multiprocessing.get_context("fork")) as pool:
+                return [record for chunk in pool.map(_clean_range, bounds) for record in chunk]
+        finally:
+            _FORK_INPUT = None
+
+    with ProcessPoolExecutor(workers) as pool:
+        chunks = pool.map(clean_records, (raw_data[start:stop] for start, stop in bounds))
+        return [record for chunk in chunks for record in chunk]
+
+
+def clean_records(raw_data: list, workers: Optional[int] = 1):
+    """
+    Clean scraped entries into a list of ApplicantRecord tuples.
+    With workers > 1 (None means one per CPU), inputs of at least
+    PARALLEL_MIN_ROWS entries are cleaned in a process pool; smaller inputs
+    are cleaned serially.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(raw_data) >= PARALLEL_MIN_ROWS:
+        return _clean_parallel(raw_data, workers)
+    return [clean_record(entry) for entry in raw_data]
+
+
+def clean_data(raw_data: list, workers: Optional[int] = 1):
     """ Convert data to desired format and remove bad data.
         Output data is ready to be procseed by LLM.
         Adapted from Module 2 assignment.
+        workers > 1 shards large inputs across processes (see clean_records).
         """
-
-    clean_data_list = []
-
-    for entry in raw_data:
-        clean_entry = {}
-
-        # Clean numbers out of school name using Regex.
-        RE_NUM_PAT = r"\d"  # pylint: disable=C0103
-        if "school" not in entry or re.search(RE_NUM_PAT,
-                                              entry["school"]) is None:
-            pass
-        else:
-            entry["school"] = re.sub(RE_NUM_PAT, "", entry["school"])
-
-        # Clean HTML tags with Regex.
-        RE_TAG_PAT = r"<[^>]+>"  # pylint: disable=C0103
-        if entry["comments"] is None:
-            pass
-        else:
-            entry["comments"] = re.sub(RE_TAG_PAT, "", entry["comments"])
-
-        # Old entries use a differemt "term" format
-        # (e.g. old:F18, new:Fall 2018), use Regex to standardize.
-        RE_TERM_PAT = r"^[A-Za-z]\d{2}$"  # pylint: disable=C0103
-        if "semester_year" not in entry or re.search(
-                RE_TERM_PAT, entry["semester_year"]) is None:
-            pass
-        else:
-            if entry["semester_year"][0] == "F":
-                entry["semester_year"] = f"Fall 20{entry['semester_year'][1:]}"
-            elif entry["semester_year"][0] == "S":
-                entry[
-                    "semester_year"] = f"Spring 20{entry['semester_year'][1:]}"
-
-        # Format everything as in assignment brief.
-        if "program" in entry and "school" in entry:
-            program = entry["program"]
-            school = entry["school"]
-            clean_entry["program"] = f"{program}, {school}"
-        else:
-            clean_entry["program"] = None
-
-        clean_entry[
-            "comments"] = entry["comments"] if "comments" in entry else None
-        clean_entry["date_added"] = entry[
-            "date_added"] if "date_added" in entry else None
-        clean_entry["url"] = entry["link"] if "link" in entry else None
-        clean_entry["status"] = entry["status"] if "status" in entry else None
-        clean_entry["term"] = entry[
-            "semester_year"] if "semester_year" in entry else None
-        clean_entry["US/International"] = entry[
-            "citizenship"] if "citizenship" in entry else None
-        clean_entry["Degree"] = entry["degree"] if "degree" in entry else None
-        clean_entry["GRE"] = entry["GRE"] if "GRE" in entry else None
-        clean_entry["GRE_V"] = entry["GRE_V"] if "GRE_V" in entry else None
-        clean_entry["GPA"] = entry["GPA"] if "GPA" in entry else None
-        clean_entry["GRE_AW"] = entry["GRE_AW"] if "GRE_AW" in entry else None
-
-        clean_data_list.append(clean_entry)
-
-    return clean_data_list
+    return [record.as_dict() for record in clean_records(raw_data, workers)]
 
 
 def process_data_with_llm(cleaned_data: list, output_file: str | None = None):
@@ -307,7 +367,7 @@ def process_data_with_llm(cleaned_data: list, output_file: str | None = None):
     # Create temporary files for input and output.
     with tempfile.NamedTemporaryFile(mode='w', suffix='.json',
                                      delete=False) as temp_input:
-        json.dump(cleaned_data, temp_input, indent=2)
+        json.dump(cleaned_data, temp_input, ensure_ascii=False)
         temp_input_path = temp_input.name
 
     try:
@@ -343,10 +403,9 @@ def process_data_with_llm(cleaned_data: list, output_file: str | None = None):
                     if line.strip():
                         processed_data.append(json.loads(line.strip()))
 
-        # Save to output file if specified
+        # Save to output file if specified (a .jsonl.gz path writes a snapshot)
         if output_file:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(processed_data, f, indent=4, ensure_ascii=False)
+            save_records(output_file, processed_data)
             print(f"LLM-processed data saved to: {output_file}")
 
         return processed_data